@@ -0,0 +1,86 @@
+"""
+Admission control for Crest's request endpoints.
+
+Per-client token buckets keep one noisy tab from flooding an endpoint. The
+check is non-blocking: a request over its client's rate is shed immediately
+with a 429 so latency stays bounded under overload instead of collapsing.
+Outbound classification calls are limited separately by backend_scheduler.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated_at')
+
+    def __init__(self, tokens, now):
+        self.tokens = tokens
+        self.updated_at = now
+
+
+class ClientRateLimiter:
+    """
+    Token bucket per client id, refilled at `rate` tokens/second up to `burst`.
+    Buckets are striped over shards like the request deduplicator, and dict
+    order stays least-recently-used first so idle buckets expire in slices.
+    """
+    def __init__(self, rate, burst, shards=16, lock_factory=threading.Lock):
+        self.rate = rate
+        self.burst = burst
+        # A bucket idle this long has refilled completely and can be dropped
+        self.idle_ttl = burst / rate if rate > 0 else 60
+        self.shards = [({}, lock_factory()) for _ in range(shards)]
+        self.cleanup_cursor = 0
+        self.allowed = 0
+        self.limited = 0
+
+    def _shard(self, client_id):
+        return self.shards[hash(client_id) % len(self.shards)]
+
+    def allow(self, client_id, now=None):
+        """Take a token for client_id. Returns (allowed, retry_after_seconds)"""
+        now = time.time() if now is None else now
+        buckets, lock = self._shard(client_id)
+        with lock:
+            bucket = buckets.pop(client_id, None)
+            if bucket is None:
+                bucket = TokenBucket(self.burst, now)
+            else:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+                bucket.updated_at = now
+            buckets[client_id] = bucket
+
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                self.allowed += 1
+                return True, 0.0
+            self.limited += 1
+            return False, (1 - bucket.tokens) / self.rate if self.rate > 0 else self.idle_ttl
+
+    def expire(self, max_items):
+        """Drop buckets idle long enough to have refilled; (reclaimed, more_pending)"""
+        cutoff = time.time() - self.idle_ttl
+        reclaimed = 0
+        for _ in range(len(self.shards)):
+            buckets, lock = self.shards[self.cleanup_cursor]
+            self.cleanup_cursor = (self.cleanup_cursor + 1) % len(self.shards)
+            with lock:
+                while buckets:
+                    oldest = next(iter(buckets))
+                    if buckets[oldest].updated_at >= cutoff:
+                        break
+                    if reclaimed >= max_items:
+                        return reclaimed, True
+                    del buckets[oldest]
+                    reclaimed += 1
+        return reclaimed, False
+
+    def stats(self):
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'clients': sum(len(buckets) for buckets, _ in self.shards),
+            'allowed': self.allowed,
+            'limited': self.limited,
+        }
+
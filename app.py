@@ -1,31 +1,111 @@
 import os
+import json
 import logging
+import sqlite3
 import hashlib
-from flask import Flask, jsonify, request
+import math
+import re
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-from datadog import initialize, statsd
 from pythonjsonlogger import jsonlogger
 import time
-from openai import OpenAI
-from collections import defaultdict
+from collections import defaultdict, deque
 import threading
+import cache_backends
+from admission import ClientRateLimiter
+from audio_thresholds import AudioThresholds, ThresholdsFormatError
+from backend_scheduler import PriorityScheduler
+from caption_sessions import RollingCaptionTracker, normalize_caption
+from deadlines import DeadlinePlanner, remaining_ms
+from decision_table import DecisionTable, DecisionTableError
+from onset_detector import OnsetDetector
+from prefetch import Prefetcher
+from readiness import ReadinessMonitor
+from response_encoding import ResponseTemplate, Slot, dumps as encode_json
+from duck_windows import DuckWindowTracker
+from event_feed import EventFeed
+from feedback_store import FeedbackStore
+from housekeeping import HousekeepingScheduler
+from traffic_journal import TrafficJournal
+from local_classifier import HashedNgramClassifier, ModelFormatError
 
-# Initialize Datadog
-initialize(
-    statsd_host=os.getenv('DD_AGENT_HOST', 'localhost'),
-    statsd_port=8125
-)
+# Heavy dependencies (openai, datadog) are imported on first use or by the
+# background initializer, so importing this module stays fast and the mock
+# and heuristic paths can serve before they finish loading.
+
+class DeferredStatsd:
+    """
+    Stand-in for datadog.statsd while Datadog loads in the background.
+    Metrics sent before it is ready are buffered and replayed once attached;
+    it never starts the loading itself. The server entrypoint or the first
+    request does (see start_background_initialization), so importing the app
+    spawns nothing.
+    """
+    def __init__(self, max_buffered=10000):
+        self.client = None
+        self.buffer = deque(maxlen=max_buffered)
+        self.lock = threading.Lock()
+    
+    def attach(self, client):
+        """Route metrics to the real client and replay buffered ones"""
+        with self.lock:
+            pending = list(self.buffer)
+            self.buffer.clear()
+            self.client = client
+        for name, args, kwargs in pending:
+            getattr(client, name)(*args, **kwargs)
+    
+    def __getattr__(self, name):
+        client = self.client
+        if client is not None:
+            return getattr(client, name)
+        
+        def buffered_call(*args, **kwargs):
+            with self.lock:
+                if self.client is None:
+                    self.buffer.append((name, args, kwargs))
+                    return None
+            return getattr(self.client, name)(*args, **kwargs)
+        
+        return buffered_call
+
+statsd = DeferredStatsd()
 
 # Initialize OpenAI client lazily to avoid blocking startup
 truefoundry_client = None
+truefoundry_client_lock = threading.Lock()
+llm_connection_pool = None  # gateway connection pool behind truefoundry_client
+llm_router = None  # hedged router over truefoundry_client and any extra routes
+LLM_DEFAULT_MODEL = "openai-main/gpt-4o-mini"
+LLM_KEEPALIVE_INTERVAL = float(os.getenv('CREST_LLM_KEEPALIVE_INTERVAL', '20'))
+
+# Progress of the background initializer, reported by /health
+startup_state = {
+    'started': False,
+    'pid': None,  # the process the background work was started in
+    'statsd_ready': False,
+    'llm_client_ready': False,
+    'llm_connections_warmed': 0,
+    'background_init_ms': None
+}
+startup_lock = threading.Lock()
 
 # --- CACHING AND PERFORMANCE OPTIMIZATION CLASSES ---
 class DecisionCache:
-    """Cache for AI decisions with TTL support"""
-    def __init__(self, ttl_seconds=30):
-        self.cache = {}
+    """Cache for AI decisions with TTL support, over an optional precomputed table"""
+    def __init__(self, ttl_seconds=30, namespace='subtitle', backend=None, precomputed=None):
         self.ttl = ttl_seconds
-        self.lock = threading.Lock()
+        self.namespace = namespace
+        self.backend = backend or cache_backends.ShardedMemoryBackend(shards=cache_backends.memory_shards())
+        self.precomputed = precomputed
+    
+    def use_backend(self, backend):
+        """Switch storage to another cache backend"""
+        self.backend = backend
+    
+    def use_precomputed(self, table):
+        """Answer cache misses from a read-only precomputed decision table"""
+        self.precomputed = table
     
     def _generate_key(self, text):
         """Generate cache key from text"""
@@ -34,105 +114,356 @@ class DecisionCache:
     def get_cached_decision(self, text):
         """Get cached decision if still valid"""
         key = self._generate_key(text)
-        
-        with self.lock:
-            if key in self.cache:
-                decision, timestamp = self.cache[key]
-                if time.time() - timestamp < self.ttl:
-                    return decision
-                else:
-                    # Expired, remove from cache
-                    del self.cache[key]
-        
-        return None
+        entry = _cache_backend_call(self.backend.get, self.namespace, key)
+        if entry:
+            return entry[0]
+        return self.precomputed.lookup(text) if self.precomputed is not None else None
+    
+    def get_cached_decisions(self, texts):
+        """Batch lookup, a single round trip on remote backends"""
+        keys = {text: self._generate_key(text) for text in texts}
+        entries = _cache_backend_call(self.backend.get_many, self.namespace, list(set(keys.values()))) or {}
+        decisions = {text: entries[key][0] for text, key in keys.items() if key in entries}
+        if self.precomputed is not None:
+            for text in keys:
+                if text not in decisions:
+                    decision = self.precomputed.lookup(text)
+                    if decision:
+                        decisions[text] = decision
+        return decisions
     
-    def cache_decision(self, text, decision):
+    def cache_decision(self, text, decision, ttl_seconds=None):
         """Store decision with current timestamp"""
         key = self._generate_key(text)
-        
-        with self.lock:
-            self.cache[key] = (decision, time.time())
-            
-            # Cleanup old entries (simple approach)
-            if len(self.cache) > 1000:  # Prevent unlimited growth
-                current_time = time.time()
-                expired_keys = [
-                    k for k, (_, ts) in self.cache.items() 
-                    if current_time - ts >= self.ttl
-                ]
-                for k in expired_keys:
-                    del self.cache[k]
+        _cache_backend_call(self.backend.set, self.namespace, key, decision, ttl_seconds or self.ttl)
 
 class RequestDeduplicator:
-    """Prevent duplicate simultaneous requests"""
-    def __init__(self):
-        self.pending_requests = {}
-        self.lock = threading.Lock()
+    """
+    Prevent duplicate simultaneous requests.
+    Keys are striped over shards with their own locks so request threads
+    only contend when they hash to the same shard.
+    """
+    def __init__(self, shards=16, lock_factory=threading.Lock):
+        self.shards = [({}, lock_factory()) for _ in range(shards)]
+        self.cleanup_cursor = 0
+    
+    def _shard(self, request_key):
+        return self.shards[hash(request_key) % len(self.shards)]
+    
+    def try_acquire(self, request_key):
+        """Atomically mark a request as in flight; False if it already was"""
+        pending, lock = self._shard(request_key)
+        with lock:
+            if request_key in pending:
+                return False
+            pending[request_key] = time.time()
+            return True
     
     def is_duplicate(self, request_key):
         """Check if request is already being processed"""
-        with self.lock:
-            return request_key in self.pending_requests
+        pending, lock = self._shard(request_key)
+        with lock:
+            return request_key in pending
     
     def add_request(self, request_key):
         """Mark request as being processed"""
-        with self.lock:
-            self.pending_requests[request_key] = time.time()
+        pending, lock = self._shard(request_key)
+        with lock:
+            # Re-insert so dict order stays oldest-first for incremental cleanup
+            pending.pop(request_key, None)
+            pending[request_key] = time.time()
     
     def remove_request(self, request_key):
         """Mark request as completed"""
-        with self.lock:
-            self.pending_requests.pop(request_key, None)
+        pending, lock = self._shard(request_key)
+        with lock:
+            pending.pop(request_key, None)
     
-    def cleanup_stale_requests(self, max_age=10):
-        """Remove requests older than max_age seconds"""
-        current_time = time.time()
-        with self.lock:
-            stale_keys = [
-                k for k, ts in self.pending_requests.items()
-                if current_time - ts > max_age
-            ]
-            for k in stale_keys:
-                del self.pending_requests[k]
+    def pending_count(self):
+        return sum(len(pending) for pending, _ in self.shards)
+    
+    def cleanup_stale_requests(self, max_age=10, max_items=None):
+        """
+        Remove requests older than max_age seconds, oldest first per shard.
+        Returns (reclaimed, more_pending) so cleanup can run in small slices.
+        """
+        cutoff = time.time() - max_age
+        reclaimed = 0
+        more_pending = False
+        for _ in range(len(self.shards)):
+            pending, lock = self.shards[self.cleanup_cursor]
+            self.cleanup_cursor = (self.cleanup_cursor + 1) % len(self.shards)
+            with lock:
+                while pending:
+                    oldest_key = next(iter(pending))
+                    if pending[oldest_key] >= cutoff:
+                        break
+                    if max_items is not None and reclaimed >= max_items:
+                        more_pending = True
+                        break
+                    del pending[oldest_key]
+                    reclaimed += 1
+            if more_pending:
+                break
+        return reclaimed, more_pending
 
 class BaselineCache:
     """Cache baseline values per video"""
-    def __init__(self, ttl_seconds=300):  # 5 minutes
-        self.baselines = {}
+    def __init__(self, ttl_seconds=300, namespace='baseline', backend=None):  # 5 minutes
         self.ttl = ttl_seconds
-        self.lock = threading.Lock()
+        self.namespace = namespace
+        self.backend = backend or cache_backends.ShardedMemoryBackend(shards=cache_backends.memory_shards())
+    
+    def use_backend(self, backend):
+        """Switch storage to another cache backend"""
+        self.backend = backend
     
     def get_baseline(self, video_id):
         """Get cached baseline for video"""
-        with self.lock:
-            if video_id in self.baselines:
-                baseline, timestamp = self.baselines[video_id]
-                if time.time() - timestamp < self.ttl:
-                    return baseline
-                else:
-                    del self.baselines[video_id]
-        return None
+        entry = _cache_backend_call(self.backend.get, self.namespace, video_id)
+        return entry[0] if entry else None
     
     def set_baseline(self, video_id, baseline):
         """Cache baseline for video"""
-        with self.lock:
-            self.baselines[video_id] = (baseline, time.time())
+        _cache_backend_call(self.backend.set, self.namespace, video_id, baseline, self.ttl)
+
+def _cache_backend_call(method, *args):
+    """Call the cache backend, treating an unreachable store as a cache miss"""
+    try:
+        return method(*args)
+    except cache_backends.CacheBackendError as e:
+        logger.warning("Cache backend unavailable", extra={
+            'error': str(e),
+            'error_type': type(e).__name__
+        })
+        statsd.increment('crest.cache.backend_error', tags=[f'error_type:{type(e).__name__}'])
+        return None
+
+# Audio decisions are cached on quantized (volume, baseline, spike) values so
+# near-identical frames reuse one AI decision
+AUDIO_QUANTIZATION_STEP = float(os.getenv('CREST_AUDIO_QUANTIZATION_STEP', '0.02'))
+
+def quantize_audio_key(volume, baseline, spike):
+    """Build the audio decision cache key from quantized audio levels"""
+    step = AUDIO_QUANTIZATION_STEP
+    return "audio:{}:{}:{}".format(
+        round(volume / step), round(baseline / step), round(spike / step)
+    )
 
 # Initialize caching systems
-decision_cache = DecisionCache(ttl_seconds=30)
-request_deduplicator = RequestDeduplicator()
+decision_cache = DecisionCache(ttl_seconds=30, namespace='subtitle')
+audio_decision_cache = DecisionCache(ttl_seconds=30, namespace='audio')
+request_deduplicator = RequestDeduplicator(shards=cache_backends.memory_shards())
 baseline_cache = BaselineCache(ttl_seconds=300)
+caption_tracker = RollingCaptionTracker(
+    min_escalation_words=int(os.getenv('CREST_CAPTION_ESCALATION_WORDS', '4'))
+)
+duck_windows = DuckWindowTracker()
+# Per-session onset state lives in fixed typed columns sized from this budget.
+# They are allocated on the first /audio-levels request, not at import in
+# every worker
+onset_detector = None
+onset_detector_lock = threading.Lock()
+
+def get_onset_detector():
+    """The onset detector, built on first use"""
+    global onset_detector
+    detector = onset_detector
+    if detector is None:
+        with onset_detector_lock:
+            if onset_detector is None:
+                onset_detector = OnsetDetector(
+                    max_bytes=int(float(os.getenv('CREST_SESSION_MEMORY_MB', '64')) * 1024 * 1024)
+                )
+            detector = onset_detector
+    return detector
+
+# Upcoming caption cues are classified in the background on the bulk queue
+prefetcher = Prefetcher(
+    classify=lambda text: classify_for_prefetch(text),
+    store=decision_cache.cache_decision,
+    is_cached=lambda texts: set(decision_cache.get_cached_decisions(texts)),
+    workers=int(os.getenv('CREST_PREFETCH_WORKERS', '2'))
+)
+
+# Admission control: per-client request rates and a cap on concurrent backend calls
+subtitle_rate_limiter = ClientRateLimiter(
+    rate=float(os.getenv('CREST_SUBTITLE_RATE', '10')),
+    burst=float(os.getenv('CREST_SUBTITLE_BURST', '30'))
+)
+audio_rate_limiter = ClientRateLimiter(
+    rate=float(os.getenv('CREST_AUDIO_RATE', '20')),
+    burst=float(os.getenv('CREST_AUDIO_BURST', '40'))
+)
+
+# Outbound classification calls: weighted fair slots per work class so audio
+# never waits behind caption or bulk work. max_wait is how long a request
+# thread may queue before degrading to the cheaper path.
+BACKEND_WORK_CLASSES = {
+    'audio': dict(weight=8, max_concurrency=8, max_queue=16, max_wait=0.15),
+    'subtitle': dict(weight=3, max_concurrency=6, max_queue=32, max_wait=0.5),
+    'bulk': dict(weight=1, max_concurrency=2, max_queue=256, max_wait=10.0),
+}
+
+def report_backend_grant(work_class, queue_seconds):
+    statsd.histogram('crest.backend.queue_time', queue_seconds, tags=[f'class:{work_class}'])
+
+def report_backend_shed(work_class, reason):
+    statsd.increment('crest.admission.shed', tags=[f'reason:{reason}', f'type:{work_class}'])
+
+# Live latency estimates per decision path, most accurate first, for deadline-aware requests
+subtitle_deadlines = DeadlinePlanner({'llm': 600.0, 'local': 1.0, 'rules': 0.1})
+audio_deadlines = DeadlinePlanner({'llm': 800.0, 'heuristic': 0.1})
+
+backend_scheduler = PriorityScheduler(
+    total_concurrency=int(os.getenv('CREST_BACKEND_CONCURRENCY', '8')),
+    classes=BACKEND_WORK_CLASSES,
+    on_grant=report_backend_grant,
+    on_shed=report_backend_shed
+)
+
+def report_llm_connection(connect_ms):
+    statsd.increment('crest.llm.pool.connections_opened')
+    statsd.histogram('crest.llm.pool.connect_duration', connect_ms / 1000)
+
+def report_llm_pool_saturated():
+    statsd.increment('crest.llm.pool.saturated')
 
 def get_truefoundry_client():
-    """Get or create TrueFoundry client on demand"""
-    global truefoundry_client
+    """Get or create TrueFoundry client on demand, on the shared gateway connection pool"""
+    global truefoundry_client, llm_connection_pool
     if truefoundry_client is None and os.getenv('TRUEFOUNDRY_API_KEY') and os.getenv('TRUEFOUNDRY_BASE_URL'):
-        truefoundry_client = OpenAI(
-            api_key=os.getenv('TRUEFOUNDRY_API_KEY'),
-            base_url=os.getenv('TRUEFOUNDRY_BASE_URL')
-        )
+        with truefoundry_client_lock:
+            if truefoundry_client is None:
+                from openai import OpenAI
+                from gateway_pool import GatewayConnectionPool
+                llm_connection_pool = GatewayConnectionPool(
+                    os.getenv('TRUEFOUNDRY_BASE_URL'),
+                    api_key=os.getenv('TRUEFOUNDRY_API_KEY'),
+                    pool_size=int(os.getenv('CREST_LLM_POOL_SIZE', '20')),
+                    keepalive_expiry=float(os.getenv('CREST_LLM_KEEPALIVE_EXPIRY', '60')),
+                    http2=os.getenv('CREST_LLM_HTTP2', '0') == '1',
+                    warm_connections=int(os.getenv('CREST_LLM_WARM_CONNECTIONS', '4')),
+                    keepalive_interval=LLM_KEEPALIVE_INTERVAL,
+                    on_connection=report_llm_connection,
+                    on_saturated=report_llm_pool_saturated
+                )
+                truefoundry_client = OpenAI(
+                    api_key=os.getenv('TRUEFOUNDRY_API_KEY'),
+                    base_url=os.getenv('TRUEFOUNDRY_BASE_URL'),
+                    http_client=llm_connection_pool.client
+                )
     return truefoundry_client
 
+def build_llm_routes(client):
+    """
+    The default gateway route plus any extra "base_url|model" entries from
+    CREST_LLM_ROUTES (comma separated; an empty base_url means the default gateway)
+    """
+    from llm_router import Route
+    default_url = os.getenv('TRUEFOUNDRY_BASE_URL', '')
+    routes = [Route('default', client, os.getenv('CREST_LLM_MODEL', LLM_DEFAULT_MODEL))]
+    clients = {default_url: client}
+    for entry in filter(None, (part.strip() for part in os.getenv('CREST_LLM_ROUTES', '').split(','))):
+        base_url, _, model = entry.rpartition('|')
+        base_url = base_url or default_url
+        if base_url not in clients:
+            from openai import OpenAI
+            clients[base_url] = OpenAI(
+                api_key=os.getenv('TRUEFOUNDRY_API_KEY'),
+                base_url=base_url,
+                http_client=llm_connection_pool.client if llm_connection_pool else None
+            )
+        routes.append(Route(f"{base_url.split('//')[-1]}|{model}", clients[base_url], model))
+    return routes
+
+def report_llm_router_event(event):
+    statsd.increment('crest.llm.router', tags=[f'event:{event}'])
+
+def get_llm_router(client):
+    """Hedged, latency-aware router over the gateway routes, built around client"""
+    global llm_router
+    router = llm_router
+    if router is None or router.routes[0].client is not client:
+        with truefoundry_client_lock:
+            if llm_router is None or llm_router.routes[0].client is not client:
+                from llm_router import LLMRouter
+                if llm_router is not None:
+                    llm_router.close()
+                llm_router = LLMRouter(
+                    build_llm_routes(client),
+                    hedge_ratio=float(os.getenv('CREST_LLM_HEDGE_RATIO', '0.1')),
+                    default_hedge_delay_ms=float(os.getenv('CREST_LLM_HEDGE_DELAY_MS', '300')),
+                    eject_after=int(os.getenv('CREST_LLM_EJECT_AFTER', '3')),
+                    eject_seconds=float(os.getenv('CREST_LLM_EJECT_SECONDS', '30')),
+                    on_event=report_llm_router_event
+                )
+            router = llm_router
+    return router
+
+def keep_llm_connections_alive(max_items):
+    """Housekeeping task: keep the gateway pool's connections from idling out"""
+    if llm_connection_pool is None:
+        return 0, False
+    return llm_connection_pool.keepalive(max_items)
+
+def initialize_background_dependencies():
+    """Load Datadog and build the LLM client off the request path"""
+    init_start_time = time.time()
+    
+    try:
+        from datadog import initialize, statsd as datadog_statsd
+        initialize(
+            statsd_host=os.getenv('DD_AGENT_HOST', 'localhost'),
+            statsd_port=8125
+        )
+        statsd.attach(datadog_statsd)
+        startup_state['statsd_ready'] = True
+    except Exception as e:
+        logger.error("Datadog initialization failed", extra={
+            'error': str(e),
+            'error_type': type(e).__name__
+        })
+    
+    try:
+        startup_state['llm_client_ready'] = get_truefoundry_client() is not None
+        if llm_connection_pool is not None:
+            # Pay DNS, TCP and TLS setup now rather than on the first requests
+            startup_state['llm_connections_warmed'] = llm_connection_pool.warm()
+    except Exception as e:
+        logger.error("TrueFoundry client initialization failed", extra={
+            'error': str(e),
+            'error_type': type(e).__name__
+        })
+    
+    try:
+        import spectral_features  # loads NumPy ahead of the first /audio-spectrum request
+    except ImportError as e:
+        logger.error("Spectral features unavailable", extra={'error': str(e)})
+    
+    startup_state['background_init_ms'] = (time.time() - init_start_time) * 1000
+    logger.info("Background initialization completed", extra=dict(startup_state))
+
+def start_background_initialization():
+    """
+    Start the background initializer, housekeeping and readiness probes once
+    per process; safe to call from any thread. A forked child starts its own,
+    since threads don't survive fork
+    """
+    with startup_lock:
+        if startup_state['started'] and startup_state['pid'] == os.getpid():
+            return
+        startup_state['started'] = True
+        startup_state['pid'] = os.getpid()
+        startup_state['background_init_ms'] = None
+    threading.Thread(
+        target=initialize_background_dependencies,
+        name='crest-background-init',
+        daemon=True
+    ).start()
+    housekeeping.start()
+    readiness.start()
+
 # Configure structured JSON logging
 def setup_logging():
     logger = logging.getLogger()
@@ -155,11 +486,555 @@ def setup_logging():
 
 logger = setup_logging()
 
-def analyze_subtitle_for_loud_events(subtitle_text):
+def configure_cache_backend():
+    """
+    Move the caches onto the backend selected by CREST_CACHE_BACKEND.
+    Under the production launcher the shared cache server is the default.
+    """
+    try:
+        shared_store = None
+        if os.getenv('CREST_SHARED_CACHE_ADDRESS'):
+            import shared_cache
+            shared_store = shared_cache.connect_from_environment()
+    except Exception as e:
+        logger.error("Could not connect to shared cache tier", extra={
+            'error': str(e),
+            'error_type': type(e).__name__
+        })
+        shared_store = None
+    
+    if shared_store is None and os.getenv('CREST_CACHE_BACKEND', 'memory').lower() == 'memory':
+        # Keep one process-local backend per cache
+        return None
+    
+    try:
+        backend = cache_backends.create_backend(shared_store=shared_store)
+    except Exception as e:
+        logger.error("Cache backend unavailable, using process-local caches", extra={
+            'error': str(e),
+            'error_type': type(e).__name__
+        })
+        return None
+    
+    for cache in (decision_cache, audio_decision_cache, baseline_cache):
+        cache.use_backend(backend)
+    logger.info("Cache backend configured", extra={
+        'backend': backend.name,
+        'pid': os.getpid()
+    })
+    return backend
+
+configure_cache_backend()
+
+# --- LOCAL CLASSIFIER CASCADE ---
+LOCAL_MODEL_PATH = os.getenv(
+    'CREST_LOCAL_MODEL_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'subtitle_classifier.json')
+)
+
+cascade_stats = {'local': 0, 'llm': 0, 'shed': 0, 'deadline': 0, 'agree': 0, 'disagree': 0}
+cascade_stats_lock = threading.Lock()
+
+def load_local_classifier(path=LOCAL_MODEL_PATH):
+    """Load the versioned local classifier model, if one has been trained"""
+    if not path or not os.path.exists(path):
+        return None
+    
+    try:
+        model = HashedNgramClassifier.load(path)
+    except (OSError, ValueError, ModelFormatError) as e:
+        logger.error("Could not load local classifier, all live decisions will use the LLM", extra={
+            'model_path': path,
+            'error': str(e),
+            'error_type': type(e).__name__
+        })
+        return None
+    
+    if os.getenv('CREST_LOCAL_MODEL_CONFIDENCE'):
+        model.confidence_threshold = float(os.getenv('CREST_LOCAL_MODEL_CONFIDENCE'))
+    
+    logger.info("Local classifier loaded", extra={
+        'model_path': path,
+        'model_version': model.model_version,
+        'confidence_threshold': model.confidence_threshold
+    })
+    return model
+
+local_classifier_model = load_local_classifier()
+
+# --- PRECOMPUTED DECISION TABLE ---
+DECISION_TABLE_PATH = os.getenv(
+    'CREST_DECISION_TABLE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'decision_table.bin')
+)
+
+def load_decision_table(path=DECISION_TABLE_PATH):
+    """Map the precomputed decision table built by precompute_decisions.py, if present"""
+    if not path or not os.path.exists(path):
+        return None
+    
+    try:
+        table = DecisionTable(path)
+    except DecisionTableError as e:
+        logger.error("Could not load precomputed decision table", extra={
+            'table_path': path,
+            'error': str(e)
+        })
+        return None
+    
+    logger.info("Precomputed decision table loaded", extra={
+        'table_path': path,
+        'entries': len(table)
+    })
+    return table
+
+precomputed_decisions = load_decision_table()
+decision_cache.use_precomputed(precomputed_decisions)
+
+# --- AUDIO THRESHOLDS ---
+AUDIO_THRESHOLDS_PATH = os.getenv(
+    'CREST_AUDIO_THRESHOLDS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'audio_thresholds.json')
+)
+
+def load_audio_thresholds(path=AUDIO_THRESHOLDS_PATH):
+    """Load thresholds tuned by tune_thresholds.py, else the hand-picked defaults"""
+    if not path or not os.path.exists(path):
+        return AudioThresholds()
+    
+    try:
+        thresholds = AudioThresholds.load(path)
+    except (OSError, ValueError, ThresholdsFormatError) as e:
+        logger.error("Could not load audio thresholds, using defaults", extra={
+            'thresholds_path': path,
+            'error': str(e),
+            'error_type': type(e).__name__
+        })
+        return AudioThresholds()
+    
+    logger.info("Audio thresholds loaded", extra=dict(
+        thresholds.values(),
+        thresholds_path=path,
+        thresholds_version=thresholds.version
+    ))
+    return thresholds
+
+audio_thresholds = load_audio_thresholds()
+
+# --- TRAFFIC JOURNAL ---
+JOURNAL_DIR = os.getenv('CREST_JOURNAL_DIR', '')
+JOURNALED_ENDPOINTS = ('/data', '/audio-data', '/audio-spectrum', '/audio-levels')
+
+def open_traffic_journal(directory=JOURNAL_DIR):
+    """Journal analyzed exchanges for replay_traffic.py, if configured"""
+    if not directory:
+        return None
+    
+    try:
+        journal = TrafficJournal(
+            directory,
+            max_file_bytes=int(float(os.getenv('CREST_JOURNAL_MAX_FILE_MB', '64')) * 1024 * 1024),
+            max_files=int(os.getenv('CREST_JOURNAL_MAX_FILES', '8')),
+            on_drop=lambda: statsd.increment('crest.journal.dropped')
+        )
+    except OSError as e:
+        logger.error("Could not open traffic journal", extra={
+            'journal_dir': directory,
+            'error': str(e)
+        })
+        return None
+    
+    logger.info("Traffic journal enabled", extra={'journal_dir': directory})
+    return journal
+
+traffic_journal = open_traffic_journal()
+
+# --- DASHBOARD EVENT FEED ---
+EVENTS_MAX_LIMIT = 500
+EVENTS_STREAM_SECONDS = float(os.getenv('CREST_EVENTS_STREAM_SECONDS', '300'))
+EVENTS_HEARTBEAT_SECONDS = 15.0
+
+# Recent decisions per client for dashboards polling /events or following /events/stream
+event_feed = EventFeed(
+    per_client=int(os.getenv('CREST_EVENTS_PER_CLIENT', '200')),
+    total=int(os.getenv('CREST_EVENTS_TOTAL', '5000'))
+)
+
+# --- FEEDBACK STORE ---
+# Opt-in: unset keeps corrections in the event feed only and writes no files
+FEEDBACK_DB = os.getenv('CREST_FEEDBACK_DB', '')
+# A correction this long after the client's last duck isn't attributed to it
+FEEDBACK_ATTRIBUTION_SECONDS = 30.0
+
+def open_feedback_store(path=FEEDBACK_DB):
+    """Store corrections for queries and repeat-duck suppression, if configured"""
+    if not path:
+        return None
+    
+    try:
+        store = FeedbackStore(
+            path,
+            suppress_window=float(os.getenv('CREST_FEEDBACK_SUPPRESS_SECONDS', '3')),
+            on_drop=lambda: statsd.increment('crest.feedback.dropped')
+        )
+    except (OSError, sqlite3.Error) as e:
+        logger.error("Could not open feedback store", extra={
+            'feedback_db': path,
+            'error': str(e)
+        })
+        return None
+    
+    logger.info("Feedback store enabled", extra={'feedback_db': path})
+    return store
+
+feedback_store = open_feedback_store()
+
+def resolve_playback_position(payload):
+    """(video_id, playback_time in seconds) the client reported, each None if absent or invalid"""
+    video_id = payload.get('video_id')
+    playback_time = payload.get('playback_time')
+    if isinstance(playback_time, bool) or not isinstance(playback_time, (int, float)) \
+            or not math.isfinite(playback_time) or playback_time < 0:
+        playback_time = None
+    return (str(video_id) if video_id not in (None, '') else None), playback_time
+
+def suppressed_by_feedback(payload):
+    """NONE response if the user already corrected a duck at this moment of the video, else None"""
+    store = feedback_store
+    if store is None:
+        return None
+    corrected_at = store.suppresses(*resolve_playback_position(payload))
+    if corrected_at is None:
+        return None
+    note_decision_path('feedback')
+    statsd.increment('crest.feedback.suppressed')
+    return {
+        "action": "NONE",
+        "confidence": 1.0,
+        "trigger": "user_feedback",
+        "corrected_at": corrected_at,
+        "suppressed": True
+    }
+
+# Which path answered the request being handled on this thread
+decision_trace = threading.local()
+
+def note_decision_path(path):
+    decision_trace.path = path
+
+# Whether /data echoes the subtitle text back; clients override it per
+# request with "echo_text"
+ECHO_SUBTITLE_TEXT = os.getenv('CREST_ECHO_SUBTITLE_TEXT', '1') == '1'
+
+# Fixed response shapes, encoded once per distinct slot values. Bodies that
+# echo the client's subtitle text are encoded per request and never kept
+SUBTITLE_DUCK = ResponseTemplate({
+    "action": "LOWER_VOLUME", "level": 0.3, "duration": 5000, "confidence": "YES",
+    "subtitle_text": Slot('subtitle_text'), "processed": True
+}, max_cached=0)
+SUBTITLE_DUCK_NO_ECHO = ResponseTemplate({
+    "action": "LOWER_VOLUME", "level": 0.3, "duration": 5000, "confidence": "YES", "processed": True
+})
+SUBTITLE_NONE = ResponseTemplate({
+    "action": "NONE", "confidence": Slot('confidence'), "subtitle_text": Slot('subtitle_text'),
+    "processed": True
+}, max_cached=0)
+SUBTITLE_NONE_NO_ECHO = ResponseTemplate({
+    "action": "NONE", "confidence": Slot('confidence'), "processed": True
+})
+AUDIO_NONE = ResponseTemplate({"action": "NONE", "confidence": Slot('confidence'), "trigger": "audio_analysis"})
+ONSET_NONE = ResponseTemplate({"action": "NONE", "trigger": "onset_detector", "phase": Slot('phase')})
+
+def json_response(data, status=200):
+    """jsonify() through the fast encoder; the after_request hook reuses data instead of re-parsing"""
+    decision_trace.response = data
+    return Response(encode_json(data), status=status, content_type='application/json')
+
+def template_response(template, **values):
+    """Response with the template's body for these values, cached if the template keeps bodies"""
+    decision_trace.response = (template, values)
+    return Response(template.render(**values), content_type='application/json')
+
+def echoes_subtitle_text(payload):
+    echo = payload.get('echo_text')
+    return echo if isinstance(echo, bool) else ECHO_SUBTITLE_TEXT
+
+# Decision paths whose subtitle answers analyze_subtitle_for_loud_events caches;
+# the others (duplicate, deadline, shed, llm_error) are fallbacks
+CACHEABLE_SUBTITLE_PATHS = ('cache', 'local', 'llm', 'mock')
+
+def classify_for_prefetch(subtitle_text):
+    """(decision, cacheable) for a prefetched caption cue, on the bulk queue"""
+    decision_trace.path = None
+    decision = analyze_subtitle_for_loud_events(subtitle_text, work_class='bulk')
+    return decision, decision_trace.path in CACHEABLE_SUBTITLE_PATHS
+
+def record_cascade_tier(tier):
+    """Count which cascade tier answered a live-mode decision"""
+    note_decision_path(tier)
+    with cascade_stats_lock:
+        cascade_stats[tier] += 1
+    statsd.increment('crest.cascade.decision', tags=[f'tier:{tier}'])
+
+# --- BACKGROUND HOUSEKEEPING ---
+def report_housekeeping_run(task, reclaimed, duration_ms):
+    """Publish duration and reclaimed entries for each housekeeping slice"""
+    statsd.histogram('crest.housekeeping.duration', duration_ms / 1000, tags=[f'task:{task.name}'])
+    if reclaimed:
+        statsd.increment('crest.housekeeping.reclaimed', reclaimed, tags=[f'task:{task.name}'])
+
+def report_housekeeping_error(task, error):
+    logger.error("Housekeeping task failed", extra={
+        'task': task.name,
+        'error': str(error),
+        'error_type': type(error).__name__
+    })
+    statsd.increment('crest.housekeeping.error', tags=[f'task:{task.name}'])
+
+housekeeping = HousekeepingScheduler(
+    on_task_run=report_housekeeping_run,
+    on_task_error=report_housekeeping_error
+)
+
+def expire_onset_sessions(max_items):
+    """Expire idle onset sessions and report how much of the memory budget is in use"""
+    detector = onset_detector
+    if detector is None:
+        return 0, False
+    result = detector.expire(max_items)
+    stats = detector.stats()
+    statsd.gauge('crest.sessions.memory_bytes', stats['memory_bytes'])
+    statsd.gauge('crest.sessions.count', stats['sessions'])
+    statsd.gauge('crest.sessions.evictions', stats['evictions'])
+    return result
+
+def register_housekeeping_tasks():
+    """Expire cache and deduplicator state in the background instead of on requests"""
+    seen_backends = set()
+    for name, cache in (('decision_cache', decision_cache),
+                        ('audio_decision_cache', audio_decision_cache),
+                        ('baseline_cache', baseline_cache)):
+        # Remote configurations share one backend between caches
+        if id(cache.backend) in seen_backends:
+            continue
+        seen_backends.add(id(cache.backend))
+        housekeeping.add_task(name, cache.backend.expire, interval_seconds=1.0)
+    
+    housekeeping.add_task(
+        'request_deduplicator',
+        lambda max_items: request_deduplicator.cleanup_stale_requests(max_items=max_items),
+        interval_seconds=1.0
+    )
+    housekeeping.add_task('caption_sessions', caption_tracker.expire, interval_seconds=5.0)
+    housekeeping.add_task('duck_windows', duck_windows.expire, interval_seconds=5.0)
+    housekeeping.add_task('onset_detector', expire_onset_sessions, interval_seconds=10.0)
+    housekeeping.add_task('event_feed', event_feed.expire, interval_seconds=30.0)
+    housekeeping.add_task('subtitle_rate_limiter', subtitle_rate_limiter.expire, interval_seconds=10.0)
+    housekeeping.add_task('audio_rate_limiter', audio_rate_limiter.expire, interval_seconds=10.0)
+    housekeeping.add_task('prefetch', prefetcher.expire, interval_seconds=10.0)
+    housekeeping.add_task('llm_keepalive', keep_llm_connections_alive,
+                          interval_seconds=LLM_KEEPALIVE_INTERVAL, batch_size=20)
+
+register_housekeeping_tasks()
+
+# --- READINESS PROBES ---
+# Dependencies are probed on the monitor's own thread (a gateway round trip
+# would stall housekeeping); /readyz only serves the cached result
+readiness = ReadinessMonitor(
+    interval_seconds=float(os.getenv('CREST_READINESS_INTERVAL', '5')),
+    stale_after=float(os.getenv('CREST_READINESS_STALE_SECONDS', '30'))
+)
+
+def probe_llm_gateway():
+    """Round trip to the gateway over the warm pool; heuristic mode needs no gateway"""
+    client = get_truefoundry_client()
+    if client is None:
+        return {'mode': 'heuristic'}
+    details = {'mode': 'llm'}
+    if llm_router is not None:
+        details['routes'] = {name: {'ewma_ms': route['ewma_ms'], 'errors': route['errors']}
+                             for name, route in llm_router.stats()['routes'].items()}
+    if llm_connection_pool is None:
+        return details
+    status_code, latency_ms = llm_connection_pool.ping()
+    if status_code >= 500:
+        raise RuntimeError(f"gateway answered {status_code}")
+    pool = llm_connection_pool.stats()
+    return dict(details, status_code=status_code, round_trip_ms=round(latency_ms, 3),
+                in_flight=pool['in_flight'], saturated=pool['saturated'])
+
+def probe_decision_caches():
+    """Entries per cache backend; remote backends make a round trip"""
+    fill = {}
+    for name, cache in (('subtitle', decision_cache), ('audio', audio_decision_cache)):
+        fill[name] = cache.backend.stats()
+    return fill
+
+def probe_metrics_sink():
+    if not startup_state['statsd_ready']:
+        raise RuntimeError(f"Datadog client not attached; {len(statsd.buffer)} metrics buffered")
+    return {'buffered': len(statsd.buffer)}
+
+def probe_queues():
+    """Depth of the work queues; fails if background housekeeping has stopped"""
+    if not housekeeping.running:
+        raise RuntimeError("housekeeping is not running")
+    scheduler = backend_scheduler.stats()
+    return {
+        'backend_in_flight': scheduler['in_flight'],
+        'backend_limit': scheduler['limit'],
+        'backend_shed': scheduler['shed'],
+        'journal_queue': traffic_journal.queue.qsize() if traffic_journal else None,
+        'feedback_queue': feedback_store.queue.qsize() if feedback_store else None,
+        'deduplicator_pending': sum(len(pending) for pending, _ in request_deduplicator.shards),
+    }
+
+readiness.register('llm_gateway', probe_llm_gateway)
+readiness.register('decision_cache', probe_decision_caches)
+readiness.register('metrics', probe_metrics_sink)
+readiness.register('queues', probe_queues, critical=True)
+
+def record_cascade_agreement(local_decision, ai_decision):
+    """Track how often the local model agrees with the LLM on escalated items"""
+    agreed = local_decision == ai_decision
+    with cascade_stats_lock:
+        cascade_stats['agree' if agreed else 'disagree'] += 1
+    statsd.increment('crest.cascade.agreement', tags=[f'agree:{str(agreed).lower()}'])
+
+# Define loud event keywords
+LOUD_EVENT_KEYWORDS = [
+    '[explosion]', '[gunshot]', '[dramatic music]', '[thunder]', 
+    '[crash]', '[bang]', '[boom]', '[screaming]', '[shouting]',
+    'explosion', 'gunshot', 'thunder', 'crash', 'bang', 'boom'
+]
+LOUD_EVENT_KEYWORD_MAX_LENGTH = max(len(keyword) for keyword in LOUD_EVENT_KEYWORDS)
+LOUD_EVENT_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in LOUD_EVENT_KEYWORDS))
+
+def matches_loud_event_rules(text):
+    """Check if any loud keywords are present (compiled rule set)"""
+    return LOUD_EVENT_PATTERN.search(text.strip().lower()) is not None
+
+def resolve_session_id(payload):
+    """Identify the video session a request belongs to, if the client says"""
+    for field in ('session_id', 'video_id', 'tab_id'):
+        value = payload.get(field)
+        if value not in (None, ''):
+            return str(value)
+    return None
+
+def resolve_client_id(payload):
+    """Rate-limit key: the extension-supplied client id, else the remote address"""
+    return str(payload.get('client_id') or request.headers.get('X-Crest-Client-Id') or request.remote_addr)
+
+def admit_client(limiter, payload, endpoint):
+    """Return a fast 429 response if the client is over its rate, else None"""
+    allowed, retry_after = limiter.allow(resolve_client_id(payload))
+    if allowed:
+        return None
+    statsd.increment('crest.admission.shed', tags=['reason:rate_limit', f'endpoint:{endpoint}'])
+    response = jsonify({"error": "Rate limit exceeded", "retry_after": round(retry_after, 3)})
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response, 429
+
+def resolve_deadline(payload):
+    """
+    Turn the client's time budget into a time.monotonic() deadline.
+    Accepts deadline_ms (remaining budget) or event_time/playback_time in
+    seconds of video time; returns None when the client sent neither.
+    """
+    try:
+        budget_ms = payload.get('deadline_ms')
+        if budget_ms is None and payload.get('event_time') is not None \
+                and payload.get('playback_time') is not None:
+            budget_ms = (float(payload['event_time']) - float(payload['playback_time'])) * 1000
+        if budget_ms is None:
+            return None
+        return time.monotonic() + float(budget_ms) / 1000
+    except (TypeError, ValueError):
+        return None
+
+def skip_late_path(planner, path, deadline, request_type):
+    """True if path's expected latency no longer fits before the deadline"""
+    if planner.fits(path, remaining_ms(deadline)):
+        return False
+    planner.record_avoided(path)
+    statsd.increment('crest.deadline.late_avoided', tags=[f'path:{path}', f'type:{request_type}'])
+    return True
+
+def start_latency_probe(planner, path, probe):
+    """Now and then run a path the deadline skipped in the background, so its estimate can recover"""
+    if not planner.claim_probe(path):
+        return
+    statsd.increment('crest.deadline.probe', tags=[f'path:{path}'])
+    threading.Thread(target=probe, name=f'crest-latency-probe-{path}', daemon=True).start()
+
+def backend_wait_budget(planner, deadline):
+    """Longest a deadline-bound request may queue for a backend slot, in seconds"""
+    left = remaining_ms(deadline)
+    if left is None:
+        return None
+    return max(0.0, left - planner.estimate('llm')) / 1000
+
+def record_path_latency(planner, path, latency_ms, deadline, request_type):
+    """Feed the latency estimate for path and count answers that came too late"""
+    planner.observe(path, latency_ms)
+    if deadline is not None and time.monotonic() > deadline:
+        planner.record_missed(path)
+        statsd.increment('crest.deadline.missed', tags=[f'path:{path}', f'type:{request_type}'])
+
+def acquire_backend_slot(work_class, timeout=None):
+    """Wait for a backend call slot; False means degrade to the cheaper path"""
+    if backend_scheduler.acquire(work_class, timeout):
+        statsd.gauge('crest.admission.backend_in_flight', backend_scheduler.in_flight)
+        return True
+    logger.warning("No backend slot available, degrading", extra={
+        'work_class': work_class,
+        'limit': backend_scheduler.total_concurrency
+    })
+    return False
+
+def analyze_rolling_caption(session_id, subtitle_text, deadline=None):
+    """
+    Classify a caption line that may extend the session's previous line.
+    Extensions are checked suffix-only against the compiled rules; full
+    classification (and its LLM call) is debounced while an earlier prefix
+    is in flight or too few words have been added since the last one.
+    """
+    update = caption_tracker.observe(session_id, subtitle_text)
+    
+    if update.kind == 'extension':
+        # Rules only need the new words plus enough context to catch a
+        # keyword split across the boundary ("[dramatic" + " music]")
+        window = normalize_caption(subtitle_text)[-(len(update.suffix) + LOUD_EVENT_KEYWORD_MAX_LENGTH):]
+        if update.previous_decision == 'YES' or LOUD_EVENT_PATTERN.search(window):
+            rule_hit = update.previous_decision != 'YES'
+            caption_tracker.record_incremental(session_id, 'YES', rule_hit)
+            note_decision_path('caption_rules' if rule_hit else 'caption_inherited')
+            statsd.increment('crest.captions.incremental',
+                             tags=['path:rules' if rule_hit else 'path:inherited'])
+            return 'YES'
+    
+    if update.kind != 'new' and not update.should_escalate:
+        caption_tracker.record_incremental(session_id, update.previous_decision or 'NO', False)
+        note_decision_path('caption_debounced')
+        statsd.increment('crest.captions.incremental', tags=['path:debounced'])
+        return update.previous_decision or 'NO'
+    
+    caption_tracker.start_classification(session_id, subtitle_text)
+    decision = None
+    try:
+        decision = analyze_subtitle_for_loud_events(subtitle_text, deadline=deadline)
+        return decision
+    finally:
+        caption_tracker.finish_classification(session_id, subtitle_text, decision)
+
+def analyze_subtitle_for_loud_events(subtitle_text, work_class='subtitle', deadline=None):
     """
     Analyze subtitle text to determine if it describes a loud event.
     Returns 'YES' or 'NO' based on AI analysis (Live Mode) or rule-based logic (Mock Mode).
-    Uses caching for performance optimization.
+    Uses caching for performance optimization. work_class picks the backend
+    scheduling queue ('subtitle' for live captions, 'bulk' for prefetch).
+    With a time.monotonic() deadline, paths that would answer too late are skipped.
     """
     # Check cache first
     cached_decision = decision_cache.get_cached_decision(subtitle_text)
@@ -169,148 +1044,171 @@ def analyze_subtitle_for_loud_events(subtitle_text):
             'cached_decision': cached_decision
         })
         statsd.increment('crest.cache.hit', tags=['type:subtitle'])
+        note_decision_path('cache')
         return cached_decision
     
     statsd.increment('crest.cache.miss', tags=['type:subtitle'])
     
     # Check for duplicate requests
     request_key = f"subtitle_{hashlib.md5(subtitle_text.encode()).hexdigest()}"
-    if request_deduplicator.is_duplicate(request_key):
+    if not request_deduplicator.try_acquire(request_key):
         logger.info("Duplicate request detected, using fallback", extra={
             'subtitle_text': subtitle_text
         })
         statsd.increment('crest.request.duplicate', tags=['type:subtitle'])
+        note_decision_path('duplicate')
         return 'NO'  # Safe fallback
     
-    request_deduplicator.add_request(request_key)
-    
+    probe_llm = False
     try:
         # Check if we have credentials to run in "Live Mode"
         client = get_truefoundry_client()
         if client and os.getenv("TRUEFOUNDRY_API_KEY"):
-        # LIVE MODE - Use TrueFoundry AI Gateway
-        try:
-            logger.info("Running in LIVE mode", extra={
-                'subtitle_text': subtitle_text,
-                'ai_provider': 'truefoundry'
-            })
+            # TIER 1 - Local classifier answers confident cases without a network call
+            local_prediction = None
+            if local_classifier_model is not None:
+                local_started = time.monotonic()
+                local_prediction = local_classifier_model.predict(subtitle_text)
+                subtitle_deadlines.observe('local', (time.monotonic() - local_started) * 1000)
+                local_decision, local_confidence = local_prediction
+                if local_classifier_model.is_confident(local_confidence):
+                    record_cascade_tier('local')
+                    logger.info("Local classifier decision", extra={
+                        'decision': local_decision,
+                        'confidence': local_confidence,
+                        'model_version': local_classifier_model.model_version,
+                        'subtitle_text': subtitle_text
+                    })
+                    decision_cache.cache_decision(subtitle_text, local_decision)
+                    return local_decision
             
-            # Increment AI request counter
-            statsd.increment('crest.ai.requests.total', tags=['provider:truefoundry'])
+            # An LLM answer that would arrive after the deadline can't help:
+            # use the best cheaper path instead (local model, then rules)
+            if skip_late_path(subtitle_deadlines, 'llm', deadline, 'subtitle'):
+                record_cascade_tier('deadline')
+                probe_llm = True
+                if local_prediction is not None:
+                    return local_prediction[0]
+                return 'YES' if matches_loud_event_rules(subtitle_text) else 'NO'
             
-            ai_start_time = time.time()
+            # Under overload fall back to the rules instead of queueing on the LLM
+            if not acquire_backend_slot(work_class, backend_wait_budget(subtitle_deadlines, deadline)):
+                record_cascade_tier('shed')
+                return 'YES' if matches_loud_event_rules(subtitle_text) else 'NO'
             
-            # Create prompt for loud event detection
-            prompt = f"Does the following text describe a loud noise: '{subtitle_text}'? Respond only with YES or NO."
+            # LIVE MODE - Use TrueFoundry AI Gateway
+            record_cascade_tier('llm')
+            try:
+                logger.info("Running in LIVE mode", extra={
+                    'subtitle_text': subtitle_text,
+                    'ai_provider': 'truefoundry'
+                })
             
-            # Call TrueFoundry AI Gateway with timeout
-            import signal
+                # Increment AI request counter
+                statsd.increment('crest.ai.requests.total', tags=['provider:truefoundry'])
             
-            def timeout_handler(signum, frame):
-                raise TimeoutError("AI request timeout")
+                ai_start_time = time.time()
             
-            # Set timeout for AI request (500ms as per requirements)
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(1)  # 1 second timeout (500ms was too aggressive for API calls)
+                # Create prompt for loud event detection
+                prompt = f"Does the following text describe a loud noise: '{subtitle_text}'? Respond only with YES or NO."
             
-            try:
-                response = client.chat.completions.create(
-                    model="openai-main/gpt-4o-mini",
+                # Call TrueFoundry AI Gateway with timeout. A per-request client
+                # timeout instead of SIGALRM, which only works on the main thread
+                # and so failed in threaded request handlers and worker pools.
+                response = get_llm_router(client).complete(
                     messages=[
                         {"role": "user", "content": prompt}
                     ],
                     max_tokens=10,
-                    temperature=0.1
+                    temperature=0.1,
+                    timeout=1.0  # 1 second timeout (500ms was too aggressive for API calls)
                 )
-            finally:
-                signal.alarm(0)  # Cancel timeout
             
-            ai_duration = time.time() - ai_start_time
+                ai_duration = time.time() - ai_start_time
+                record_path_latency(subtitle_deadlines, 'llm', ai_duration * 1000, deadline, 'subtitle')
             
-            # Extract the response
-            ai_decision = response.choices[0].message.content.strip().upper()
+                # Extract the response
+                ai_decision = response.choices[0].message.content.strip().upper()
             
-            # Validate response
-            if ai_decision not in ['YES', 'NO']:
-                logger.warning("AI returned unexpected response", extra={
-                    'ai_response': ai_decision,
-                    'expected': 'YES or NO'
+                # Validate response
+                if ai_decision not in ['YES', 'NO']:
+                    logger.warning("AI returned unexpected response", extra={
+                        'ai_response': ai_decision,
+                        'expected': 'YES or NO'
+                    })
+                    ai_decision = 'NO'  # Default to safe option
+            
+                if local_prediction is not None:
+                    record_cascade_agreement(local_prediction[0], ai_decision)
+            
+                # Log AI response
+                logger.info("OpenAI decision", extra={
+                    'decision': ai_decision,
+                    'ai_duration_ms': ai_duration * 1000,
+                    'subtitle_text': subtitle_text
                 })
-                ai_decision = 'NO'  # Default to safe option
             
-            # Log AI response
-            logger.info("OpenAI decision", extra={
-                'decision': ai_decision,
-                'ai_duration_ms': ai_duration * 1000,
-                'subtitle_text': subtitle_text
-            })
+                # Record metrics
+                statsd.histogram('crest.ai.duration', ai_duration, tags=['provider:truefoundry'])
+                statsd.increment(f'crest.openai.decision.{ai_decision.lower()}', tags=['provider:truefoundry'])
             
-            # Record metrics
-            statsd.histogram('crest.ai.duration', ai_duration, tags=['provider:truefoundry'])
-            statsd.increment(f'crest.openai.decision.{ai_decision.lower()}', tags=['provider:truefoundry'])
+                # Cache the decision
+                decision_cache.cache_decision(subtitle_text, ai_decision)
             
-            # Cache the decision
-            decision_cache.cache_decision(subtitle_text, ai_decision)
+                return ai_decision
             
-            return ai_decision
+            except Exception as e:
+                logger.error("OpenAI API call failed", extra={
+                    'error': str(e),
+                    'error_type': type(e).__name__,
+                    'subtitle_text': subtitle_text
+                })
             
-        except Exception as e:
-            logger.error("OpenAI API call failed", extra={
-                'error': str(e),
-                'error_type': type(e).__name__,
-                'subtitle_text': subtitle_text
-            })
+                # Increment error counter
+                statsd.increment('crest.openai.error', tags=[
+                    'provider:truefoundry',
+                    f'error_type:{type(e).__name__}'
+                ])
+                note_decision_path('llm_error')
             
-            # Increment error counter
-            statsd.increment('crest.openai.error', tags=[
-                'provider:truefoundry',
-                f'error_type:{type(e).__name__}'
-            ])
+                # Return safe default
+                return 'NO'
             
-            # Return safe default
-            return 'NO'
+            finally:
+                backend_scheduler.release(work_class)
     
-    else:
-        # MOCK MODE - Use rule-based logic
-        logger.warning("Running in MOCK mode (no API key found)", extra={
-            'subtitle_text': subtitle_text,
-            'mode': 'mock'
-        })
-        
-        # Simple rule-based detection
-        text_to_check = subtitle_text.strip().lower()
-        
-        # Define loud event keywords
-        loud_keywords = [
-            '[explosion]', '[gunshot]', '[dramatic music]', '[thunder]', 
-            '[crash]', '[bang]', '[boom]', '[screaming]', '[shouting]',
-            'explosion', 'gunshot', 'thunder', 'crash', 'bang', 'boom'
-        ]
+        else:
+            # MOCK MODE - Use rule-based logic
+            logger.warning("Running in MOCK mode (no API key found)", extra={
+                'subtitle_text': subtitle_text,
+                'mode': 'mock'
+            })
         
-        # Check if any loud keywords are present
-        decision = 'NO'
-        for keyword in loud_keywords:
-            if keyword in text_to_check:
-                decision = 'YES'
-                break
+            # Simple rule-based detection
+            decision = 'YES' if matches_loud_event_rules(subtitle_text) else 'NO'
+            note_decision_path('mock')
         
-        logger.info("Mock decision completed", extra={
-            'decision': decision,
-            'subtitle_text': subtitle_text,
-            'mode': 'mock'
-        })
+            logger.info("Mock decision completed", extra={
+                'decision': decision,
+                'subtitle_text': subtitle_text,
+                'mode': 'mock'
+            })
         
-        # Record mock metrics
-        statsd.increment(f'crest.mock_decision.{decision.lower()}', tags=['mode:mock'])
+            # Record mock metrics
+            statsd.increment(f'crest.mock_decision.{decision.lower()}', tags=['mode:mock'])
         
-        # Cache the decision
-        decision_cache.cache_decision(subtitle_text, decision)
+            # Cache the decision
+            decision_cache.cache_decision(subtitle_text, decision)
         
-        return decision
+            return decision
     
     finally:
         # Always remove from pending requests
         request_deduplicator.remove_request(request_key)
+        if probe_llm:
+            # Started after the text is released, so the probe isn't turned away as a duplicate
+            start_latency_probe(subtitle_deadlines, 'llm',
+                                lambda: analyze_subtitle_for_loud_events(subtitle_text, work_class='bulk'))
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -320,18 +1218,63 @@ app.config['DD_SERVICE'] = os.getenv('DD_SERVICE', 'crest-agent')
 app.config['DD_ENV'] = os.getenv('DD_ENV', 'development')
 app.config['DD_VERSION'] = os.getenv('DD_VERSION', '0.1.0')
 
-def cleanup_stale_requests():
-    """Periodic cleanup of stale requests and cache entries"""
-    request_deduplicator.cleanup_stale_requests()
+@app.before_request
+def ensure_background_work():
+    """WSGI hosts other than the entrypoints (gunicorn app:app, flask run) start it on the first request"""
+    if startup_state['pid'] != os.getpid():
+        start_background_initialization()
+
+@app.before_request
+def start_decision_trace():
+    decision_trace.path = None
+    decision_trace.response = None
+    decision_trace.started = time.perf_counter()
+
+@app.after_request
+def journal_exchange(response):
+    """Hand analyzed exchanges to the traffic journal's background writer and the event feed"""
+    if request.method != 'POST' or request.path not in JOURNALED_ENDPOINTS:
+        return response
+    payload = request.get_json(silent=True)
+    traced = getattr(decision_trace, 'response', None)
+    journal = traffic_journal
+    if isinstance(traced, tuple):
+        # The event only needs a couple of fields; the whole body is built for the journal alone
+        template, values = traced
+        action, confidence = template.field('action', values), template.field('confidence', values)
+        body = template.to_dict(**values) if journal is not None else None
+    else:
+        body = response.get_json(silent=True) if traced is None else traced
+        if isinstance(body, dict):
+            action, confidence = body.get('action'), body.get('confidence')
+        else:
+            action = confidence = None
+    path = getattr(decision_trace, 'path', None)
+    latency_ms = (time.perf_counter() - decision_trace.started) * 1000
+    if journal is not None:
+        journal.record(request.path, payload, body, response.status_code, path, latency_ms)
+    if response.status_code == 200 and action:
+        payload = payload if isinstance(payload, dict) else {}
+        video_id, playback_time = resolve_playback_position(payload)
+        event_feed.append(resolve_client_id(payload), {
+            'type': 'decision',
+            'endpoint': request.path,
+            'action': action,
+            'confidence': confidence,
+            'path': path,
+            'session_id': resolve_session_id(payload),
+            'video_id': video_id,
+            'playback_time': playback_time,
+            'latency_ms': round(latency_ms, 2)
+        })
+        if action == 'LOWER_VOLUME' and feedback_store is not None:
+            feedback_store.record_duck(path)
+    return response
 
 @app.route('/data', methods=['GET', 'POST'])
 def data():
     start_time = time.time()
     
-    # Periodic cleanup (every 10th request approximately)
-    if hash(str(time.time())) % 10 == 0:
-        cleanup_stale_requests()
-    
     # Log request
     logger.info("Processing /data request", extra={
         'method': request.method,
@@ -357,6 +1300,10 @@ def data():
                 statsd.increment('crest.requests.empty_text')
                 return jsonify({"error": "No text provided"}), 400
             
+            rejected = admit_client(subtitle_rate_limiter, data, '/data')
+            if rejected:
+                return rejected
+            
             logger.info("Received subtitle text for processing", extra={
                 'subtitle_length': len(subtitle_text),
                 'subtitle_preview': subtitle_text[:50] + '...' if len(subtitle_text) > 50 else subtitle_text
@@ -365,8 +1312,24 @@ def data():
             # Increment subtitle processing counter
             statsd.increment('crest.subtitle.received')
             
-            # Analyze subtitle with AI
-            ai_decision = analyze_subtitle_for_loud_events(subtitle_text)
+            if prefetcher.record_lookup(subtitle_text):
+                statsd.increment('crest.prefetch.hit')
+            
+            suppressed = suppressed_by_feedback(data)
+            if suppressed is not None:
+                statsd.histogram('crest.processing.duration', time.time() - start_time, tags=['endpoint:/data'])
+                if echoes_subtitle_text(data):
+                    suppressed['subtitle_text'] = subtitle_text
+                suppressed['processed'] = True
+                return json_response(suppressed)
+            
+            # Analyze subtitle with AI, incrementally for rolling captions
+            session_id = resolve_session_id(data)
+            deadline = resolve_deadline(data)
+            if session_id:
+                ai_decision = analyze_rolling_caption(session_id, subtitle_text, deadline)
+            else:
+                ai_decision = analyze_subtitle_for_loud_events(subtitle_text, deadline=deadline)
             
             # Determine response based on AI decision
             if ai_decision == 'YES':
@@ -379,14 +1342,8 @@ def data():
                 # Increment loud event detection metric
                 statsd.increment('crest.loud_event.detected')
                 
-                response_data = {
-                    "action": "LOWER_VOLUME",
-                    "level": 0.3,
-                    "duration": 5000,
-                    "confidence": ai_decision,
-                    "subtitle_text": subtitle_text,
-                    "processed": True
-                }
+                action = 'LOWER_VOLUME'
+                template = SUBTITLE_DUCK if echoes_subtitle_text(data) else SUBTITLE_DUCK_NO_ECHO
             else:
                 # No loud event - maintain current volume
                 logger.info("No loud event detected - maintaining volume", extra={
@@ -394,12 +1351,8 @@ def data():
                     'ai_decision': ai_decision
                 })
                 
-                response_data = {
-                    "action": "NONE",
-                    "confidence": ai_decision,
-                    "subtitle_text": subtitle_text,
-                    "processed": True
-                }
+                action = 'NONE'
+                template = SUBTITLE_NONE if echoes_subtitle_text(data) else SUBTITLE_NONE_NO_ECHO
             
             # Record processing time
             processing_time = time.time() - start_time
@@ -407,11 +1360,11 @@ def data():
             
             logger.info("Subtitle processing completed", extra={
                 'processing_time_ms': processing_time * 1000,
-                'action': response_data.get('action', 'UNKNOWN'),
+                'action': action,
                 'ai_decision': ai_decision
             })
             
-            return jsonify(response_data)
+            return template_response(template, confidence=ai_decision, subtitle_text=subtitle_text)
         else:
             # GET request - return simple hello
             response_data = {"message": "Hello"}
@@ -436,6 +1389,70 @@ def data():
         
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/prefetch', methods=['POST'])
+def prefetch_captions():
+    """Queue upcoming caption cues for background classification"""
+    statsd.increment('crest.requests.total', tags=[
+        'method:POST',
+        'endpoint:/prefetch'
+    ])
+    
+    data = request.get_json(silent=True)
+    cues = data.get('cues') if data else None
+    if not isinstance(cues, list):
+        return jsonify({"error": "cues must be a list of {text, start_time}"}), 400
+    
+    rejected = admit_client(subtitle_rate_limiter, data, '/prefetch')
+    if rejected:
+        return rejected
+    
+    try:
+        result = prefetcher.submit(cues, data.get('playback_time'))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid cue timing: {e}"}), 400
+    
+    statsd.increment('crest.prefetch.queued', result['queued'])
+    if result['dropped']:
+        statsd.increment('crest.prefetch.dropped', result['dropped'])
+    
+    logger.info("Prefetch cues submitted", extra=dict(result, cues=len(cues)))
+    return jsonify(result), 202
+
+def absorb_into_duck_window(session_id):
+    """Response for a spike inside the session's active duck window, else None"""
+    absorbed = duck_windows.absorb(session_id) if session_id else None
+    if absorbed is None:
+        return None
+    
+    window, extension_ms = absorbed
+    note_decision_path('duck_window')
+    statsd.increment('crest.audio.suppressed', tags=[
+        'window:extended' if extension_ms else 'window:active'
+    ])
+    if extension_ms:
+        return {
+            "action": "LOWER_VOLUME",
+            "level": window.level,
+            "duration": extension_ms,
+            "confidence": window.confidence,
+            "trigger": "audio_window_extension",
+            "transition_type": "smooth"
+        }
+    return {
+        "action": "NONE",
+        "confidence": window.confidence,
+        "trigger": "audio_window_active",
+        "suppressed": True
+    }
+
+def ducking_for_confidence(confidence):
+    """(level, duration_ms) of a volume reduction for an audio decision's confidence"""
+    if confidence > 0.8:
+        return 0.2, 4000  # Aggressive reduction for high confidence
+    elif confidence > 0.6:
+        return 0.3, 3000  # Moderate reduction for medium confidence
+    return 0.5, 2000  # Light reduction for low confidence
+
 @app.route('/audio-data', methods=['POST'])
 def handle_audio_data():
     """Process real-time audio analysis data"""
@@ -455,6 +1472,10 @@ def handle_audio_data():
         data = request.get_json()
         if not data:
             return jsonify({"error": "No data provided"}), 400
+        
+        rejected = admit_client(audio_rate_limiter, data, '/audio-data')
+        if rejected:
+            return rejected
             
         volume = data.get('volume', 0)
         baseline = data.get('baseline', 0)
@@ -467,8 +1488,19 @@ def handle_audio_data():
             'analysis_type': 'real_time_audio'
         })
         
+        # Moments the user corrected, and spikes inside an active duck window,
+        # are answered without re-analysis
+        session_id = resolve_session_id(data)
+        response_data = suppressed_by_feedback(data) or absorb_into_duck_window(session_id)
+        if response_data is not None:
+            statsd.histogram('crest.processing.duration', time.time() - start_time,
+                             tags=['endpoint:/audio-data'])
+            return json_response(response_data)
+        
         # Enhanced AI audio analysis with confidence
-        ai_decision, confidence = analyze_audio_for_loud_events(volume, baseline, spike)
+        ai_decision, confidence = analyze_audio_for_loud_events(
+            volume, baseline, spike, deadline=resolve_deadline(data)
+        )
         
         if ai_decision == 'YES':
             logger.info("Loud audio event confirmed by enhanced AI", extra={
@@ -481,17 +1513,13 @@ def handle_audio_data():
             statsd.increment('crest.loud_event.audio_detected')
             
             # Dynamic response based on confidence and spike magnitude
-            if confidence > 0.8:
-                level = 0.2  # Aggressive reduction for high confidence
-                duration = 4000
-            elif confidence > 0.6:
-                level = 0.3  # Moderate reduction for medium confidence
-                duration = 3000
-            else:
-                level = 0.5  # Light reduction for low confidence
-                duration = 2000
+            level, duration = ducking_for_confidence(confidence)
             
-            response_data = {
+            if session_id:
+                duck_windows.open(session_id, level, duration, confidence)
+            
+            # volume_data echoes the request, so this shape is encoded every time
+            response = json_response({
                 "action": "LOWER_VOLUME",
                 "level": level,
                 "duration": duration,
@@ -503,18 +1531,14 @@ def handle_audio_data():
                     "baseline": baseline,
                     "spike": spike
                 }
-            }
+            })
         else:
-            response_data = {
-                "action": "NONE",
-                "confidence": confidence,
-                "trigger": "audio_analysis"
-            }
+            response = template_response(AUDIO_NONE, confidence=confidence)
         
         processing_time = time.time() - start_time
         statsd.histogram('crest.processing.duration', processing_time, tags=['endpoint:/audio-data'])
         
-        return jsonify(response_data)
+        return response
         
     except Exception as e:
         logger.error("Error processing audio data", extra={
@@ -529,20 +1553,132 @@ def handle_audio_data():
         
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/audio-spectrum', methods=['POST'])
+def handle_audio_spectrum():
+    """
+    Classify a batch of analyser frequency frames (oldest first, spike last)
+    locally from band energies, spectral flux and crest factors
+    """
+    start_time = time.time()
+    statsd.increment('crest.requests.total', tags=[
+        'method:POST',
+        'endpoint:/audio-spectrum'
+    ])
+    
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    
+    rejected = admit_client(audio_rate_limiter, data, '/audio-spectrum')
+    if rejected:
+        return rejected
+    
+    # NumPy stays out of import time; background init loads it ahead of the first request
+    from spectral_features import SpectrumError, classify_spectrum, spectral_features, to_frames
+    try:
+        frames = to_frames(data.get('frames'))
+        sample_rate = float(data.get('sample_rate', 48000))
+        if not 8000 <= sample_rate <= 192000:
+            raise SpectrumError("sample_rate must be between 8000 and 192000")
+    except (SpectrumError, TypeError, ValueError) as e:
+        statsd.increment('crest.spectrum.invalid')
+        return jsonify({"error": str(e)}), 400
+    
+    session_id = resolve_session_id(data)
+    response_data = suppressed_by_feedback(data) or absorb_into_duck_window(session_id)
+    if response_data is None:
+        features = spectral_features(frames, sample_rate)
+        decision, confidence, kind = classify_spectrum(features)
+        note_decision_path('spectral')
+        statsd.increment('crest.spectrum.decision', tags=[f'kind:{kind}', f'decision:{decision.lower()}'])
+        
+        response_data = {
+            "action": "NONE",
+            "confidence": confidence,
+            "trigger": "spectral_analysis",
+            "kind": kind,
+            "features": features
+        }
+        if decision == 'YES':
+            level, duration = ducking_for_confidence(confidence)
+            if session_id:
+                duck_windows.open(session_id, level, duration, confidence)
+            response_data.update(action="LOWER_VOLUME", level=level, duration=duration,
+                                 transition_type="smooth")
+            statsd.increment('crest.loud_event.audio_detected', tags=['trigger:spectral'])
+    
+    statsd.histogram('crest.processing.duration', time.time() - start_time,
+                     tags=['endpoint:/audio-spectrum'])
+    return json_response(response_data)
+
+MAX_LEVEL_FRAMES = 100
+
+@app.route('/audio-levels', methods=['POST'])
+def handle_audio_levels():
+    """
+    Stream a session's per-frame audio levels (RMS, 0..1) through its
+    server-side onset detector; an onset ducks without any further analysis
+    """
+    start_time = time.time()
+    statsd.increment('crest.requests.total', tags=[
+        'method:POST',
+        'endpoint:/audio-levels'
+    ])
+    
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    
+    session_id = resolve_session_id(data)
+    levels = data.get('levels')
+    if not session_id:
+        return jsonify({"error": "session_id is required"}), 400
+    if not isinstance(levels, list) or not 0 < len(levels) <= MAX_LEVEL_FRAMES:
+        return jsonify({"error": f"levels must be a list of 1-{MAX_LEVEL_FRAMES} numbers"}), 400
+    try:
+        levels = [min(1.0, max(0.0, float(level))) for level in levels]
+    except (TypeError, ValueError):
+        return jsonify({"error": "levels must be numbers"}), 400
+    
+    rejected = admit_client(audio_rate_limiter, data, '/audio-levels')
+    if rejected:
+        return rejected
+    
+    detector = get_onset_detector()
+    onsets = detector.process(session_id, levels)
+    note_decision_path('onset')
+    if not onsets:
+        response = template_response(ONSET_NONE, phase=detector.phase(session_id))
+    else:
+        statsd.increment('crest.onset.detected', len(onsets))
+        # An onset inside an active duck window is absorbed like a spike on /audio-data
+        response_data = suppressed_by_feedback(data) or absorb_into_duck_window(session_id)
+        if response_data is None:
+            onset = max(onsets, key=lambda o: o.strength)
+            confidence = round(min(0.99, 0.5 + onset.strength), 3)
+            level, duration = ducking_for_confidence(confidence)
+            duck_windows.open(session_id, level, duration, confidence)
+            statsd.increment('crest.loud_event.audio_detected', tags=['trigger:onset'])
+            response_data = {
+                "action": "LOWER_VOLUME",
+                "level": level,
+                "duration": duration,
+                "confidence": confidence,
+                "trigger": "onset_detector",
+                "transition_type": "smooth",
+                "onset": onset._asdict()
+            }
+        response = json_response(response_data)
+    
+    statsd.histogram('crest.processing.duration', time.time() - start_time,
+                     tags=['endpoint:/audio-levels'])
+    return response
+
 def calculate_audio_confidence(spike, volume, baseline, ai_decision):
     """Calculate confidence level for audio-based decisions"""
     
-    # Base confidence on spike magnitude
-    if spike > 0.5:
-        base_confidence = 0.95
-    elif spike > 0.4:
-        base_confidence = 0.85
-    elif spike > 0.3:
-        base_confidence = 0.75
-    elif spike > 0.2:
-        base_confidence = 0.6
-    else:
-        base_confidence = 0.4
+    # Base confidence on spike magnitude, tiered by the loaded thresholds
+    base_confidence = audio_thresholds.spike_confidence(spike)
     
     # Adjust based on absolute volume level
     if volume > 0.8:
@@ -551,7 +1687,7 @@ def calculate_audio_confidence(spike, volume, baseline, ai_decision):
         base_confidence -= 0.1
     
     # Adjust based on AI agreement with heuristics
-    heuristic_decision = 'YES' if spike > 0.25 else 'NO'
+    heuristic_decision = 'YES' if spike > audio_thresholds.agreement_spike else 'NO'
     if ai_decision == heuristic_decision:
         base_confidence += 0.1
     else:
@@ -559,21 +1695,45 @@ def calculate_audio_confidence(spike, volume, baseline, ai_decision):
     
     return max(0.1, min(0.99, base_confidence))
 
-def analyze_audio_for_loud_events(volume, baseline, spike):
+def analyze_audio_for_loud_events(volume, baseline, spike, deadline=None):
     """
     Enhanced audio analysis with improved AI + heuristics and confidence calculation.
+    With a time.monotonic() deadline the LLM is skipped if it would answer too late.
     """
     # Quick heuristic pre-filter for obvious cases
-    if spike < 0.1:
+    thresholds = audio_thresholds
+    if spike < thresholds.quiet_spike:
+        note_decision_path('prefilter')
         return 'NO', 0.9  # Very confident it's not loud
-    elif spike > 0.6:
+    elif spike > thresholds.loud_spike:
+        note_decision_path('prefilter')
         return 'YES', 0.95  # Very confident it's loud
     
     # Get AI client for borderline cases
     client = get_truefoundry_client()
+    live = client and os.getenv("TRUEFOUNDRY_API_KEY")
     ai_decision = 'NO'
     
-    if client and os.getenv("TRUEFOUNDRY_API_KEY"):
+    # Reuse AI decisions for near-identical audio levels
+    audio_key = quantize_audio_key(volume, baseline, spike)
+    cached_audio_decision = audio_decision_cache.get_cached_decision(audio_key) if client else None
+    
+    if cached_audio_decision:
+        statsd.increment('crest.cache.hit', tags=['type:audio'])
+        note_decision_path('cache')
+        ai_decision = cached_audio_decision
+    
+    elif live and skip_late_path(audio_deadlines, 'llm', deadline, 'audio'):
+        # Too late for the LLM: heuristics now, and an occasional LLM call off
+        # the request so the latency estimate keeps being measured
+        start_latency_probe(audio_deadlines, 'llm',
+                            lambda: analyze_audio_for_loud_events(volume, baseline, spike))
+        note_decision_path('heuristic')
+        ai_decision = thresholds.heuristic_decision(volume, baseline, spike)
+    
+    elif live and acquire_backend_slot('audio', backend_wait_budget(audio_deadlines, deadline)):
+        statsd.increment('crest.cache.miss', tags=['type:audio'])
+        note_decision_path('llm')
         try:
             logger.info("Running enhanced audio analysis in LIVE mode", extra={
                 'volume': volume,
@@ -607,14 +1767,14 @@ Avoid triggering on:
 
 Should the volume be temporarily lowered? Respond only with YES or NO."""
             
-            response = client.chat.completions.create(
-                model="openai-main/gpt-4o-mini",
+            response = get_llm_router(client).complete(
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=5,
                 temperature=0.1
             )
             
             ai_duration = time.time() - ai_start_time
+            record_path_latency(audio_deadlines, 'llm', ai_duration * 1000, deadline, 'audio')
             ai_decision = response.choices[0].message.content.strip().upper()
             
             if ai_decision not in ['YES', 'NO']:
@@ -635,6 +1795,8 @@ Should the volume be temporarily lowered? Respond only with YES or NO."""
             statsd.histogram('crest.ai.duration', ai_duration, tags=['provider:truefoundry', 'type:audio'])
             statsd.increment(f'crest.openai.audio_decision.{ai_decision.lower()}', tags=['provider:truefoundry'])
             
+            audio_decision_cache.cache_decision(audio_key, ai_decision)
+            
         except Exception as e:
             logger.error("Enhanced OpenAI audio analysis failed", extra={
                 'error': str(e),
@@ -650,7 +1812,11 @@ Should the volume be temporarily lowered? Respond only with YES or NO."""
             ])
             
             # Fallback to heuristic
-            ai_decision = 'YES' if spike > 0.3 else 'NO'
+            note_decision_path('llm_error')
+            ai_decision = 'YES' if spike > thresholds.fallback_spike else 'NO'
+        
+        finally:
+            backend_scheduler.release('audio')
     
     else:
         # No AI available - use enhanced heuristics
@@ -662,16 +1828,8 @@ Should the volume be temporarily lowered? Respond only with YES or NO."""
         })
         
         # Enhanced heuristic rules
-        spike_ratio = spike / baseline if baseline > 0.05 else spike / 0.05
-        
-        if spike > 0.4:  # Very large absolute spike
-            ai_decision = 'YES'
-        elif spike > 0.3 and volume > 0.6:  # Large spike with high volume
-            ai_decision = 'YES'
-        elif spike > 0.25 and spike_ratio > 3.0:  # Significant relative spike
-            ai_decision = 'YES'
-        else:
-            ai_decision = 'NO'
+        note_decision_path('heuristic')
+        ai_decision = thresholds.heuristic_decision(volume, baseline, spike)
     
     # Calculate confidence level
     confidence = calculate_audio_confidence(spike, volume, baseline, ai_decision)
@@ -709,19 +1867,175 @@ def handle_feedback():
         'type:user_correction'
     ])
     
+    payload = request.get_json(silent=True) or {}
+    client_id = resolve_client_id(payload)
+    video_id, playback_time = resolve_playback_position(payload)
+    
+    # The correction is about the client's last duck, if that was recent
+    corrected = event_feed.latest(client_id, 'LOWER_VOLUME')
+    if corrected is not None and time.time() - corrected['timestamp'] > FEEDBACK_ATTRIBUTION_SECONDS:
+        corrected = None
+    if corrected is not None and corrected.get('playback_time') is not None \
+            and corrected.get('video_id') in (None, video_id):
+        video_id = corrected.get('video_id') or video_id
+        playback_time = corrected['playback_time']
+    
+    event_feed.append(client_id, {
+        'type': 'user_correction',
+        'session_id': resolve_session_id(payload),
+        'video_id': video_id,
+        'playback_time': playback_time,
+        'path': corrected['path'] if corrected else None
+    })
+    if feedback_store is not None:
+        # Queued for the background writer; the suppression index updates immediately
+        feedback_store.record_correction(
+            client_id=client_id,
+            video_id=video_id,
+            playback_time=playback_time,
+            path=corrected['path'] if corrected else None,
+            endpoint=corrected['endpoint'] if corrected else None,
+            confidence=corrected['confidence'] if corrected else None
+        )
+    
     return jsonify({"status": "ok"})
 
+@app.route('/feedback/corrections', methods=['GET'])
+def feedback_corrections():
+    """Stored corrections of one video, in playback order"""
+    video_id = request.args.get('video_id')
+    if not video_id:
+        return jsonify({"error": "video_id is required"}), 400
+    if feedback_store is None:
+        return jsonify({"error": "Feedback store disabled"}), 503
+    return jsonify({"video_id": video_id, "corrections": feedback_store.corrections_for_video(video_id)})
+
+@app.route('/feedback/false-positives', methods=['GET'])
+def feedback_false_positives():
+    """Corrections over ducks per decision path, over the last window seconds (default an hour)"""
+    if feedback_store is None:
+        return jsonify({"error": "Feedback store disabled"}), 503
+    try:
+        window = max(60.0, min(float(request.args.get('window', 3600)), 30 * 86400.0))
+    except ValueError:
+        return jsonify({"error": "window must be a number of seconds"}), 400
+    return jsonify({"window_seconds": window, "paths": feedback_store.false_positive_rates(window)})
+
+def parse_events_query():
+    """(client_id or None for every client, since cursor, limit) from the query string"""
+    client_id = request.args.get('client_id') or request.headers.get('X-Crest-Client-Id') or None
+    # EventSource resends the last id it saw when it reconnects
+    since = request.args.get('since') or request.headers.get('Last-Event-ID') or 0
+    limit = request.args.get('limit', 100)
+    try:
+        since, limit = int(since), int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("since and limit must be integers")
+    return client_id, max(0, since), max(1, min(limit, EVENTS_MAX_LIMIT))
+
+@app.route('/events', methods=['GET'])
+def events():
+    """Decisions after the since cursor, plus running stats; poll again with the returned cursor"""
+    try:
+        client_id, since, limit = parse_events_query()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    statsd.increment('crest.events.polls')
+    return jsonify(event_feed.read(client_id, since, limit))
+
+@app.route('/events/stream', methods=['GET'])
+def events_stream():
+    """Server-sent events: one message per decision, then a reconnect after EVENTS_STREAM_SECONDS"""
+    try:
+        client_id, since, limit = parse_events_query()
+        duration = min(float(request.args.get('timeout', EVENTS_STREAM_SECONDS)), EVENTS_STREAM_SECONDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    statsd.increment('crest.events.streams')
+    
+    def generate(cursor):
+        ends_at = time.monotonic() + duration
+        yield "retry: 1000\n\n"
+        while True:
+            remaining = ends_at - time.monotonic()
+            if remaining <= 0:
+                return
+            result = event_feed.wait(client_id, cursor, limit,
+                                     timeout=min(remaining, EVENTS_HEARTBEAT_SECONDS))
+            if not result['events']:
+                # Comment line: keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            for event in result['events']:
+                yield f"id: {event['seq']}\nevent: decision\ndata: {json.dumps(event)}\n\n"
+            cursor = result['cursor']
+            yield f"event: stats\ndata: {json.dumps(result['stats'])}\n\n"
+    
+    return Response(stream_with_context(generate(since)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+LIVENESS_BODY = b'{"status":"alive"}'
+
+@app.route('/livez', methods=['GET'])
+def livez():
+    """Liveness: the process answers. No logging, metrics or dependency checks"""
+    return LIVENESS_BODY, 200, {'Content-Type': 'application/json'}
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness from the background probes' last round (503 until ready or if stale)"""
+    body, status = readiness.response()
+    return body, status, {'Content-Type': 'application/json'}
+
 @app.route('/health', methods=['GET'])
 def health():
-    """Health check endpoint for monitoring"""
-    logger.info("Health check requested")
+    """Detailed state for dashboards and debugging; orchestrators should poll /livez and /readyz"""
+    logger.debug("Health check requested")
     statsd.increment('crest.health.checks')
     
+    # Mock and heuristic paths serve as soon as the app is imported; Datadog
+    # and the LLM client finish loading in the background. "ready" is the
+    # same answer /readyz gives
+    readiness_snapshot = readiness.snapshot()
     return jsonify({
         "status": "healthy",
+        "ready": readiness_snapshot['ready'],
         "service": app.config['DD_SERVICE'],
         "version": app.config['DD_VERSION'],
-        "environment": app.config['DD_ENV']
+        "environment": app.config['DD_ENV'],
+        "housekeeping": housekeeping.stats(),
+        "captions": caption_tracker.stats(),
+        "duck_windows": duck_windows.stats(),
+        "onsets": onset_detector.stats() if onset_detector else None,
+        "events": event_feed.stats(),
+        "feedback": feedback_store.stats() if feedback_store else None,
+        "admission": {
+            "backend": backend_scheduler.stats(),
+            "subtitle_rate": subtitle_rate_limiter.stats(),
+            "audio_rate": audio_rate_limiter.stats()
+        },
+        "prefetch": prefetcher.stats(),
+        "llm_pool": llm_connection_pool.stats() if llm_connection_pool else None,
+        "llm_router": llm_router.stats() if llm_router else None,
+        "precomputed": precomputed_decisions.stats() if precomputed_decisions else None,
+        "journal": traffic_journal.stats() if traffic_journal else None,
+        "audio_thresholds": dict(audio_thresholds.values(), version=audio_thresholds.version),
+        "deadlines": {
+            "subtitle": subtitle_deadlines.stats(),
+            "audio": audio_deadlines.stats()
+        },
+        "cascade": dict(
+            cascade_stats,
+            model_version=local_classifier_model.model_version if local_classifier_model else None
+        ),
+        "readiness": readiness_snapshot,
+        "startup": {
+            "started": startup_state['started'],
+            "completed": startup_state['background_init_ms'] is not None,
+            "statsd_ready": startup_state['statsd_ready'],
+            "llm_client_ready": startup_state['llm_client_ready'],
+            "background_init_ms": startup_state['background_init_ms']
+        }
     })
 
 if __name__ == '__main__':
@@ -732,4 +2046,5 @@ if __name__ == '__main__':
         'port': 5003
     })
     
+    start_background_initialization()
     app.run(debug=True, host='0.0.0.0', port=5003)
\ No newline at end of file
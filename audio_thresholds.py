@@ -0,0 +1,117 @@
+"""
+Spike thresholds for the audio decision path.
+
+analyze_audio_for_loud_events answers clear-cut spikes with a pre-filter,
+escalates the band in between to the LLM and falls back to heuristic rules
+when no LLM answer is available. The defaults below are the original
+hand-picked constants; tune_thresholds.py fits them to recorded traces and
+writes a versioned file that app.py loads at startup
+(CREST_AUDIO_THRESHOLDS_PATH).
+"""
+import json
+
+THRESHOLDS_FORMAT = 'crest-audio-thresholds'
+THRESHOLDS_FORMAT_VERSION = 1
+
+DEFAULT_AUDIO_THRESHOLDS = {
+    # Pre-filter: below quiet_spike is NO, above loud_spike is YES, the band between escalates
+    'quiet_spike': 0.1,
+    'loud_spike': 0.6,
+    # Heuristic rules when the LLM is unavailable
+    'heuristic_spike': 0.4,
+    'heuristic_volume_spike': 0.3,
+    'heuristic_volume': 0.6,
+    'heuristic_ratio_spike': 0.25,
+    'heuristic_ratio': 3.0,
+    # Single-threshold rule for LLM errors, and the heuristic the confidence
+    # calculation checks the decision against
+    'fallback_spike': 0.3,
+    'agreement_spike': 0.25,
+    # Spike tiers for the served confidence (0.95 / 0.85 / 0.75 / 0.6 above
+    # each, 0.4 below the last); tuning shifts them with fallback_spike
+    'confidence_spike_high': 0.5,
+    'confidence_spike_strong': 0.4,
+    'confidence_spike_moderate': 0.3,
+    'confidence_spike_weak': 0.2,
+}
+
+CONFIDENCE_TIERS = (
+    ('confidence_spike_high', 0.95),
+    ('confidence_spike_strong', 0.85),
+    ('confidence_spike_moderate', 0.75),
+    ('confidence_spike_weak', 0.6),
+)
+
+
+class ThresholdsFormatError(Exception):
+    """Raised when a thresholds file is malformed or has an unsupported version"""
+
+
+class AudioThresholds:
+    """Named audio thresholds, defaulting to the hand-picked constants"""
+    def __init__(self, version='default', metadata=None, **thresholds):
+        unknown = set(thresholds) - set(DEFAULT_AUDIO_THRESHOLDS)
+        if unknown:
+            raise ThresholdsFormatError(f"Unknown thresholds: {', '.join(sorted(unknown))}")
+        self.version = version
+        self.metadata = metadata or {}
+        for name, default in DEFAULT_AUDIO_THRESHOLDS.items():
+            setattr(self, name, float(thresholds.get(name, default)))
+        if self.quiet_spike > self.loud_spike:
+            raise ThresholdsFormatError("quiet_spike must not exceed loud_spike")
+        tiers = [getattr(self, name) for name, _ in CONFIDENCE_TIERS]
+        if tiers != sorted(tiers, reverse=True):
+            raise ThresholdsFormatError("confidence spike tiers must not increase")
+
+    def values(self):
+        return {name: getattr(self, name) for name in DEFAULT_AUDIO_THRESHOLDS}
+
+    def heuristic_decision(self, volume, baseline, spike):
+        """The rule-based decision used when no LLM answer is available"""
+        spike_ratio = spike / baseline if baseline > 0.05 else spike / 0.05
+        if spike > self.heuristic_spike:  # Very large absolute spike
+            return 'YES'
+        if spike > self.heuristic_volume_spike and volume > self.heuristic_volume:  # Large spike with high volume
+            return 'YES'
+        if spike > self.heuristic_ratio_spike and spike_ratio > self.heuristic_ratio:  # Significant relative spike
+            return 'YES'
+        return 'NO'
+
+    def spike_confidence(self, spike):
+        """Base confidence of an audio decision from the spike tier it falls in"""
+        for name, confidence in CONFIDENCE_TIERS:
+            if spike > getattr(self, name):
+                return confidence
+        return 0.4
+
+    def to_dict(self):
+        return {
+            'format': THRESHOLDS_FORMAT,
+            'format_version': THRESHOLDS_FORMAT_VERSION,
+            'version': self.version,
+            'thresholds': {name: round(value, 6) for name, value in self.values().items()},
+            'metadata': self.metadata,
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('format') != THRESHOLDS_FORMAT:
+            raise ThresholdsFormatError("Not a Crest audio thresholds file")
+        if data.get('format_version') != THRESHOLDS_FORMAT_VERSION:
+            raise ThresholdsFormatError(
+                f"Unsupported thresholds format version {data.get('format_version')} "
+                f"(expected {THRESHOLDS_FORMAT_VERSION})"
+            )
+        try:
+            return cls(version=data['version'], metadata=data.get('metadata', {}), **data['thresholds'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ThresholdsFormatError(f"Invalid thresholds file: {e}") from e
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
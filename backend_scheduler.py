@@ -0,0 +1,159 @@
+"""
+Priority scheduling of outbound classification calls.
+
+Real-time audio, live subtitle and bulk/prefetch work share one pool of
+backend (LLM) call slots. Each work class has its own FIFO queue, a weight
+and a concurrency cap; free slots go to the eligible class with the lowest
+virtual pass (stride scheduling), so a queued audio decision is granted
+ahead of caption work and bulk jobs can never occupy the whole pool.
+
+Request threads wait for a slot in place and give up after their class's
+max_wait, so callers can degrade to a cheaper decision path instead of
+queueing indefinitely.
+"""
+import threading
+import time
+from collections import deque
+
+
+class WorkClass:
+    def __init__(self, name, weight, max_concurrency, max_queue, max_wait):
+        self.name = name
+        self.stride = 1.0 / weight
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.queue = deque()
+        self.in_flight = 0
+        self.pass_value = 0.0
+        self.granted = 0
+        self.shed = 0
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+
+    def stats(self):
+        return {
+            'weight': self.weight,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'queued': len(self.queue),
+            'granted': self.granted,
+            'shed': self.shed,
+            'avg_queue_ms': round(self.total_queue_time / self.granted * 1000, 3) if self.granted else 0.0,
+            'max_queue_ms': round(self.max_queue_time * 1000, 3),
+        }
+
+
+class Waiter:
+    __slots__ = ('granted', 'enqueued_at')
+
+    def __init__(self):
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+class PriorityScheduler:
+    """Weighted fair dispatch of backend call slots across work classes"""
+    def __init__(self, total_concurrency, classes, on_grant=None, on_shed=None):
+        """
+        classes maps name -> dict(weight, max_concurrency, max_queue, max_wait).
+        on_grant(name, queue_seconds) and on_shed(name, reason) are called
+        outside the scheduler lock for metrics.
+        """
+        self.total_concurrency = total_concurrency
+        self.classes = {name: WorkClass(name, **config) for name, config in classes.items()}
+        self.in_flight = 0
+        self.peak = 0
+        self.virtual_time = 0.0
+        self.condition = threading.Condition()
+        self.on_grant = on_grant
+        self.on_shed = on_shed
+
+    def _has_capacity(self, work_class):
+        return (self.in_flight < self.total_concurrency
+                and work_class.in_flight < work_class.max_concurrency)
+
+    def _grant(self, work_class):
+        work_class.pass_value = max(work_class.pass_value, self.virtual_time)
+        self.virtual_time = work_class.pass_value
+        work_class.pass_value += work_class.stride
+        work_class.in_flight += 1
+        work_class.granted += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+
+    def _dispatch(self):
+        """Hand free slots to queued waiters, lowest pass first"""
+        granted_any = False
+        while self.in_flight < self.total_concurrency:
+            eligible = [c for c in self.classes.values()
+                        if c.queue and c.in_flight < c.max_concurrency]
+            if not eligible:
+                break
+            work_class = min(eligible, key=lambda c: (max(c.pass_value, self.virtual_time), -c.weight))
+            self._grant(work_class)
+            work_class.queue.popleft().granted = True
+            granted_any = True
+        if granted_any:
+            self.condition.notify_all()
+
+    def acquire(self, name, timeout=None):
+        """
+        Wait for a backend slot for work class `name`.
+        Returns False (shed) if the class queue is full or no slot frees up
+        within the timeout (never longer than the class's max_wait).
+        """
+        work_class = self.classes[name]
+        timeout = work_class.max_wait if timeout is None else min(timeout, work_class.max_wait)
+        with self.condition:
+            if not work_class.queue and self._has_capacity(work_class):
+                self._grant(work_class)
+                queue_time, shed_reason = 0.0, None
+            elif len(work_class.queue) >= work_class.max_queue:
+                work_class.shed += 1
+                shed_reason = 'queue_full'
+            else:
+                waiter = Waiter()
+                work_class.queue.append(waiter)
+                self._dispatch()
+                deadline = waiter.enqueued_at + timeout
+                while not waiter.granted:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                if waiter.granted:
+                    queue_time, shed_reason = time.monotonic() - waiter.enqueued_at, None
+                else:
+                    work_class.queue.remove(waiter)
+                    work_class.shed += 1
+                    shed_reason = 'queue_timeout'
+
+            if shed_reason is None:
+                work_class.total_queue_time += queue_time
+                work_class.max_queue_time = max(work_class.max_queue_time, queue_time)
+
+        if shed_reason is not None:
+            if self.on_shed:
+                self.on_shed(name, shed_reason)
+            return False
+        if self.on_grant:
+            self.on_grant(name, queue_time)
+        return True
+
+    def release(self, name):
+        with self.condition:
+            self.classes[name].in_flight -= 1
+            self.in_flight -= 1
+            self._dispatch()
+
+    def stats(self):
+        with self.condition:
+            return {
+                'limit': self.total_concurrency,
+                'in_flight': self.in_flight,
+                'peak': self.peak,
+                'shed': sum(c.shed for c in self.classes.values()),
+                'classes': {name: c.stats() for name, c in self.classes.items()},
+            }
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the Crest server
+Measures cold `import app` in fresh interpreters and fails when the median
+exceeds the budget or a deferred dependency is loaded eagerly.
+
+Usage: python bench_import_time.py [--runs 7] [--budget-ms 400]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Dependencies that must load in the background, never at import
+DEFERRED_MODULES = ('openai', 'datadog', 'multiprocessing.managers', 'numpy')
+
+PROBE = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import app\n"
+    "elapsed_ms = (time.perf_counter() - start) * 1000\n"
+    "print(json.dumps({'import_ms': elapsed_ms, "
+    "'eager': [m for m in %r if m in sys.modules]}))\n"
+) % (DEFERRED_MODULES,)
+
+
+def measure_import(runs):
+    """Import app in `runs` fresh interpreters and collect timings"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = {k: v for k, v in os.environ.items() if not k.startswith('CREST_SHARED_CACHE')}
+    samples = []
+    eager = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE],
+            cwd=here, env=env, capture_output=True, text=True, check=True
+        )
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(report['import_ms'])
+        eager.update(report['eager'])
+    return samples, sorted(eager)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark `import app`")
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budget-ms', type=float,
+                        default=float(os.getenv('CREST_IMPORT_BUDGET_MS', '400')))
+    args = parser.parse_args()
+
+    samples, eager = measure_import(args.runs)
+    median = statistics.median(samples)
+
+    print("⏱️  CREST IMPORT-TIME BENCHMARK")
+    print("=" * 40)
+    print(f"   Runs:    {args.runs}")
+    print(f"   Median:  {median:.1f} ms")
+    print(f"   Min/Max: {min(samples):.1f} / {max(samples):.1f} ms")
+    print(f"   Budget:  {args.budget_ms:.0f} ms")
+
+    ok = True
+    if eager:
+        print(f"❌ Deferred modules imported eagerly: {', '.join(eager)}")
+        ok = False
+    if median > args.budget_ms:
+        print("❌ Median import time over budget")
+        ok = False
+    if ok:
+        print("✅ Import time within budget")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
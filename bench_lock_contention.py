@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Lock contention microbenchmark for Crest's shared caches
+Hammers the decision cache and request deduplicator from many threads, once
+with a single global lock (the original layout) and once lock-striped, and
+reports throughput and time spent waiting for locks.
+
+Usage: python bench_lock_contention.py [--threads 16] [--ops 20000] [--shards 16]
+"""
+import argparse
+import random
+import threading
+import time
+
+from cache_backends import MemoryBackend, ShardedMemoryBackend
+
+
+class TimedLock:
+    """threading.Lock that accumulates how long callers waited to acquire it"""
+    all_locks = []
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wait_ns = 0
+        self.acquisitions = 0
+        TimedLock.all_locks.append(self)
+
+    def acquire(self, blocking=True, timeout=-1):
+        started = time.perf_counter_ns()
+        acquired = self.lock.acquire(blocking, timeout)
+        if acquired:
+            # Updated while holding the lock, so no extra synchronization needed
+            self.wait_ns += time.perf_counter_ns() - started
+            self.acquisitions += 1
+        return acquired
+
+    def release(self):
+        self.lock.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def run_scenario(name, cache, deduplicator, use_try_acquire, threads, ops, key_space):
+    keys = [f"subtitle line {i}" for i in range(key_space)]
+    start_barrier = threading.Barrier(threads + 1)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        start_barrier.wait()
+        for _ in range(ops):
+            key = keys[rng.randrange(key_space)]
+            if cache.get('subtitle', key) is None:
+                cache.set('subtitle', key, 'NO', 30)
+            request_key = f"subtitle_{key}"
+            if use_try_acquire:
+                if deduplicator.try_acquire(request_key):
+                    deduplicator.remove_request(request_key)
+            elif not deduplicator.is_duplicate(request_key):
+                deduplicator.add_request(request_key)
+                deduplicator.remove_request(request_key)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    locks = TimedLock.all_locks
+    wait_ms = sum(lock.wait_ns for lock in locks) / 1e6
+    acquisitions = sum(lock.acquisitions for lock in locks)
+    total_ops = threads * ops
+    print(f"   {name:<22} {total_ops / elapsed:>12,.0f} ops/s   "
+          f"lock wait {wait_ms:>9.1f} ms   "
+          f"{wait_ms * 1e6 / max(acquisitions, 1):>8.0f} ns/acquire   "
+          f"{acquisitions / total_ops:.1f} acquires/op")
+    return total_ops / elapsed, wait_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crest cache lock contention benchmark")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--ops', type=int, default=20000, help="operations per thread")
+    parser.add_argument('--shards', type=int, default=16)
+    parser.add_argument('--key-space', type=int, default=5000)
+    args = parser.parse_args()
+
+    # Imported here so the benchmark measures the app's own deduplicator
+    from app import RequestDeduplicator
+
+    print("🔒 CREST LOCK CONTENTION BENCHMARK")
+    print("=" * 40)
+    print(f"   {args.threads} threads x {args.ops} ops, {args.key_space} keys, {args.shards} shards\n")
+
+    TimedLock.all_locks = []
+    global_ops, global_wait = run_scenario(
+        "global lock", MemoryBackend(lock_factory=TimedLock),
+        RequestDeduplicator(shards=1, lock_factory=TimedLock), False,
+        args.threads, args.ops, args.key_space
+    )
+    TimedLock.all_locks = []
+    striped_ops, striped_wait = run_scenario(
+        "lock-striped", ShardedMemoryBackend(shards=args.shards, lock_factory=TimedLock),
+        RequestDeduplicator(shards=args.shards, lock_factory=TimedLock), True,
+        args.threads, args.ops, args.key_space
+    )
+
+    print(f"\n   Throughput: {striped_ops / global_ops:.2f}x, "
+          f"lock wait: {striped_wait / max(global_wait, 1e-9):.2f}x of global-lock layout")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Streaming onset detector throughput benchmark
+Feeds synthetic audio level streams for many concurrent sessions through
+the onset detector, interleaved frame by frame (as live tabs arrive) and in
+batches (as the extension posts them), and reports frames/s on one core,
+memory per session against the store's budget, behaviour past the budget
+and how many injected spikes were detected.
+
+Usage: python bench_onset_detector.py [--sessions 20000] [--frames 200] [--batch 5]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from onset_detector import OnsetDetector
+
+
+def synthetic_streams(sessions, frames, spike_every, seed=5):
+    """Noisy levels around a per-session baseline with a spike every spike_every frames"""
+    rng = random.Random(seed)
+    streams = []
+    for _ in range(sessions):
+        baseline = rng.uniform(0.1, 0.4)
+        levels = [max(0.0, baseline + rng.gauss(0, 0.02)) for _ in range(frames)]
+        for start in range(spike_every, frames - 3, spike_every):
+            levels[start] = min(1.0, baseline + 0.5)
+            levels[start + 1] = min(1.0, baseline + 0.35)
+        streams.append(levels)
+    return streams
+
+
+def run(name, detector, streams, batch):
+    session_ids = [f"tab-{i}" for i in range(len(streams))]
+    frames = len(streams[0])
+    onsets = 0
+    started = time.perf_counter()
+    for offset in range(0, frames, batch):
+        for session_id, levels in zip(session_ids, streams):
+            onsets += len(detector.process(session_id, levels[offset:offset + batch]))
+    elapsed = time.perf_counter() - started
+    total = len(streams) * frames
+    print(f"   {name:<18} {total / elapsed:>12,.0f} frames/s   "
+          f"{elapsed * 1e9 / total:>6.0f} ns/frame   {onsets} onsets")
+    return onsets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crest onset detector benchmark")
+    parser.add_argument('--sessions', type=int, default=20000)
+    parser.add_argument('--frames', type=int, default=200, help="frames per session")
+    parser.add_argument('--batch', type=int, default=5, help="frames per request in batched mode")
+    parser.add_argument('--spike-every', type=int, default=40)
+    args = parser.parse_args()
+
+    streams = synthetic_streams(args.sessions, args.frames, args.spike_every)
+    injected = args.sessions * len(range(args.spike_every, args.frames - 3, args.spike_every))
+
+    print("📈 CREST ONSET DETECTOR BENCHMARK")
+    print("=" * 40)
+    print(f"   {args.sessions} sessions x {args.frames} frames, {injected} injected spikes\n")
+
+    run("frame by frame", OnsetDetector(), streams, 1)
+    detector = OnsetDetector()
+    onsets = run(f"batches of {args.batch}", detector, streams, args.batch)
+
+    # Columns are preallocated, so measure a detector sized for exactly these sessions
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sized = OnsetDetector(max_sessions=args.sessions)
+    for i in range(args.sessions):
+        sized.process(f"tab-{i}", [0.2])
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    stats = sized.stats()
+    predicted = stats['max_bytes'] / stats['capacity']
+
+    print(f"\n   Memory: {used / args.sessions:.0f} bytes/session measured, "
+          f"{predicted:.0f} budgeted, {stats['memory_bytes'] / args.sessions:.0f} accounted")
+
+    # Half the sessions' worth of budget: the least recently used are evicted
+    bounded = OnsetDetector(max_bytes=int(stats['max_bytes'] / 2))
+    run("over budget", bounded, streams, args.batch)
+    bounded_stats = bounded.stats()
+    print(f"   Bounded: {bounded_stats['sessions']} sessions kept in "
+          f"{bounded_stats['memory_bytes'] / 1024 / 1024:.1f} MB "
+          f"(budget {bounded_stats['max_bytes'] / 1024 / 1024:.1f} MB), "
+          f"{bounded_stats['evictions']} evictions")
+    print(f"   Onsets: {onsets} for {injected} injected spikes ({onsets / max(injected, 1):.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Response encoding microbenchmark
+Builds the hot responses (/data with and without the subtitle echo,
+/audio-data and /audio-levels NONE, the /audio-data duck) through jsonify,
+through json_response (the fast encoder) and, for the fixed shapes, through
+the templates (cached, except bodies echoing subtitle text), and reports ns
+per response and body size. Also
+times what the after_request hook pays to read the body back: parsing the
+encoded response (the jsonify path) against reusing the handler's data.
+
+Usage: python bench_response_encoding.py [--iterations 50000]
+"""
+import argparse
+import time
+
+from flask import jsonify
+
+import app
+from response_encoding import ENCODER
+
+
+def shapes():
+    """(name, dict as jsonify gets it, template or None, template values) per hot response"""
+    subtitle = "[EXPLOSION] The bridge collapses behind them as they run"
+    return [
+        ("/data NONE", {"action": "NONE", "confidence": "NO", "subtitle_text": subtitle, "processed": True},
+         app.SUBTITLE_NONE, {'confidence': "NO", 'subtitle_text': subtitle}),
+        ("/data NONE no echo", {"action": "NONE", "confidence": "NO", "processed": True},
+         app.SUBTITLE_NONE_NO_ECHO, {'confidence': "NO"}),
+        ("/data duck no echo", {"action": "LOWER_VOLUME", "level": 0.3, "duration": 5000,
+                                "confidence": "YES", "processed": True},
+         app.SUBTITLE_DUCK_NO_ECHO, {}),
+        ("/audio-data NONE", {"action": "NONE", "confidence": 0.35, "trigger": "audio_analysis"},
+         app.AUDIO_NONE, {'confidence': 0.35}),
+        ("/audio-levels NONE", {"action": "NONE", "trigger": "onset_detector", "phase": "idle"},
+         app.ONSET_NONE, {'phase': "idle"}),
+        ("/audio-data duck", {"action": "LOWER_VOLUME", "level": 0.3, "duration": 3000, "confidence": 0.75,
+                              "trigger": "audio_analysis", "transition_type": "smooth",
+                              "volume_data": {"current": 0.91, "baseline": 0.32, "spike": 0.59}},
+         None, None),
+    ]
+
+
+def time_per_call(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) * 1e9 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crest response encoding benchmark")
+    parser.add_argument('--iterations', type=int, default=50000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    print("⚡ CREST RESPONSE ENCODING BENCHMARK")
+    print("=" * 40)
+    print(f"   encoder: {ENCODER}, {n} responses per measurement\n")
+    print(f"   {'shape':<20} {'jsonify':>9} {'fast':>9} {'template':>9}   {'bytes':>5}   "
+          f"{'hook parse':>10}")
+
+    baseline_ns = best_ns = 0.0
+    with app.app.test_request_context('/'):
+        for name, data, template, values in shapes():
+            jsonify_ns = time_per_call(lambda: jsonify(data), n)
+            fast_ns = time_per_call(lambda: app.json_response(data), n)
+            encoded = jsonify(data)
+            parse_ns = time_per_call(lambda: encoded.get_json(force=True), n)
+            if template is not None:
+                template_ns = time_per_call(lambda: app.template_response(template, **values), n)
+                body = template.render(**values)
+            else:
+                template_ns, body = None, app.json_response(data).get_data()
+            baseline_ns += jsonify_ns
+            best_ns += min(fast_ns, template_ns or fast_ns)
+            template_column = f"{template_ns:>7.0f}ns" if template_ns is not None else f"{'-':>9}"
+            print(f"   {name:<20} {jsonify_ns:>7.0f}ns {fast_ns:>7.0f}ns {template_column}   "
+                  f"{len(body):>5}   {parse_ns:>8.0f}ns")
+
+    print(f"\n   Fast path: {baseline_ns / best_ns:.2f}x the jsonify path, "
+          f"plus the hook's parse per analyzed response")
+
+
+if __name__ == '__main__':
+    main()
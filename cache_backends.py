@@ -0,0 +1,504 @@
+"""
+Pluggable storage backends for Crest's decision and baseline caches.
+
+Every backend stores namespaced entries with a per-entry TTL and returns
+(value, stored_at) pairs, so the caches in app.py can run on a process-local
+dict, the launcher's shared cache server, a SQLite file or any server that
+speaks the Redis protocol. Remote backends are wrapped in a NearCache, a small
+process-local tier that absorbs repeat lookups before they hit the network.
+
+Selected with CREST_CACHE_BACKEND=memory|shared|sqlite|redis.
+"""
+import heapq
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class CacheBackendError(Exception):
+    """Raised when a backend cannot reach its store"""
+
+
+class CacheBackend:
+    """Interface shared by all cache backends"""
+    name = 'base'
+
+    def get(self, namespace, key):
+        """Return (value, stored_at) for a live entry, or None"""
+        raise NotImplementedError
+
+    def get_many(self, namespace, keys):
+        """Return {key: (value, stored_at)} for the live entries among keys"""
+        results = {}
+        for key in keys:
+            entry = self.get(namespace, key)
+            if entry is not None:
+                results[key] = entry
+        return results
+
+    def set(self, namespace, key, value, ttl_seconds):
+        """Store value for ttl_seconds"""
+        raise NotImplementedError
+
+    def delete(self, namespace, key):
+        """Remove an entry if present"""
+        raise NotImplementedError
+
+    def expire(self, max_items):
+        """
+        Remove up to max_items expired entries.
+        Returns (reclaimed, more_pending); stores with native TTLs reclaim nothing.
+        """
+        return 0, False
+
+    def stats(self):
+        """Backend-specific counters for health reporting"""
+        return {'backend': self.name}
+
+
+class MemoryBackend(CacheBackend):
+    """Process-local dict backend, the default for a single server process"""
+    name = 'memory'
+
+    def __init__(self, lock_factory=threading.Lock):
+        self.entries = {}  # (namespace, key) -> (value, stored_at, expires_at)
+        self.expiry_heap = []  # (expires_at, namespace, key), may hold stale items
+        self.lock = lock_factory()
+
+    def get(self, namespace, key):
+        entry_key = (namespace, key)
+        with self.lock:
+            entry = self.entries.get(entry_key)
+            if entry is None:
+                return None
+            value, stored_at, expires_at = entry
+            if time.time() >= expires_at:
+                # Expired, remove from cache
+                del self.entries[entry_key]
+                return None
+            return value, stored_at
+
+    def set(self, namespace, key, value, ttl_seconds, stored_at=None):
+        now = time.time()
+        stored_at = now if stored_at is None else stored_at
+        expires_at = now + ttl_seconds
+        with self.lock:
+            self.entries[(namespace, key)] = (value, stored_at, expires_at)
+            heapq.heappush(self.expiry_heap, (expires_at, namespace, key))
+
+    def delete(self, namespace, key):
+        with self.lock:
+            self.entries.pop((namespace, key), None)
+
+    def expire(self, max_items):
+        """Pop due items off the expiry heap, skipping ones overwritten since"""
+        now = time.time()
+        reclaimed = 0
+        with self.lock:
+            heap = self.expiry_heap
+            for _ in range(max_items):
+                if not heap or heap[0][0] > now:
+                    return reclaimed, False
+                expires_at, namespace, key = heapq.heappop(heap)
+                entry = self.entries.get((namespace, key))
+                if entry is not None and entry[2] == expires_at:
+                    del self.entries[(namespace, key)]
+                    reclaimed += 1
+            return reclaimed, bool(heap) and heap[0][0] <= now
+
+    def stats(self):
+        return {'backend': self.name, 'entries': len(self.entries)}
+
+
+class ShardedMemoryBackend(CacheBackend):
+    """
+    Lock-striped memory backend: keys are spread over independent shards,
+    each with its own lock, so concurrent request threads rarely contend.
+    """
+    name = 'memory'
+
+    def __init__(self, shards=16, lock_factory=threading.Lock):
+        self.shards = [MemoryBackend(lock_factory=lock_factory) for _ in range(shards)]
+        self.expire_cursor = 0
+
+    def _shard_index(self, namespace, key):
+        return hash((namespace, key)) % len(self.shards)
+
+    def _shard(self, namespace, key):
+        return self.shards[self._shard_index(namespace, key)]
+
+    def get(self, namespace, key):
+        return self._shard(namespace, key).get(namespace, key)
+
+    def get_many(self, namespace, keys):
+        by_shard = {}
+        for key in keys:
+            by_shard.setdefault(self._shard_index(namespace, key), []).append(key)
+        results = {}
+        for index, shard_keys in by_shard.items():
+            results.update(self.shards[index].get_many(namespace, shard_keys))
+        return results
+
+    def set(self, namespace, key, value, ttl_seconds, stored_at=None):
+        self._shard(namespace, key).set(namespace, key, value, ttl_seconds, stored_at=stored_at)
+
+    def delete(self, namespace, key):
+        self._shard(namespace, key).delete(namespace, key)
+
+    def expire(self, max_items):
+        """Spread the slice budget over shards, resuming where the last slice stopped"""
+        reclaimed = 0
+        more_pending = False
+        shard_count = len(self.shards)
+        for _ in range(shard_count):
+            if reclaimed >= max_items:
+                return reclaimed, True
+            shard = self.shards[self.expire_cursor]
+            self.expire_cursor = (self.expire_cursor + 1) % shard_count
+            shard_reclaimed, shard_more = shard.expire(max_items - reclaimed)
+            reclaimed += shard_reclaimed
+            more_pending = more_pending or shard_more
+        return reclaimed, more_pending
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self.shards)
+
+    def stats(self):
+        return {'backend': self.name, 'entries': len(self), 'shards': len(self.shards)}
+
+
+class SharedStoreBackend(CacheBackend):
+    """Backend on the production launcher's shared cache server"""
+    name = 'shared'
+
+    def __init__(self, store):
+        self.store = store
+
+    def _call(self, method, *args):
+        try:
+            return method(*args)
+        except (OSError, EOFError) as e:
+            raise CacheBackendError(str(e)) from e
+
+    def get(self, namespace, key):
+        return self._call(self.store.get, namespace, key)
+
+    def get_many(self, namespace, keys):
+        return self._call(self.store.get_many, namespace, list(keys))
+
+    def set(self, namespace, key, value, ttl_seconds):
+        self._call(self.store.set, namespace, key, value, ttl_seconds)
+
+    def delete(self, namespace, key):
+        self._call(self.store.delete, namespace, key)
+
+    def expire(self, max_items):
+        return self._call(self.store.expire, max_items)
+
+    def stats(self):
+        stats = self._call(self.store.stats)
+        stats['backend'] = self.name
+        return stats
+
+
+class SQLiteBackend(CacheBackend):
+    """SQLite file backend, shared by every process on one host"""
+    name = 'sqlite'
+
+    # SQLite limits the number of bound parameters per statement
+    MAX_BATCH = 500
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self._connection().executescript('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS cache_entries_expiry ON cache_entries (expires_at);
+        ''')
+
+    def _connection(self):
+        """One connection per thread, created on first use"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return connection
+
+    def _execute(self, sql, params=()):
+        try:
+            return self._connection().execute(sql, params)
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+
+    def get(self, namespace, key):
+        row = self._execute(
+            'SELECT value, stored_at FROM cache_entries '
+            'WHERE namespace = ? AND key = ? AND expires_at > ?',
+            (namespace, key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def get_many(self, namespace, keys):
+        keys = list(keys)
+        results = {}
+        now = time.time()
+        for start in range(0, len(keys), self.MAX_BATCH):
+            batch = keys[start:start + self.MAX_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            rows = self._execute(
+                f'SELECT key, value, stored_at FROM cache_entries '
+                f'WHERE namespace = ? AND expires_at > ? AND key IN ({placeholders})',
+                [namespace, now] + batch
+            )
+            for key, value, stored_at in rows:
+                results[key] = (json.loads(value), stored_at)
+        return results
+
+    def set(self, namespace, key, value, ttl_seconds):
+        now = time.time()
+        self._execute(
+            'INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at, expires_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (namespace, key, json.dumps(value), now, now + ttl_seconds)
+        )
+
+    def delete(self, namespace, key):
+        self._execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (namespace, key))
+
+    def expire(self, max_items):
+        cursor = self._execute(
+            'DELETE FROM cache_entries WHERE rowid IN '
+            '(SELECT rowid FROM cache_entries WHERE expires_at <= ? LIMIT ?)',
+            (time.time(), max_items)
+        )
+        return cursor.rowcount, cursor.rowcount >= max_items
+
+    def stats(self):
+        count = self._execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+        return {'backend': self.name, 'entries': count}
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend for any server speaking the Redis protocol (RESP).
+    Lets several Crest nodes behind a load balancer share decisions.
+    """
+    name = 'redis'
+
+    def __init__(self, url='redis://localhost:6379/0', key_prefix='crest:', timeout=0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _redis_key(self, namespace, key):
+        return f"{self.key_prefix}{namespace}:{key}"
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.local.sock = sock
+        self.local.reader = sock.makefile('rb')
+        setup = []
+        if self.password:
+            setup.append(('AUTH', self.password))
+        if self.db:
+            setup.append(('SELECT', str(self.db)))
+        if setup:
+            self._pipeline(setup)
+
+    def _reset(self):
+        sock = getattr(self.local, 'sock', None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self.local.sock = None
+        self.local.reader = None
+
+    @staticmethod
+    def _encode(command):
+        parts = [b'*%d\r\n' % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self):
+        line = self.local.reader.readline()
+        if not line:
+            raise CacheBackendError("Connection closed by Redis server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise CacheBackendError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise CacheBackendError(f"Unexpected Redis reply: {line!r}")
+
+    def _pipeline(self, commands):
+        """Send all commands in one write and read every reply"""
+        try:
+            if getattr(self.local, 'sock', None) is None:
+                self._connect()
+            self.local.sock.sendall(b''.join(self._encode(c) for c in commands))
+            return [self._read_reply() for _ in commands]
+        except (OSError, CacheBackendError) as e:
+            self._reset()
+            if isinstance(e, CacheBackendError):
+                raise
+            raise CacheBackendError(str(e)) from e
+
+    def _execute(self, *command):
+        return self._pipeline([command])[0]
+
+    @staticmethod
+    def _decode(raw):
+        if raw is None:
+            return None
+        value, stored_at = json.loads(raw)
+        return value, stored_at
+
+    def get(self, namespace, key):
+        return self._decode(self._execute('GET', self._redis_key(namespace, key)))
+
+    def get_many(self, namespace, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        raw_values = self._execute('MGET', *[self._redis_key(namespace, k) for k in keys])
+        return {
+            key: self._decode(raw)
+            for key, raw in zip(keys, raw_values)
+            if raw is not None
+        }
+
+    def set(self, namespace, key, value, ttl_seconds):
+        payload = json.dumps([value, time.time()])
+        ttl_ms = max(1, int(ttl_seconds * 1000))
+        self._execute('SET', self._redis_key(namespace, key), payload, 'PX', ttl_ms)
+
+    def delete(self, namespace, key):
+        self._execute('DEL', self._redis_key(namespace, key))
+
+    def stats(self):
+        return {'backend': self.name, 'host': f"{self.host}:{self.port}"}
+
+
+class NearCache(CacheBackend):
+    """Process-local tier in front of a remote backend"""
+
+    def __init__(self, remote, ttl_seconds=5):
+        self.remote = remote
+        self.local = ShardedMemoryBackend(shards=memory_shards())
+        self.ttl = ttl_seconds
+        self.name = f"near+{remote.name}"
+
+    def _keep_locally(self, namespace, key, entry):
+        value, stored_at = entry
+        self.local.set(namespace, key, value, self.ttl, stored_at=stored_at)
+
+    def get(self, namespace, key):
+        entry = self.local.get(namespace, key)
+        if entry is not None:
+            return entry
+        entry = self.remote.get(namespace, key)
+        if entry is not None:
+            self._keep_locally(namespace, key, entry)
+        return entry
+
+    def get_many(self, namespace, keys):
+        results = {}
+        missing = []
+        for key in keys:
+            entry = self.local.get(namespace, key)
+            if entry is not None:
+                results[key] = entry
+            else:
+                missing.append(key)
+        if missing:
+            remote_results = self.remote.get_many(namespace, missing)
+            for key, entry in remote_results.items():
+                self._keep_locally(namespace, key, entry)
+            results.update(remote_results)
+        return results
+
+    def set(self, namespace, key, value, ttl_seconds):
+        self.local.set(namespace, key, value, min(ttl_seconds, self.ttl))
+        self.remote.set(namespace, key, value, ttl_seconds)
+
+    def delete(self, namespace, key):
+        self.local.delete(namespace, key)
+        self.remote.delete(namespace, key)
+
+    def expire(self, max_items):
+        local_reclaimed, local_more = self.local.expire(max_items)
+        remote_reclaimed, remote_more = self.remote.expire(max_items)
+        return local_reclaimed + remote_reclaimed, local_more or remote_more
+
+    def stats(self):
+        stats = self.remote.stats()
+        stats['backend'] = self.name
+        stats['near_cache_entries'] = len(self.local)
+        return stats
+
+
+def memory_shards():
+    """Shard count for process-local memory caches (CREST_CACHE_SHARDS)"""
+    return max(1, int(os.getenv('CREST_CACHE_SHARDS', '16')))
+
+
+def create_backend(kind=None, shared_store=None):
+    """
+    Build the cache backend selected by CREST_CACHE_BACKEND.
+    Defaults to the launcher's shared store when one is available, else memory.
+    """
+    kind = (kind or os.getenv('CREST_CACHE_BACKEND') or ('shared' if shared_store else 'memory')).lower()
+    near_ttl = float(os.getenv('CREST_NEAR_CACHE_TTL', '5'))
+
+    if kind == 'memory':
+        return ShardedMemoryBackend(shards=memory_shards())
+    if kind == 'shared':
+        if shared_store is None:
+            raise ValueError("CREST_CACHE_BACKEND=shared requires the production launcher")
+        return NearCache(SharedStoreBackend(shared_store), ttl_seconds=near_ttl)
+    if kind == 'sqlite':
+        path = os.getenv('CREST_CACHE_SQLITE_PATH', 'crest_cache.sqlite3')
+        return NearCache(SQLiteBackend(path), ttl_seconds=near_ttl)
+    if kind == 'redis':
+        url = os.getenv('CREST_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        return NearCache(RedisBackend(url), ttl_seconds=near_ttl)
+    raise ValueError(f"Unknown cache backend: {kind}")
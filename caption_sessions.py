@@ -0,0 +1,138 @@
+"""
+Per-session tracking of rolling auto-generated captions.
+
+YouTube auto-captions grow word by word ("there was a", "there was a loud",
+"there was a loud explosion") and each step arrives as its own /data call.
+The tracker recognizes when a line extends the session's previous line, so
+the server can classify only the new suffix with the compiled rules and
+debounce full classification (and its LLM call) while an earlier prefix of
+the same line is still in flight.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_caption(text):
+    return WHITESPACE.sub(' ', text.strip().lower())
+
+
+class CaptionUpdate:
+    """How a caption line relates to the session's previous line"""
+    __slots__ = ('kind', 'suffix', 'previous_decision', 'should_escalate')
+
+    def __init__(self, kind, suffix='', previous_decision=None, should_escalate=True):
+        self.kind = kind  # 'new', 'repeat' or 'extension'
+        self.suffix = suffix
+        self.previous_decision = previous_decision
+        self.should_escalate = should_escalate
+
+
+class CaptionSession:
+    __slots__ = ('text', 'decision', 'classified_text', 'in_flight_text', 'updated_at')
+
+    def __init__(self):
+        self.text = ''
+        self.decision = None
+        self.classified_text = ''  # last prefix sent through full classification
+        self.in_flight_text = None
+        self.updated_at = time.time()
+
+
+class RollingCaptionTracker:
+    """Tracks the growing caption line of each video session"""
+    def __init__(self, idle_ttl_seconds=120, min_escalation_words=4, max_sessions=100000):
+        self.sessions = OrderedDict()  # session_id -> CaptionSession, least recently updated first
+        self.idle_ttl = idle_ttl_seconds
+        self.min_escalation_words = min_escalation_words
+        self.max_sessions = max_sessions
+        self.lock = threading.Lock()
+        self.counters = {'new': 0, 'repeat': 0, 'extension': 0, 'rule_hits': 0,
+                         'debounced': 0, 'escalated': 0}
+
+    def observe(self, session_id, text):
+        """Classify how text relates to the session's previous line and record it"""
+        normalized = normalize_caption(text)
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = CaptionSession()
+                self.sessions[session_id] = session
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+            else:
+                self.sessions.move_to_end(session_id)
+            session.updated_at = time.time()
+
+            previous = session.text
+            if previous and normalized == previous:
+                update = CaptionUpdate('repeat', previous_decision=session.decision,
+                                       should_escalate=session.decision is None and session.in_flight_text is None)
+            elif previous and normalized.startswith(previous):
+                new_words = len(normalized[len(session.classified_text):].split()) \
+                    if normalized.startswith(session.classified_text) else len(normalized.split())
+                update = CaptionUpdate(
+                    'extension',
+                    suffix=normalized[len(previous):],
+                    previous_decision=session.decision,
+                    should_escalate=(session.in_flight_text is None
+                                     and new_words >= self.min_escalation_words)
+                )
+            else:
+                session.decision = None
+                session.classified_text = ''
+                update = CaptionUpdate('new')
+
+            session.text = normalized
+            self.counters[update.kind] += 1
+            return update
+
+    def start_classification(self, session_id, text):
+        """Mark a full classification of this line as in flight"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.in_flight_text = normalize_caption(text)
+                session.classified_text = session.in_flight_text
+            self.counters['escalated'] += 1
+
+    def finish_classification(self, session_id, text, decision):
+        """Record a full classification result; a YES carries to later extensions"""
+        normalized = normalize_caption(text)
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return
+            if session.in_flight_text == normalized:
+                session.in_flight_text = None
+            # Only apply results for the line the session is still on
+            if decision is not None and session.text.startswith(normalized):
+                session.decision = 'YES' if 'YES' in (decision, session.decision) else decision
+
+    def record_incremental(self, session_id, decision, rule_hit):
+        """Record a decision made from the suffix without full classification"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is not None and decision == 'YES':
+                session.decision = 'YES'
+            self.counters['rule_hits' if rule_hit else 'debounced'] += 1
+
+    def expire(self, max_items):
+        """Drop idle sessions, least recently updated first"""
+        cutoff = time.time() - self.idle_ttl
+        reclaimed = 0
+        with self.lock:
+            while self.sessions and reclaimed < max_items:
+                session_id, session = next(iter(self.sessions.items()))
+                if session.updated_at >= cutoff:
+                    return reclaimed, False
+                del self.sessions[session_id]
+                reclaimed += 1
+            return reclaimed, bool(self.sessions) and next(iter(self.sessions.values())).updated_at < cutoff
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, sessions=len(self.sessions))
@@ -20,6 +20,10 @@ class AudioLevelMonitor {
         this.analysisInterval = null;
         this.lastSpikeTime = 0;
         this.spikeDebounce = 1000; // 1 second debounce between spikes
+        this.recentFrames = []; // Raw analyser frames for server-side spectral analysis
+        this.maxRecentFrames = 12; // ~1.2s at 10Hz
+        this.levelBatch = []; // RMS levels streamed to the server's onset detector
+        this.levelBatchSize = 5; // ~500ms per request at 10Hz
     }
 
     async startMonitoring(videoElement) {
@@ -66,9 +70,23 @@ class AudioLevelMonitor {
         const dataArray = new Uint8Array(bufferLength);
         this.analyser.getByteFrequencyData(dataArray);
 
+        this.recentFrames.push(Array.from(dataArray));
+        if (this.recentFrames.length > this.maxRecentFrames) {
+            this.recentFrames.shift();
+        }
+
         // Calculate RMS (Root Mean Square) for volume level
         const rms = this.calculateRMS(dataArray);
 
+        this.levelBatch.push(rms);
+        if (this.levelBatch.length >= this.levelBatchSize) {
+            chrome.runtime.sendMessage({
+                type: 'AUDIO_LEVELS',
+                data: { levels: this.levelBatch, timestamp: Date.now(), ...playbackPosition() }
+            });
+            this.levelBatch = [];
+        }
+
         // Update baseline with rolling average
         this.updateBaseline(rms);
 
@@ -119,7 +137,11 @@ class AudioLevelMonitor {
                 volume: volume,
                 baseline: baseline,
                 spike: spike,
-                timestamp: Date.now()
+                timestamp: Date.now(),
+                // Oldest first, the spike last: lets the server tell transients from music
+                frames: this.recentFrames.slice(),
+                sampleRate: this.audioContext ? this.audioContext.sampleRate : 48000,
+                ...playbackPosition()
             }
         });
     }
@@ -261,6 +283,15 @@ function initializeNotification() {
 }
 
 // --- SUBTITLE MONITORING (Existing functionality) ---
+// Which video and where in it: lets the server remember corrected moments
+function playbackPosition() {
+    const video = document.querySelector('video');
+    return {
+        videoId: new URLSearchParams(window.location.search).get('v'),
+        playbackTime: video ? video.currentTime : null
+    };
+}
+
 function initializeSubtitleMonitoring() {
     console.log("🔍 Crest: Starting subtitle monitoring...");
 
@@ -274,7 +305,8 @@ function initializeSubtitleMonitoring() {
                     // Send to AI for analysis
                     chrome.runtime.sendMessage({
                         type: 'SUBTITLE_DATA',
-                        text: subtitleText
+                        text: subtitleText,
+                        position: playbackPosition()
                     });
                 }
             });
@@ -387,7 +419,7 @@ function addVolumeListener() {
         video.addEventListener('volumechange', () => {
             if (!volumeController?.isAdjusting) {
                 console.log("👤 Crest: User manually adjusted volume");
-                chrome.runtime.sendMessage({ type: 'USER_CORRECTION' });
+                chrome.runtime.sendMessage({ type: 'USER_CORRECTION', data: playbackPosition() });
             }
         });
         console.log("✅ Crest: Volume change listener added");
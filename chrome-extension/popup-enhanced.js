@@ -14,6 +14,8 @@ class EnhancedDashboard {
         };
         this.isConnected = false;
         this.updateInterval = null;
+        this.serverFeed = null;
+        this.serverStats = null;
     }
 
     async initialize() {
@@ -27,6 +29,7 @@ class EnhancedDashboard {
 
         // Start real-time updates
         this.startRealTimeUpdates();
+        this.followServerFeed();
 
         // Update display
         this.updateDisplay();
@@ -93,6 +96,32 @@ class EnhancedDashboard {
         }, 1000);
     }
 
+    followServerFeed() {
+        // Only decisions newer than the cursor are sent; EventSource resumes
+        // from the last id it saw when it reconnects
+        this.serverFeed = new EventSource('http://localhost:5003/events/stream');
+
+        this.serverFeed.addEventListener('decision', (message) => {
+            const event = JSON.parse(message.data);
+            if (event.action !== 'LOWER_VOLUME') return;
+            this.addEventToLog({
+                type: 'server_decision',
+                trigger: event.path || event.endpoint,
+                message: `🖥️ ${event.client_id}: ${event.action} via ${event.endpoint}`,
+                timestamp: event.timestamp * 1000,
+                confidence: event.confidence
+            });
+        });
+
+        this.serverFeed.addEventListener('stats', (message) => {
+            this.serverStats = JSON.parse(message.data);
+        });
+
+        this.serverFeed.onerror = () => {
+            console.log('Server event feed unavailable, retrying');
+        };
+    }
+
     handleDashboardUpdate(message) {
         console.log('📊 Dashboard update received:', message);
 
@@ -335,6 +364,9 @@ class EnhancedDashboard {
         if (this.updateInterval) {
             clearInterval(this.updateInterval);
         }
+        if (this.serverFeed) {
+            this.serverFeed.close();
+        }
     }
 }
 
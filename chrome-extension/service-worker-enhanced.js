@@ -149,13 +149,17 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
     if (message.type === 'AUDIO_DATA') {
         handleAudioData(message.data, sender);
     }
+    // Handle streamed audio levels for the server-side onset detector
+    else if (message.type === 'AUDIO_LEVELS') {
+        handleAudioLevels(message.data, sender);
+    }
     // Handle subtitle data
     else if (message.type === 'SUBTITLE_DATA') {
-        handleSubtitleData(message.text, sender);
+        handleSubtitleData(message.text, sender, message.position || {});
     }
     // Handle user corrections
     else if (message.type === 'USER_CORRECTION') {
-        handleUserCorrection(sender);
+        handleUserCorrection(message.data || {}, sender);
     }
     // Handle popup requests for dashboard data
     else if (message.type === 'GET_DASHBOARD_DATA') {
@@ -177,14 +181,25 @@ async function handleAudioData(audioData, sender) {
     try {
         console.log('🔊 Processing audio data:', audioData);
 
-        const response = await fetch('http://localhost:5003/audio-data', {
+        // With analyser frames the server classifies the spike locally from its spectrum
+        const hasFrames = Array.isArray(audioData.frames) && audioData.frames.length > 0;
+        const endpoint = hasFrames ? 'audio-spectrum' : 'audio-data';
+        const response = await fetch(`http://localhost:5003/${endpoint}`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 volume: audioData.volume,
                 baseline: audioData.baseline,
                 spike: audioData.spike,
-                timestamp: audioData.timestamp
+                timestamp: audioData.timestamp,
+                frames: hasFrames ? audioData.frames : undefined,
+                sample_rate: audioData.sampleRate,
+                video_id: audioData.videoId,
+                playback_time: audioData.playbackTime,
+                session_id: `tab-${sender.tab.id}`,
+                client_id: `tab-${sender.tab.id}`,
+                // The spike is happening now: answers later than this can't help
+                deadline_ms: 400
             }),
         });
 
@@ -246,14 +261,67 @@ async function handleAudioData(audioData, sender) {
     }
 }
 
-async function handleSubtitleData(subtitleText, sender) {
+async function handleAudioLevels(levelData, sender) {
+    try {
+        const response = await fetch('http://localhost:5003/audio-levels', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                levels: levelData.levels,
+                video_id: levelData.videoId,
+                playback_time: levelData.playbackTime,
+                session_id: `tab-${sender.tab.id}`,
+                client_id: `tab-${sender.tab.id}`
+            }),
+        });
+
+        const data = await response.json();
+
+        if (data.action === 'LOWER_VOLUME') {
+            setIconActive(sender.tab.id);
+            chrome.tabs.sendMessage(sender.tab.id, {
+                action: 'LOWER_VOLUME',
+                level: data.level,
+                duration: data.duration,
+                confidence: data.confidence,
+                trigger: 'audio'
+            });
+
+            dashboardManager.logEvent({
+                type: 'volume_adjustment',
+                trigger: 'audio',
+                confidence: data.confidence,
+                level: data.level,
+                duration: data.duration,
+                message: data.onset
+                    ? `🔊 Audio onset detected (${(data.onset.strength * 100).toFixed(1)}% above baseline)`
+                    : '🔊 Loud scene continues, volume reduction extended'
+            });
+
+            setTimeout(() => {
+                setIconDefault(sender.tab.id);
+            }, data.duration + 500);
+        }
+    } catch (error) {
+        console.error('🚨 Audio level streaming error:', error);
+    }
+}
+
+async function handleSubtitleData(subtitleText, sender, position) {
     try {
         console.log('📝 Processing subtitle:', subtitleText);
 
         const response = await fetch('http://localhost:5003/data', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ text: subtitleText }),
+            body: JSON.stringify({
+                text: subtitleText,
+                echo_text: false,
+                video_id: position.videoId,
+                playback_time: position.playbackTime,
+                session_id: `tab-${sender.tab.id}`,
+                client_id: `tab-${sender.tab.id}`
+            }),
         });
 
         const data = await response.json();
@@ -311,14 +379,19 @@ async function handleSubtitleData(subtitleText, sender) {
     }
 }
 
-function handleUserCorrection(sender) {
+function handleUserCorrection(position, sender) {
     console.log('👤 User correction detected');
 
     // Send feedback to server
     fetch('http://localhost:5003/feedback', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ event: 'user_corrected_volume' }),
+        body: JSON.stringify({
+            event: 'user_corrected_volume',
+            client_id: `tab-${sender.tab.id}`,
+            video_id: position.videoId,
+            playback_time: position.playbackTime
+        }),
     }).catch(err => console.error('Feedback error:', err));
 
     // Log correction event
@@ -0,0 +1,99 @@
+"""
+Deadline-aware choice between decision paths.
+
+Clients can say how long an answer stays useful (a LOWER_VOLUME that lands
+after the loud moment is wasted). The planner keeps a live latency estimate
+per decision path -- an EWMA of observed latency plus a multiple of its mean
+deviation, so roughly a high percentile -- and picks the most accurate path
+whose estimate still fits the remaining budget.
+
+A path that never fits is never taken, so it would never be measured again
+and its estimate could not come down. claim_probe() lets a caller run a
+skipped path off the request (at most once per probe_interval) so its
+latency keeps feeding observe().
+"""
+import threading
+import time
+
+
+class PathLatency:
+    __slots__ = ('mean_ms', 'deviation_ms', 'samples', 'avoided', 'missed', 'probes', 'last_probe')
+
+    def __init__(self, prior_ms):
+        self.mean_ms = prior_ms
+        self.deviation_ms = prior_ms / 2
+        self.samples = 0
+        self.avoided = 0
+        self.missed = 0
+        self.probes = 0
+        self.last_probe = None
+
+
+class DeadlinePlanner:
+    """Latency estimates per decision path, in order of preference"""
+    def __init__(self, priors_ms, alpha=0.2, deviations=2.0, probe_interval=10.0, clock=time.monotonic):
+        """priors_ms: ordered {path: expected latency in ms}, most accurate path first"""
+        self.paths = {path: PathLatency(prior) for path, prior in priors_ms.items()}
+        self.alpha = alpha
+        self.deviations = deviations
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self.lock = threading.Lock()
+
+    def observe(self, path, latency_ms):
+        with self.lock:
+            stats = self.paths[path]
+            error = latency_ms - stats.mean_ms
+            stats.mean_ms += self.alpha * error
+            stats.deviation_ms += self.alpha * (abs(error) - stats.deviation_ms)
+            stats.samples += 1
+
+    def estimate(self, path):
+        with self.lock:
+            stats = self.paths[path]
+            return stats.mean_ms + self.deviations * stats.deviation_ms
+
+    def fits(self, path, remaining_ms):
+        return remaining_ms is None or self.estimate(path) <= remaining_ms
+
+    def claim_probe(self, path):
+        """True if a skipped path is due for an off-request measurement"""
+        with self.lock:
+            stats = self.paths[path]
+            now = self.clock()
+            if stats.last_probe is not None and now - stats.last_probe < self.probe_interval:
+                return False
+            stats.last_probe = now
+            stats.probes += 1
+            return True
+
+    def record_avoided(self, path):
+        """A path was skipped because its answer would have arrived too late"""
+        with self.lock:
+            self.paths[path].avoided += 1
+
+    def record_missed(self, path):
+        """A path was taken but still answered after the deadline"""
+        with self.lock:
+            self.paths[path].missed += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                path: {
+                    'estimate_ms': round(stats.mean_ms + self.deviations * stats.deviation_ms, 3),
+                    'mean_ms': round(stats.mean_ms, 3),
+                    'samples': stats.samples,
+                    'late_avoided': stats.avoided,
+                    'late_missed': stats.missed,
+                    'probes': stats.probes,
+                }
+                for path, stats in self.paths.items()
+            }
+
+
+def remaining_ms(deadline):
+    """Milliseconds left before a time.monotonic() deadline, or None without one"""
+    if deadline is None:
+        return None
+    return (deadline - time.monotonic()) * 1000
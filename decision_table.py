@@ -0,0 +1,107 @@
+"""
+Precomputed, memory-mapped decision table for common caption strings.
+
+Built offline by precompute_decisions.py from a caption corpus, the table is
+a read-only tier below DecisionCache: lookups that miss the cache are
+answered from it without a network call, across restarts and TTL expiry.
+
+File layout (little-endian header, big-endian keys so they sort bytewise):
+    magic  b'CRDT' | version u16 | reserved u16 | count u32
+    count sorted u64 keys (first 8 bytes of md5 of the normalized text)
+    count decision bytes (b'Y' / b'N')
+
+The file is mmap'd, so forked workers share its pages and a lookup is a
+binary search over the key array.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+from caption_sessions import normalize_caption
+
+MAGIC = b'CRDT'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+KEY = struct.Struct('>Q')
+DECISION_BYTES = {'YES': b'Y', 'NO': b'N'}
+DECISIONS = {ord('Y'): 'YES', ord('N'): 'NO'}
+
+
+class DecisionTableError(Exception):
+    """The table file is missing, truncated or of an unknown format"""
+
+
+def table_key(text):
+    return KEY.unpack(hashlib.md5(normalize_caption(text).encode('utf-8')).digest()[:8])[0]
+
+
+def write_decision_table(path, decisions):
+    """Write {text: 'YES'|'NO'} as a table file, atomically replacing path"""
+    entries = {}
+    for text, decision in decisions.items():
+        entries[table_key(text)] = DECISION_BYTES[decision]
+    keys = sorted(entries)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(keys)))
+        f.write(b''.join(KEY.pack(key) for key in keys))
+        f.write(b''.join(entries[key] for key in keys))
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+class DecisionTable:
+    """Read-only view of a table file"""
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, 'rb') as f:
+                self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise DecisionTableError(f"cannot map {path}: {e}") from e
+
+        if len(self.buffer) < HEADER.size:
+            raise DecisionTableError(f"{path} is truncated")
+        magic, version, _, self.count = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise DecisionTableError(f"{path} is not a version {FORMAT_VERSION} decision table")
+        self.decisions_offset = HEADER.size + self.count * KEY.size
+        if len(self.buffer) != self.decisions_offset + self.count:
+            raise DecisionTableError(f"{path} is truncated")
+
+        self.lookups = 0
+        self.hits = 0
+        self.stats_lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, text):
+        """Precomputed 'YES'/'NO' for text, or None"""
+        key = table_key(text)
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            probe = KEY.unpack_from(self.buffer, HEADER.size + mid * KEY.size)[0]
+            if probe < key:
+                low = mid + 1
+            else:
+                high = mid
+        found = low < self.count and KEY.unpack_from(self.buffer, HEADER.size + low * KEY.size)[0] == key
+        decision = DECISIONS[self.buffer[self.decisions_offset + low]] if found else None
+        with self.stats_lock:
+            self.lookups += 1
+            self.hits += found
+        return decision
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                'path': self.path,
+                'entries': self.count,
+                'lookups': self.lookups,
+                'hits': self.hits,
+            }
@@ -0,0 +1,91 @@
+"""
+Per-session tracking of active volume-duck windows.
+
+While a LOWER_VOLUME command is still in effect for a tab, further spikes
+from the same tab don't need their own analysis or command: the video is
+already ducked. The tracker absorbs those spikes, counts them, and only
+extends the window (with a short follow-up command) when it is about to
+close while the scene is still loud.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class DuckWindow:
+    __slots__ = ('level', 'confidence', 'started_at', 'ends_at', 'suppressed', 'extensions')
+
+    def __init__(self, level, confidence, started_at, ends_at):
+        self.level = level
+        self.confidence = confidence
+        self.started_at = started_at
+        self.ends_at = ends_at
+        self.suppressed = 0
+        self.extensions = 0
+
+
+class DuckWindowTracker:
+    """Active ducking windows per tab/video session"""
+    def __init__(self, extend_threshold_ms=750, extension_ms=2000, max_window_ms=12000,
+                 max_sessions=100000):
+        self.windows = OrderedDict()  # session_id -> DuckWindow, least recently updated first
+        self.extend_threshold = extend_threshold_ms / 1000
+        self.extension_ms = extension_ms
+        self.max_window = max_window_ms / 1000
+        self.max_sessions = max_sessions
+        self.lock = threading.Lock()
+        self.counters = {'opened': 0, 'suppressed': 0, 'extended': 0}
+
+    def open(self, session_id, level, duration_ms, confidence, now=None):
+        """Record a LOWER_VOLUME command sent to the session"""
+        now = time.time() if now is None else now
+        with self.lock:
+            self.windows[session_id] = DuckWindow(level, confidence, now, now + duration_ms / 1000)
+            self.windows.move_to_end(session_id)
+            while len(self.windows) > self.max_sessions:
+                self.windows.popitem(last=False)
+            self.counters['opened'] += 1
+
+    def absorb(self, session_id, now=None):
+        """
+        Absorb a spike into the session's active window.
+        Returns None when no window is active, otherwise (window, extension_ms)
+        where extension_ms is 0 unless the window was just extended.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            window = self.windows.get(session_id)
+            if window is None or now >= window.ends_at:
+                return None
+            window.suppressed += 1
+            self.counters['suppressed'] += 1
+
+            extension_ms = 0
+            new_end = now + self.extension_ms / 1000
+            if (window.ends_at - now < self.extend_threshold
+                    and new_end - window.started_at <= self.max_window):
+                window.ends_at = new_end
+                window.extensions += 1
+                self.counters['extended'] += 1
+                self.windows.move_to_end(session_id)
+                extension_ms = self.extension_ms
+            return window, extension_ms
+
+    def expire(self, max_items):
+        """Drop closed windows, least recently updated first"""
+        now = time.time()
+        reclaimed = 0
+        with self.lock:
+            while self.windows and reclaimed < max_items:
+                session_id, window = next(iter(self.windows.items()))
+                if window.ends_at > now:
+                    return reclaimed, False
+                del self.windows[session_id]
+                reclaimed += 1
+            return reclaimed, bool(self.windows) and next(iter(self.windows.values())).ends_at <= now
+
+    def stats(self):
+        now = time.time()
+        with self.lock:
+            active = sum(1 for window in self.windows.values() if window.ends_at > now)
+            return dict(self.counters, active=active)
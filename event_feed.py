@@ -0,0 +1,216 @@
+"""
+Bounded, cursor-addressed feed of decisions for dashboards.
+
+Every analyzed request and user correction is appended once, with a
+feed-wide sequence number, to a fixed-size ring for its client and to a
+ring of all clients. A dashboard reads with the last sequence number it has
+seen as its cursor: finding the start is a binary search over the ring and
+the read copies only the newer entries, so polling costs scale with new
+events rather than with history. Stats are running counters updated on
+append, never recomputed by rescanning.
+
+Streaming readers block in wait() on one condition that every append
+notifies, so any number of dashboards can follow the same feed.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+
+AUDIO_ENDPOINTS = ('/audio-data', '/audio-spectrum', '/audio-levels')
+
+
+class EventRing:
+    """Fixed-capacity ring of (seq, event) with increasing seq"""
+    __slots__ = ('capacity', 'seqs', 'events', 'start', 'count', 'overwritten_seq')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.seqs = [0] * capacity
+        self.events = [None] * capacity
+        self.start = 0   # slot of the oldest entry
+        self.count = 0
+        self.overwritten_seq = 0  # seq of the newest entry pushed out
+
+    def append(self, seq, event):
+        slot = (self.start + self.count) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.overwritten_seq = self.seqs[self.start]
+            self.start = (self.start + 1) % self.capacity
+        self.seqs[slot] = seq
+        self.events[slot] = event
+
+    def since(self, cursor, limit):
+        """Up to limit entries with seq > cursor, oldest first"""
+        seqs, capacity, start = self.seqs, self.capacity, self.start
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if seqs[(start + middle) % capacity] <= cursor:
+                low = middle + 1
+            else:
+                high = middle
+        stop = min(self.count, low + limit)
+        return [self.events[(start + i) % capacity] for i in range(low, stop)]
+
+
+class FeedStats:
+    """Running dashboard counters, in the extension's own stats vocabulary"""
+    __slots__ = ('decisions', 'adjustments', 'subtitle_detections', 'audio_detections',
+                 'user_corrections', 'paths', 'last_action_time')
+
+    def __init__(self):
+        self.decisions = 0
+        self.adjustments = 0
+        self.subtitle_detections = 0
+        self.audio_detections = 0
+        self.user_corrections = 0
+        self.paths = Counter()
+        self.last_action_time = None
+
+    def add(self, event):
+        if event['type'] == 'user_correction':
+            self.user_corrections += 1
+            return
+        self.decisions += 1
+        if event.get('path'):
+            self.paths[event['path']] += 1
+        if event.get('action') == 'LOWER_VOLUME':
+            self.adjustments += 1
+            self.last_action_time = event['timestamp']
+            if event.get('endpoint') in AUDIO_ENDPOINTS:
+                self.audio_detections += 1
+            else:
+                self.subtitle_detections += 1
+
+    def to_dict(self):
+        return {
+            'decisions': self.decisions,
+            'totalAdjustments': self.adjustments,
+            'subtitleDetections': self.subtitle_detections,
+            'audioDetections': self.audio_detections,
+            'userCorrections': self.user_corrections,
+            'accuracyRate': (max(0.0, (self.adjustments - self.user_corrections) / self.adjustments)
+                             if self.adjustments else 1.0),
+            'lastActionTime': self.last_action_time,
+            'paths': dict(self.paths),
+        }
+
+
+class ClientFeed:
+    __slots__ = ('ring', 'stats', 'updated_at')
+
+    def __init__(self, capacity, now):
+        self.ring = EventRing(capacity)
+        self.stats = FeedStats()
+        self.updated_at = now
+
+
+class EventFeed:
+    """Per-client and feed-wide event rings with cursors"""
+    def __init__(self, per_client=200, total=5000, max_clients=10000, idle_ttl=3600.0):
+        self.per_client = per_client
+        self.max_clients = max_clients
+        self.idle_ttl = idle_ttl
+        self.ring = EventRing(total)
+        self.stats_all = FeedStats()
+        self.clients = OrderedDict()  # client_id -> ClientFeed, least recently updated first
+        self.seq = 0
+        self.condition = threading.Condition()
+        self.evicted_clients = 0
+
+    def append(self, client_id, event, now=None):
+        """Record an event (a dict with at least 'type'); returns its sequence number"""
+        now = time.time() if now is None else now
+        with self.condition:
+            self.seq += 1
+            event = dict(event, seq=self.seq, client_id=client_id, timestamp=now)
+            feed = self.clients.pop(client_id, None)
+            if feed is None:
+                feed = ClientFeed(self.per_client, now)
+                if len(self.clients) >= self.max_clients:
+                    self.clients.popitem(last=False)
+                    self.evicted_clients += 1
+            feed.updated_at = now
+            self.clients[client_id] = feed
+            feed.ring.append(self.seq, event)
+            feed.stats.add(event)
+            self.ring.append(self.seq, event)
+            self.stats_all.add(event)
+            self.condition.notify_all()
+            return self.seq
+
+    def read(self, client_id=None, since=0, limit=100):
+        """
+        Events after the since cursor for one client (or all clients):
+        {'events', 'cursor', 'truncated', 'stats'}. truncated means some events
+        after since were overwritten before this read.
+        """
+        with self.condition:
+            return self._read(client_id, since, limit)
+
+    def wait(self, client_id=None, since=0, limit=100, timeout=15.0):
+        """Like read, but blocks up to timeout for an event newer than since"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                result = self._read(client_id, since, limit)
+                remaining = deadline - time.monotonic()
+                if result['events'] or remaining <= 0:
+                    return result
+                self.condition.wait(remaining)
+
+    def _read(self, client_id, since, limit):
+        if client_id is None:
+            ring, stats = self.ring, self.stats_all
+        else:
+            feed = self.clients.get(client_id)
+            if feed is None:
+                return {'events': [], 'cursor': max(since, 0), 'truncated': False,
+                        'stats': FeedStats().to_dict()}
+            ring, stats = feed.ring, feed.stats
+        events = ring.since(since, limit)
+        return {
+            'events': events,
+            'cursor': events[-1]['seq'] if events else max(since, 0),
+            'truncated': since < ring.overwritten_seq,
+            'stats': stats.to_dict(),
+        }
+
+    def latest(self, client_id, action):
+        """The client's most recent decision event with this action, or None"""
+        with self.condition:
+            feed = self.clients.get(client_id)
+            if feed is None:
+                return None
+            ring = feed.ring
+            for i in range(ring.count - 1, -1, -1):
+                event = ring.events[(ring.start + i) % ring.capacity]
+                if event.get('action') == action:
+                    return event
+        return None
+
+    def expire(self, max_items):
+        """Drop clients without events for idle_ttl; (reclaimed, more_pending)"""
+        cutoff = time.time() - self.idle_ttl
+        reclaimed = 0
+        with self.condition:
+            while self.clients:
+                client_id, feed = next(iter(self.clients.items()))
+                if feed.updated_at >= cutoff:
+                    break
+                if reclaimed >= max_items:
+                    return reclaimed, True
+                del self.clients[client_id]
+                reclaimed += 1
+        return reclaimed, False
+
+    def stats(self):
+        with self.condition:
+            return {
+                'cursor': self.seq,
+                'clients': len(self.clients),
+                'buffered': self.ring.count,
+                'evicted_clients': self.evicted_clients,
+            }
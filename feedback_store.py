@@ -0,0 +1,246 @@
+"""
+Write-behind store of user corrections, indexed for dashboards and suppression.
+
+/feedback hands each correction to a bounded queue and returns; a background
+writer commits queued corrections in batches to a SQLite file, together
+with per-minute counts of the ducks each decision path issued (aggregated
+in memory between batches), so false-positive rates per path are a small
+indexed range query. A full queue drops corrections (counted) rather than
+slowing requests down.
+
+Corrected moments are also kept in memory per video as sorted playback
+times, so a request at a timestamp the user already corrected can be
+answered without analysis. The index is rebuilt from the file on start.
+
+Tables:
+    corrections(created_at, client_id, video_id, playback_time, path, endpoint, confidence)
+        indexed by (video_id, playback_time) and (path, created_at)
+    duck_counts(minute, path, count)
+"""
+import bisect
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CORRECTION_COLUMNS = ('created_at', 'client_id', 'video_id', 'playback_time', 'path', 'endpoint',
+                      'confidence')
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS corrections (
+        id INTEGER PRIMARY KEY,
+        created_at REAL NOT NULL,
+        client_id TEXT,
+        video_id TEXT,
+        playback_time REAL,
+        path TEXT,
+        endpoint TEXT,
+        confidence REAL
+    );
+    CREATE INDEX IF NOT EXISTS corrections_by_video ON corrections (video_id, playback_time);
+    CREATE INDEX IF NOT EXISTS corrections_by_path ON corrections (path, created_at);
+    CREATE TABLE IF NOT EXISTS duck_counts (
+        minute INTEGER NOT NULL,
+        path TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (minute, path)
+    ) WITHOUT ROWID;
+'''
+
+
+class FeedbackStore:
+    """Background, batched correction writer with an in-memory suppression index"""
+    def __init__(self, path, suppress_window=3.0, max_queue=10000, batch_size=500,
+                 flush_interval=0.5, max_videos=10000, max_per_video=200,
+                 index_days=30, on_drop=None):
+        self.path = path
+        self.suppress_window = suppress_window
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_videos = max_videos
+        self.max_per_video = max_per_video
+        self.on_drop = on_drop
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.pending_ducks = {}  # (minute, path) -> count not yet written
+        self.corrected = OrderedDict()  # video_id -> sorted playback times, least recently corrected first
+        self.counters = {'queued': 0, 'written': 0, 'dropped': 0, 'suppressed': 0, 'batches': 0}
+
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        rows = connection.execute(
+            'SELECT video_id, playback_time FROM corrections '
+            'WHERE created_at >= ? AND video_id IS NOT NULL AND playback_time IS NOT NULL '
+            'ORDER BY created_at',
+            (time.time() - index_days * 86400,)
+        )
+        for video_id, playback_time in rows:
+            self._index(video_id, playback_time)
+
+        self.stopping = False
+        self.writer = threading.Thread(target=self._write_loop, name='feedback-writer', daemon=True)
+        self.writer.start()
+
+    def _connection(self):
+        """One connection per thread, created on first use"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return connection
+
+    def _index(self, video_id, playback_time):
+        times = self.corrected.pop(video_id, None)
+        if times is None:
+            times = []
+            if len(self.corrected) >= self.max_videos:
+                self.corrected.popitem(last=False)
+        bisect.insort(times, playback_time)
+        if len(times) > self.max_per_video:
+            # Keep the index bounded; the file still has every correction
+            times.pop(0)
+        self.corrected[video_id] = times
+
+    def record_correction(self, client_id=None, video_id=None, playback_time=None, path=None,
+                          endpoint=None, confidence=None, now=None):
+        """Queue a correction; returns False if it was dropped"""
+        now = time.time() if now is None else now
+        row = (now, client_id, video_id, playback_time, path, endpoint, confidence)
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            with self.lock:
+                self.counters['dropped'] += 1
+            if self.on_drop:
+                self.on_drop()
+            return False
+        with self.lock:
+            self.counters['queued'] += 1
+            if video_id is not None and playback_time is not None:
+                self._index(video_id, playback_time)
+        return True
+
+    def record_duck(self, path, now=None):
+        """Count a LOWER_VOLUME decision by path; written with the next batch"""
+        key = (int((time.time() if now is None else now) // 60), path or 'unknown')
+        with self.lock:
+            self.pending_ducks[key] = self.pending_ducks.get(key, 0) + 1
+
+    def suppresses(self, video_id, playback_time):
+        """The corrected playback time within suppress_window of playback_time, or None"""
+        if video_id is None or playback_time is None:
+            return None
+        with self.lock:
+            times = self.corrected.get(video_id)
+            if not times:
+                return None
+            position = bisect.bisect_left(times, playback_time - self.suppress_window)
+            if position < len(times) and times[position] <= playback_time + self.suppress_window:
+                self.counters['suppressed'] += 1
+                return times[position]
+        return None
+
+    def _write_loop(self):
+        connection = self._connection()
+        while not self.stopping:
+            batch, markers = [], []
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+                while True:
+                    if isinstance(item, threading.Event):
+                        markers.append(item)
+                    else:
+                        batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            with self.lock:
+                ducks, self.pending_ducks = self.pending_ducks, {}
+            if batch or ducks:
+                self._write_batch(connection, batch, ducks)
+            for marker in markers:
+                marker.set()
+
+    def _write_batch(self, connection, batch, ducks):
+        try:
+            connection.execute('BEGIN')
+            connection.executemany(
+                f'INSERT INTO corrections ({", ".join(CORRECTION_COLUMNS)}) '
+                f'VALUES ({", ".join("?" * len(CORRECTION_COLUMNS))})',
+                batch
+            )
+            connection.executemany(
+                'INSERT INTO duck_counts (minute, path, count) VALUES (?, ?, ?) '
+                'ON CONFLICT (minute, path) DO UPDATE SET count = count + excluded.count',
+                [(minute, path, count) for (minute, path), count in ducks.items()]
+            )
+            connection.execute('COMMIT')
+        except sqlite3.Error:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            with self.lock:
+                self.counters['dropped'] += len(batch)
+            return
+        with self.lock:
+            self.counters['written'] += len(batch)
+            self.counters['batches'] += 1
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far is committed"""
+        marker = threading.Event()
+        self.queue.put(marker, timeout=timeout)
+        return marker.wait(timeout)
+
+    def close(self, timeout=5.0):
+        self.flush(timeout)
+        self.stopping = True
+        self.writer.join(timeout)
+
+    def corrections_for_video(self, video_id, start=None, end=None, limit=500):
+        """Committed corrections of a video, in playback order"""
+        sql = ('SELECT created_at, client_id, playback_time, path, endpoint, confidence '
+               'FROM corrections WHERE video_id = ?')
+        params = [video_id]
+        if start is not None:
+            sql += ' AND playback_time >= ?'
+            params.append(start)
+        if end is not None:
+            sql += ' AND playback_time <= ?'
+            params.append(end)
+        sql += ' ORDER BY playback_time LIMIT ?'
+        params.append(limit)
+        return [
+            {'created_at': created_at, 'client_id': client_id, 'playback_time': playback_time,
+             'path': path, 'endpoint': endpoint, 'confidence': confidence}
+            for created_at, client_id, playback_time, path, endpoint, confidence
+            in self._connection().execute(sql, params)
+        ]
+
+    def false_positive_rates(self, window_seconds=3600, now=None):
+        """{path: {'ducks', 'corrections', 'rate'}} over the last window_seconds (committed data)"""
+        now = time.time() if now is None else now
+        since = now - window_seconds
+        connection = self._connection()
+        rates = {}
+        for path, ducks in connection.execute(
+                'SELECT path, SUM(count) FROM duck_counts WHERE minute >= ? GROUP BY path',
+                (int(since // 60),)):
+            rates[path] = {'ducks': ducks, 'corrections': 0}
+        for path, corrections in connection.execute(
+                'SELECT path, COUNT(*) FROM corrections WHERE created_at >= ? GROUP BY path',
+                (since,)):
+            rates.setdefault(path or 'unknown', {'ducks': 0, 'corrections': 0})['corrections'] = corrections
+        for entry in rates.values():
+            entry['rate'] = round(min(1.0, entry['corrections'] / entry['ducks']), 4) if entry['ducks'] else None
+        return rates
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, queue_depth=self.queue.qsize(),
+                        indexed_videos=len(self.corrected))
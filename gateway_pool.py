@@ -0,0 +1,201 @@
+"""
+Managed outbound connections to the LLM gateway.
+
+One httpx connection pool per worker process, shared by every request
+thread through the OpenAI client. Connections are opened ahead of traffic
+(warm-up at startup) and kept from idling out (periodic keep-alive requests
+that housekeeping schedules on their own thread), so DNS, TCP and TLS setup stay out of the LLM latency
+tail. The transport counts in-flight requests, pool saturation and every
+new connection with its setup time via httpcore's trace hook.
+
+HTTP/2 is used when enabled and the optional `h2` package is installed.
+"""
+import threading
+import time
+
+import httpx
+
+
+def http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """HTTPTransport that reports in-flight requests and new connections"""
+    def __init__(self, pool_size, on_connection=None, on_saturated=None, **kwargs):
+        super().__init__(**kwargs)
+        self.pool_size = pool_size
+        self.on_connection = on_connection
+        self.on_saturated = on_saturated
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.saturated = 0
+        self.connections_opened = 0
+        self.total_connect_ms = 0.0
+        self.last_request_at = 0.0
+
+    def handle_request(self, request):
+        with self.lock:
+            self.in_flight += 1
+            self.requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            saturated = self.in_flight > self.pool_size
+            if saturated:
+                self.saturated += 1
+            self.last_request_at = time.monotonic()
+        if saturated and self.on_saturated:
+            self.on_saturated()
+
+        # A new connection is ready once TCP (plain HTTP) or TLS setup completes
+        connect_started = {}
+        ready_event = ('connection.start_tls.complete' if request.url.scheme == 'https'
+                       else 'connection.connect_tcp.complete')
+
+        def trace(event_name, info):
+            if event_name == 'connection.connect_tcp.started':
+                connect_started['at'] = time.perf_counter()
+            elif event_name == ready_event and 'at' in connect_started:
+                self._record_connection((time.perf_counter() - connect_started.pop('at')) * 1000)
+
+        request.extensions = dict(request.extensions, trace=trace)
+        try:
+            return super().handle_request(request)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _record_connection(self, connect_ms):
+        with self.lock:
+            self.connections_opened += 1
+            self.total_connect_ms += connect_ms
+        if self.on_connection:
+            self.on_connection(connect_ms)
+
+    def pool_connections(self):
+        """(open, idle) connections currently held by the pool"""
+        try:
+            connections = list(self._pool.connections)
+            return len(connections), sum(1 for c in connections if c.is_idle())
+        except AttributeError:
+            return None, None
+
+
+class GatewayConnectionPool:
+    """Pre-warmed, kept-alive connection pool for the LLM gateway"""
+    def __init__(self, base_url, api_key=None, pool_size=20, keepalive_expiry=60.0,
+                 http2=False, warm_connections=4, keepalive_interval=20.0, timeout=10.0,
+                 on_connection=None, on_saturated=None):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'Authorization': f'Bearer {api_key}'} if api_key else {}
+        self.pool_size = pool_size
+        self.http2 = http2 and http2_available()
+        self.warm_connections = min(warm_connections, pool_size)
+        self.keepalive_interval = keepalive_interval
+        self.transport = InstrumentedTransport(
+            pool_size,
+            on_connection=on_connection,
+            on_saturated=on_saturated,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+        self.client = httpx.Client(transport=self.transport, timeout=timeout)
+        self.warmed = 0
+        self.pings = 0
+        self.ping_errors = 0
+        self.keepalive_thread = None
+        self.keepalive_lock = threading.Lock()
+
+    def _touch(self, count):
+        """Send `count` concurrent lightweight requests so that many connections are open and fresh"""
+        barrier = threading.Barrier(count)
+        failures = []
+
+        def request_models():
+            try:
+                barrier.wait(5)
+                # Any HTTP response (even 401/404) means the connection is up
+                self.client.get(f'{self.base_url}/models', headers=self.headers)
+            except (httpx.HTTPError, threading.BrokenBarrierError) as e:
+                failures.append(e)
+
+        threads = [threading.Thread(target=request_models, name='crest-llm-warmup', daemon=True)
+                   for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return count - len(failures)
+
+    def warm(self, count=None):
+        """Open connections before the first real request; returns how many succeeded"""
+        count = self.warm_connections if count is None else count
+        if count <= 0:
+            return 0
+        self.warmed = self._touch(count)
+        return self.warmed
+
+    def ping(self):
+        """One lightweight round trip over the pool; (status_code, latency_ms). Raises httpx.HTTPError"""
+        started = time.perf_counter()
+        response = self.client.get(f'{self.base_url}/models', headers=self.headers)
+        return response.status_code, (time.perf_counter() - started) * 1000
+
+    def keepalive(self, max_items):
+        """
+        Housekeeping task: refresh idle connections before they expire.
+        Skipped while real traffic keeps the pool busy. The round trips run
+        on a separate thread so a slow gateway doesn't stall housekeeping;
+        returns how many were scheduled.
+        """
+        if time.monotonic() - self.transport.last_request_at < self.keepalive_interval:
+            return 0, False
+        count = min(self.warm_connections, max_items)
+        if count <= 0:
+            return 0, False
+        with self.keepalive_lock:
+            if self.keepalive_thread is not None and self.keepalive_thread.is_alive():
+                return 0, False  # the previous refresh is still waiting on the gateway
+            self.keepalive_thread = threading.Thread(
+                target=self._refresh, args=(count,), name='crest-llm-keepalive', daemon=True
+            )
+            self.keepalive_thread.start()
+        return count, False
+
+    def _refresh(self, count):
+        succeeded = self._touch(count)
+        self.pings += succeeded
+        self.ping_errors += count - succeeded
+
+    def stats(self):
+        transport = self.transport
+        open_connections, idle_connections = transport.pool_connections()
+        with transport.lock:
+            return {
+                'pool_size': self.pool_size,
+                'http2': self.http2,
+                'in_flight': transport.in_flight,
+                'peak_in_flight': transport.peak_in_flight,
+                'saturated': transport.saturated,
+                'requests': transport.requests,
+                'connections_opened': transport.connections_opened,
+                'avg_connect_ms': round(transport.total_connect_ms / transport.connections_opened, 3)
+                if transport.connections_opened else 0.0,
+                'open_connections': open_connections,
+                'idle_connections': idle_connections,
+                'warmed': self.warmed,
+                'keepalive_pings': self.pings,
+                'keepalive_errors': self.ping_errors,
+            }
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,142 @@
+"""
+Background housekeeping for Crest's in-memory state.
+
+One daemon thread runs registered maintenance tasks (cache expiry, stale
+request cleanup, session pruning) from a heap ordered by next run time.
+Each run handles at most `batch_size` entries, so work is done in small time
+slices off the request path. A task that reports more pending work is
+rescheduled right away instead of waiting for its next interval.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+
+
+class HousekeepingTask:
+    """A periodic maintenance job: fn(max_items) -> (reclaimed, more_pending)"""
+    def __init__(self, name, fn, interval_seconds, batch_size):
+        self.name = name
+        self.fn = fn
+        self.interval = interval_seconds
+        self.batch_size = batch_size
+        self.runs = 0
+        self.reclaimed = 0
+        self.errors = 0
+        self.total_duration_ms = 0.0
+        self.last_duration_ms = 0.0
+        self.last_run_at = None
+
+    def stats(self):
+        return {
+            'runs': self.runs,
+            'reclaimed': self.reclaimed,
+            'errors': self.errors,
+            'last_duration_ms': round(self.last_duration_ms, 3),
+            'total_duration_ms': round(self.total_duration_ms, 3),
+            'last_run_at': self.last_run_at,
+        }
+
+
+class HousekeepingScheduler:
+    """Heap-based scheduler running housekeeping tasks on a background thread"""
+    # Pause between consecutive slices of a task that still has backlog
+    BACKLOG_DELAY = 0.005
+
+    def __init__(self, on_task_run=None, on_task_error=None):
+        self.heap = []  # (next_run, sequence, task)
+        self.tasks = {}
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.on_task_run = on_task_run
+        self.on_task_error = on_task_error
+        self.thread = None
+        self.thread_pid = None
+        self.stopping = False
+
+    def add_task(self, name, fn, interval_seconds=1.0, batch_size=200):
+        """Register fn(max_items) -> (reclaimed, more_pending) to run every interval"""
+        task = HousekeepingTask(name, fn, interval_seconds, batch_size)
+        with self.condition:
+            self.tasks[name] = task
+            heapq.heappush(self.heap, (time.monotonic() + interval_seconds, next(self.sequence), task))
+            self.condition.notify()
+        return task
+
+    def start(self):
+        with self.condition:
+            # A thread inherited across fork isn't running in this process
+            if self.thread is not None and self.thread_pid == os.getpid():
+                return
+            self.thread_pid = os.getpid()
+            self.stopping = False
+            self.thread = threading.Thread(target=self._run, name='crest-housekeeping', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+            thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def run_task(self, task):
+        """Run one slice of a task and record its duration and reclaimed count"""
+        started = time.perf_counter()
+        reclaimed, more_pending = 0, False
+        try:
+            reclaimed, more_pending = task.fn(task.batch_size)
+        except Exception as e:
+            task.errors += 1
+            if self.on_task_error:
+                self.on_task_error(task, e)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        task.runs += 1
+        task.reclaimed += reclaimed
+        task.last_duration_ms = duration_ms
+        task.total_duration_ms += duration_ms
+        task.last_run_at = time.time()
+        if self.on_task_run:
+            self.on_task_run(task, reclaimed, duration_ms)
+        return more_pending
+
+    def run_pending(self, now=None):
+        """Run every task that is due, one slice each; used by the thread and by tests"""
+        now = time.monotonic() if now is None else now
+        ran = 0
+        while True:
+            with self.condition:
+                if not self.heap or self.heap[0][0] > now:
+                    return ran
+                _, _, task = heapq.heappop(self.heap)
+            more_pending = self.run_task(task)
+            ran += 1
+            delay = self.BACKLOG_DELAY if more_pending else task.interval
+            with self.condition:
+                next_run = max(now, time.monotonic()) + delay
+                heapq.heappush(self.heap, (next_run, next(self.sequence), task))
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if self.stopping:
+                    return
+                timeout = self.heap[0][0] - time.monotonic() if self.heap else None
+                if timeout is None or timeout > 0:
+                    self.condition.wait(timeout)
+                    continue
+            self.run_pending()
+
+    def stats(self):
+        return {
+            'running': self.running,
+            'tasks': {name: task.stats() for name, task in self.tasks.items()},
+        }
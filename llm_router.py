@@ -0,0 +1,214 @@
+"""
+Latency-aware, hedged routing of LLM calls across gateway endpoints/models.
+
+Each route is an (OpenAI client, model) pair. Calls go to the route with the
+lowest latency EWMA; if the answer hasn't arrived by that route's observed
+p90, a hedged second request goes to the next best route and whichever
+answers first wins. The loser is cancelled if it hasn't started and
+otherwise abandoned (its result is discarded; the sync client can't abort a
+request mid-flight). Hedges are capped by a budget that accrues a fraction
+of a hedge per call, so a slow upstream can't double the load.
+
+A failed call fails over to the next route straight away, outside the hedge
+budget. Errors charge the route a fixed large latency, so a route that fails
+fast doesn't look fast, and a route with several consecutive errors is
+ejected (ranked last) for a cooldown.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Route:
+    def __init__(self, name, client, model, alpha=0.2, window=200):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.alpha = alpha
+        self.latencies = deque(maxlen=window)
+        self.ewma_ms = None
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+        self.consecutive_errors = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+    def record(self, latency_ms, ok, error_penalty_ms=10000.0):
+        """Called under the router lock"""
+        self.requests += 1
+        if ok:
+            self.consecutive_errors = 0
+            # Only answers feed the p90 that sets the hedge delay
+            self.latencies.append(latency_ms)
+        else:
+            self.errors += 1
+            self.consecutive_errors += 1
+            # A fixed charge: an instant failure must not rank as a fast route
+            latency_ms = max(latency_ms, error_penalty_ms)
+        self.ewma_ms = latency_ms if self.ewma_ms is None else \
+            self.ewma_ms + self.alpha * (latency_ms - self.ewma_ms)
+
+    def ejected(self, now):
+        return now < self.ejected_until
+
+    def p90_ms(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+    def stats(self):
+        p90 = self.p90_ms()
+        return {
+            'model': self.model,
+            'ewma_ms': round(self.ewma_ms, 3) if self.ewma_ms is not None else None,
+            'p90_ms': round(p90, 3) if p90 is not None else None,
+            'requests': self.requests,
+            'errors': self.errors,
+            'wins': self.wins,
+            'ejected': self.ejected(time.monotonic()),
+            'ejections': self.ejections,
+        }
+
+
+class LLMRouter:
+    """Routes chat completions to the fastest route, hedging slow ones"""
+    def __init__(self, routes, hedge_ratio=0.1, hedge_burst=5.0, default_hedge_delay_ms=300.0,
+                 min_hedge_delay_ms=25.0, min_samples=20, max_workers=32, on_event=None,
+                 error_penalty_ms=10000.0, eject_after=3, eject_seconds=30.0):
+        """
+        routes: list of Route. hedge_ratio is the long-run fraction of calls
+        that may be hedged, hedge_burst the most hedges that can be saved up.
+        A route is ejected for eject_seconds after eject_after consecutive
+        errors. on_event(name) reports 'hedge_issued', 'hedge_won',
+        'hedge_denied', 'failover' and 'route_ejected'.
+        """
+        self.routes = routes
+        self.hedge_ratio = hedge_ratio
+        self.hedge_burst = hedge_burst
+        self.hedge_tokens = hedge_burst
+        self.default_hedge_delay_ms = default_hedge_delay_ms
+        self.min_hedge_delay_ms = min_hedge_delay_ms
+        self.min_samples = min_samples
+        self.error_penalty_ms = error_penalty_ms
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='crest-llm')
+        self.on_event = on_event
+        self.lock = threading.Lock()
+        self.counters = {'calls': 0, 'hedges_issued': 0, 'hedges_won': 0,
+                         'hedges_denied': 0, 'losers_cancelled': 0, 'failovers': 0, 'ejections': 0}
+
+    def _event(self, name):
+        if self.on_event:
+            self.on_event(name)
+
+    def _ranked(self):
+        """Routes by latency EWMA; unmeasured routes first so they get sampled, ejected ones last"""
+        now = time.monotonic()
+        with self.lock:
+            return sorted(self.routes, key=lambda r: (r.ejected(now), -1 if r.ewma_ms is None else r.ewma_ms))
+
+    def _hedge_delay(self, route):
+        with self.lock:
+            if len(route.latencies) < self.min_samples:
+                return self.default_hedge_delay_ms / 1000
+            return max(self.min_hedge_delay_ms, route.p90_ms()) / 1000
+
+    def _take_hedge_token(self):
+        with self.lock:
+            if self.hedge_tokens >= 1:
+                self.hedge_tokens -= 1
+                self.counters['hedges_issued'] += 1
+                return True
+            self.counters['hedges_denied'] += 1
+            return False
+
+    def _call(self, route, kwargs):
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = route.client.chat.completions.create(model=route.model, **kwargs)
+            ok = True
+            return response
+        finally:
+            ejected = False
+            with self.lock:
+                route.record((time.perf_counter() - started) * 1000, ok, self.error_penalty_ms)
+                if not ok and route.consecutive_errors >= self.eject_after \
+                        and not route.ejected(time.monotonic()):
+                    route.ejected_until = time.monotonic() + self.eject_seconds
+                    route.ejections += 1
+                    self.counters['ejections'] += 1
+                    ejected = True
+            if ejected:
+                self._event('route_ejected')
+
+    def complete(self, **kwargs):
+        """Chat completion on the best route, hedged past its p90 and failed over on errors"""
+        ranked = self._ranked()
+        primary = ranked[0]
+        untried = ranked[1:]
+        with self.lock:
+            self.counters['calls'] += 1
+            self.hedge_tokens = min(self.hedge_burst, self.hedge_tokens + self.hedge_ratio)
+
+        primary_future = self.executor.submit(self._call, primary, kwargs)
+        futures = {primary_future: primary}
+        hedge_future = None
+        done, _ = wait(futures, timeout=self._hedge_delay(primary))
+        # Hedge when the primary is slower than its p90
+        if not done:
+            if self._take_hedge_token():
+                self._event('hedge_issued')
+                # With a single route the hedge goes to the same route on another connection
+                secondary = untried.pop(0) if untried else primary
+                hedge_future = self.executor.submit(self._call, secondary, kwargs)
+                futures[hedge_future] = secondary
+            else:
+                self._event('hedge_denied')
+
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                hedge_won = future is hedge_future
+                with self.lock:
+                    futures[future].wins += 1
+                    if hedge_won:
+                        self.counters['hedges_won'] += 1
+                if hedge_won:
+                    self._event('hedge_won')
+                for loser in pending:
+                    if loser.cancel():
+                        with self.lock:
+                            self.counters['losers_cancelled'] += 1
+                return future.result()
+            if not pending and untried:
+                # Every call in flight failed: the next route gets it, budget or not
+                route = untried.pop(0)
+                with self.lock:
+                    self.counters['failovers'] += 1
+                self._event('failover')
+                failover = self.executor.submit(self._call, route, kwargs)
+                futures[failover] = route
+                pending = {failover}
+        raise error
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                self.counters,
+                hedge_budget=round(self.hedge_tokens, 3),
+                hedge_ratio=self.hedge_ratio,
+                routes={route.name: route.stats() for route in self.routes}
+            )
@@ -0,0 +1,149 @@
+"""
+Local subtitle classifier used as the first tier of the live-mode cascade.
+
+A hashed n-gram logistic regression trained offline from logged LLM
+decisions (see train_classifier.py). It answers in microseconds with no
+network call; only predictions below its confidence threshold escalate to
+the TrueFoundry gateway.
+"""
+import json
+import math
+import random
+import re
+import time
+import zlib
+
+MODEL_FORMAT = 'crest-local-classifier'
+MODEL_FORMAT_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"\[|\]|[a-z0-9']+")
+
+
+class ModelFormatError(Exception):
+    """Raised when a model file is missing fields or has an unsupported version"""
+
+
+def extract_features(text, n_features):
+    """Hash word unigrams, bigrams and SDH-tag markers into feature indices"""
+    tokens = TOKEN_PATTERN.findall(text.strip().lower())
+    features = []
+    in_tag = False
+    previous = '^'
+    for token in tokens:
+        if token == '[':
+            in_tag = True
+            continue
+        if token == ']':
+            in_tag = False
+            continue
+        # Words inside [...] are sound descriptions, keep them apart from dialogue
+        word = f"tag:{token}" if in_tag else token
+        features.append(zlib.crc32(word.encode('utf-8')) % n_features)
+        features.append(zlib.crc32(f"{previous} {word}".encode('utf-8')) % n_features)
+        previous = word
+    if text.lstrip().startswith('['):
+        features.append(zlib.crc32(b'__starts_with_tag__') % n_features)
+    return features
+
+
+class HashedNgramClassifier:
+    """Logistic regression over hashed n-gram features"""
+    def __init__(self, n_features=2 ** 18, confidence_threshold=0.9,
+                 model_version='untrained', bias=0.0, weights=None, metadata=None):
+        self.n_features = n_features
+        self.confidence_threshold = confidence_threshold
+        self.model_version = model_version
+        self.bias = bias
+        self.weights = weights or {}  # feature index -> weight, sparse
+        self.metadata = metadata or {}
+
+    def predict_proba(self, text):
+        """Probability that the text describes a loud event"""
+        weights = self.weights
+        score = self.bias
+        for index in extract_features(text, self.n_features):
+            score += weights.get(index, 0.0)
+        if score >= 0:
+            return 1.0 / (1.0 + math.exp(-score))
+        exp_score = math.exp(score)
+        return exp_score / (1.0 + exp_score)
+
+    def predict(self, text):
+        """Return (decision, confidence) where decision is 'YES' or 'NO'"""
+        probability = self.predict_proba(text)
+        if probability >= 0.5:
+            return 'YES', probability
+        return 'NO', 1.0 - probability
+
+    def is_confident(self, confidence):
+        return confidence >= self.confidence_threshold
+
+    def fit(self, examples, epochs=10, learning_rate=0.5, l2=1e-5, seed=13):
+        """Train with SGD on (text, decision) pairs"""
+        rng = random.Random(seed)
+        encoded = [
+            (extract_features(text, self.n_features), 1.0 if decision == 'YES' else 0.0)
+            for text, decision in examples
+        ]
+        weights = self.weights
+        for epoch in range(epochs):
+            rng.shuffle(encoded)
+            rate = learning_rate / (1 + epoch)
+            for features, label in encoded:
+                score = self.bias + sum(weights.get(i, 0.0) for i in features)
+                score = max(-30.0, min(30.0, score))
+                gradient = 1.0 / (1.0 + math.exp(-score)) - label
+                self.bias -= rate * gradient
+                for index in features:
+                    weight = weights.get(index, 0.0)
+                    weights[index] = weight - rate * (gradient + l2 * weight)
+        # Drop weights too small to matter so the model file stays compact
+        self.weights = {i: w for i, w in weights.items() if abs(w) > 1e-4}
+        return self
+
+    def to_dict(self):
+        return {
+            'format': MODEL_FORMAT,
+            'format_version': MODEL_FORMAT_VERSION,
+            'model_version': self.model_version,
+            'n_features': self.n_features,
+            'confidence_threshold': self.confidence_threshold,
+            'bias': self.bias,
+            'weights': {str(i): round(w, 6) for i, w in sorted(self.weights.items())},
+            'metadata': self.metadata,
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('format') != MODEL_FORMAT:
+            raise ModelFormatError("Not a Crest local classifier model")
+        if data.get('format_version') != MODEL_FORMAT_VERSION:
+            raise ModelFormatError(
+                f"Unsupported model format version {data.get('format_version')} "
+                f"(expected {MODEL_FORMAT_VERSION})"
+            )
+        try:
+            return cls(
+                n_features=data['n_features'],
+                confidence_threshold=data['confidence_threshold'],
+                model_version=data['model_version'],
+                bias=data['bias'],
+                weights={int(i): w for i, w in data['weights'].items()},
+                metadata=data.get('metadata', {}),
+            )
+        except KeyError as e:
+            raise ModelFormatError(f"Model file missing field {e}") from e
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def new_model_version():
+    """Timestamped version string for freshly trained models"""
+    return time.strftime('%Y%m%d-%H%M%S', time.gmtime())
@@ -0,0 +1,185 @@
+"""
+Streaming onset detection over per-session audio level frames.
+
+Each session keeps a fixed handful of numbers updated in constant time per
+frame:
+
+  * a fast EWMA envelope that follows the level within a frame or two,
+  * a slow EWMA baseline and EWMA absolute deviation around it, which set an
+    adaptive threshold of baseline + max(min_rise, sensitivity * deviation),
+  * a three-phase peak picker: IDLE until the envelope crosses the
+    threshold, ATTACK for up to hold_frames while it keeps rising (the
+    onset is reported at its peak), then RELEASE until it falls back below
+    release_ratio of the way from baseline to peak (or the baseline has
+    caught up with it).
+
+The baseline doesn't adapt during an attack, so an event can't raise its
+own threshold; it does during release, so a scene that stays loud becomes
+the new baseline instead of blocking the detector.
+
+Between batches the numbers live in a CompactSessionStore (typed columns,
+about 200 bytes per session including its index entry) per lock shard, so
+the session count is capped by a memory budget with LRU eviction; a batch
+loads them into an OnsetState, steps it and writes it back. Idle sessions
+expire through housekeeping.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from session_store import CompactSessionStore
+
+IDLE, ATTACK, RELEASE = 0, 1, 2
+PHASES = ('idle', 'attack', 'release')
+
+Onset = namedtuple('Onset', 'frame strength peak baseline')
+
+# Column typecodes of the stored per-session state
+STATE_FIELDS = {
+    'fast': 'd', 'slow': 'd', 'deviation': 'd', 'peak': 'd',
+    'phase': 'b', 'attack_frames': 'i', 'frames': 'i', 'onsets': 'i',
+}
+
+
+class OnsetState:
+    """One session's detector state while a batch is processed"""
+    __slots__ = tuple(STATE_FIELDS) + ('updated_at',)
+
+    def __init__(self, level, now):
+        self.fast = level
+        self.slow = level
+        self.deviation = 0.0
+        self.phase = IDLE
+        self.peak = 0.0
+        self.attack_frames = 0
+        self.frames = 0
+        self.onsets = 0
+        self.updated_at = now
+
+
+class OnsetDetector:
+    """Per-session streaming onset detectors"""
+    def __init__(self, fast_alpha=0.6, slow_alpha=0.05, sensitivity=4.0, min_rise=0.08,
+                 hold_frames=1, release_ratio=0.5, warmup_frames=5, idle_ttl=60.0,
+                 max_bytes=64 * 1024 * 1024, max_sessions=None, shards=16, lock_factory=threading.Lock):
+        """
+        max_bytes caps the session state of all shards together, or give
+        max_sessions; past the cap the least recently updated session is evicted.
+        """
+        self.fast_alpha = fast_alpha
+        self.slow_alpha = slow_alpha
+        self.sensitivity = sensitivity
+        self.min_rise = min_rise
+        self.hold_frames = hold_frames
+        self.release_ratio = release_ratio
+        self.warmup_frames = warmup_frames
+        self.idle_ttl = idle_ttl
+        self.shards = [
+            (CompactSessionStore(
+                STATE_FIELDS,
+                capacity=-(-max_sessions // shards) if max_sessions else None,
+                max_bytes=max_bytes // shards
+            ), lock_factory())
+            for _ in range(shards)
+        ]
+        self.cleanup_cursor = 0
+        self.frames = 0
+        self.onsets = 0
+
+    def _shard(self, session_id):
+        return self.shards[hash(session_id) % len(self.shards)]
+
+    def step(self, state, level):
+        """Advance one session by one frame; returns an Onset or None"""
+        frame = state.frames
+        state.frames = frame + 1
+        fast = state.fast + self.fast_alpha * (level - state.fast)
+        state.fast = fast
+
+        if state.phase == IDLE:
+            threshold = state.slow + max(self.min_rise, self.sensitivity * state.deviation)
+            if fast <= threshold or frame < self.warmup_frames:
+                state.deviation += self.slow_alpha * (abs(level - state.slow) - state.deviation)
+                state.slow += self.slow_alpha * (level - state.slow)
+                return None
+            state.phase = ATTACK
+            state.peak = fast
+            state.attack_frames = 0
+
+        if state.phase == ATTACK:
+            # Hold while the envelope is still rising, up to hold_frames
+            if fast >= state.peak and state.attack_frames < self.hold_frames:
+                state.peak = fast
+                state.attack_frames += 1
+                return None
+            state.peak = max(state.peak, fast)
+            state.phase = RELEASE
+            state.onsets += 1
+            return Onset(frame, state.peak - state.slow, state.peak, state.slow)
+
+        # RELEASE: re-arm once the level has come back down
+        state.deviation += self.slow_alpha * (abs(level - state.slow) - state.deviation)
+        state.slow += self.slow_alpha * (level - state.slow)
+        release_level = state.slow + max(self.min_rise, self.release_ratio * (state.peak - state.slow))
+        if fast < release_level:
+            state.phase = IDLE
+        return None
+
+    def process(self, session_id, levels, now=None):
+        """Feed a batch of level frames (0..1) for a session; returns the Onsets found"""
+        now = time.time() if now is None else now
+        store, lock = self._shard(session_id)
+        onsets = []
+        with lock:
+            slot, created = store.acquire(session_id, now)
+            if created:
+                state = OnsetState(float(levels[0]) if levels else 0.0, now)
+            else:
+                state = OnsetState.__new__(OnsetState)
+                for name, column in store.columns.items():
+                    setattr(state, name, column[slot])
+            step = self.step
+            for level in levels:
+                onset = step(state, level)
+                if onset is not None:
+                    onsets.append(onset)
+            for name, column in store.columns.items():
+                column[slot] = getattr(state, name)
+            self.frames += len(levels)
+            self.onsets += len(onsets)
+        return onsets
+
+    def phase(self, session_id):
+        store, lock = self._shard(session_id)
+        with lock:
+            slot = store.find(session_id)
+            return PHASES[store.columns['phase'][slot]] if slot is not None else None
+
+    def expire(self, max_items):
+        """Drop sessions without frames for idle_ttl; (reclaimed, more_pending)"""
+        cutoff = time.time() - self.idle_ttl
+        reclaimed = 0
+        for _ in range(len(self.shards)):
+            store, lock = self.shards[self.cleanup_cursor]
+            self.cleanup_cursor = (self.cleanup_cursor + 1) % len(self.shards)
+            with lock:
+                shard_reclaimed, more_pending = store.expire(cutoff, max_items - reclaimed)
+            reclaimed += shard_reclaimed
+            if more_pending:
+                return reclaimed, True
+        return reclaimed, False
+
+    def memory_bytes(self):
+        return sum(store.memory_bytes() for store, _ in self.shards)
+
+    def stats(self):
+        stores = [store.stats() for store, _ in self.shards]
+        return {
+            'sessions': sum(store['sessions'] for store in stores),
+            'frames': self.frames,
+            'onsets': self.onsets,
+            'capacity': sum(store['capacity'] for store in stores),
+            'evictions': sum(store['evictions'] for store in stores),
+            'memory_bytes': sum(store['memory_bytes'] for store in stores),
+            'max_bytes': sum(store['max_bytes'] for store in stores),
+        }
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Precompute decisions for the most common caption strings
+
+Reads a caption corpus (plain text with one caption per line, JSONL records
+with a "text" field, or the server's JSON logs), normalizes and dedupes the
+captions, classifies the most frequent ones in parallel through the
+configured decision path (local model / LLM, or the rules in mock mode) and
+writes a compact table that app.py memory-maps at startup
+(CREST_DECISION_TABLE_PATH) as a read-only tier below the decision cache.
+
+Usage: python precompute_decisions.py captions.txt [server.log ...] --top 5000 --output models/decision_table.bin
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from caption_sessions import normalize_caption
+from decision_table import write_decision_table
+
+
+def load_corpus(paths):
+    """Count normalized caption texts across corpus files"""
+    counts = Counter()
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('{'):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    line = record.get('text') or record.get('subtitle_text') or ''
+                text = normalize_caption(line)
+                if text:
+                    counts[text] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute Crest decisions for common captions")
+    parser.add_argument('inputs', nargs='+', help="caption text, JSONL or JSON server log files")
+    parser.add_argument('--output', default=os.path.join('models', 'decision_table.bin'))
+    parser.add_argument('--top', type=int, default=5000, help="number of most frequent captions to keep")
+    parser.add_argument('--min-count', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    counts = load_corpus(args.inputs)
+    texts = [text for text, count in counts.most_common(args.top) if count >= args.min_count]
+    if not texts:
+        print("❌ No captions found in the corpus")
+        sys.exit(1)
+
+    # Imported here so --help and corpus errors don't pay for app startup
+    import app
+    from backend_scheduler import PriorityScheduler
+
+    # Classify from scratch rather than from a previously loaded table, and let
+    # every worker hold a backend slot: this process serves no live traffic
+    app.decision_cache.use_precomputed(None)
+    app.backend_scheduler = PriorityScheduler(args.workers, {
+        'bulk': dict(weight=1, max_concurrency=args.workers, max_queue=args.workers * 2, max_wait=600.0),
+    })
+
+    def classify(text):
+        app.analyze_subtitle_for_loud_events(text, work_class='bulk')
+        # Only decisions the server itself would cache (no errors, fallbacks
+        # or shed requests) are trusted for the table
+        return text, app.decision_cache.get_cached_decision(text)
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(classify, texts))
+    decisions = {text: decision for text, decision in results if decision in ('YES', 'NO')}
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    entries = write_decision_table(args.output, decisions)
+
+    covered = sum(counts[text] for text in decisions)
+    print("📋 CREST DECISION TABLE")
+    print("=" * 40)
+    print(f"   Corpus:        {sum(counts.values())} captions, {len(counts)} unique")
+    print(f"   Classified:    {len(decisions)}/{len(texts)} in {time.time() - started:.1f}s "
+          f"({len(texts) - len(decisions)} skipped)")
+    print(f"   Loud (YES):    {sum(d == 'YES' for d in decisions.values())}")
+    print(f"   Corpus share:  {covered / sum(counts.values()):.1%} of caption occurrences")
+    print(f"✅ Wrote {args.output} ({entries} entries, {os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
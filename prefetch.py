@@ -0,0 +1,166 @@
+"""
+Speculative prefetch of upcoming caption decisions.
+
+The player often has caption cues before they are displayed. Clients submit
+those cues with their start times; background workers classify them at low
+priority, earliest cue first, and store the decision with a TTL that reaches
+past the cue's playback time, so the /data call at display time is a cache
+hit. Only authoritative decisions are stored: a fallback answer (work shed
+under load, an LLM error) would otherwise pin a guess for the whole lead.
+Lookups of prefetched texts are counted to report a prefetch hit rate.
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+
+class Prefetcher:
+    """Bounded background queue of caption cues to classify ahead of playback"""
+    def __init__(self, classify, store, is_cached, workers=2, max_pending=2000,
+                 slack_seconds=30, max_lead_seconds=600):
+        """
+        classify(text) -> (decision, cacheable) runs the normal (low priority)
+        decision path, store(text, decision, ttl_seconds) writes cacheable
+        decisions to the decision cache and
+        is_cached(texts) -> set of texts that already have a decision.
+        """
+        self.classify = classify
+        self.store = store
+        self.is_cached = is_cached
+        self.worker_count = workers
+        self.max_pending = max_pending
+        self.slack = slack_seconds
+        self.max_lead = max_lead_seconds
+        self.heap = []  # (due_at, sequence, text, ttl_seconds, timed)
+        self.sequence = itertools.count()
+        self.queued = set()
+        self.prefetched = OrderedDict()  # text -> expires_at, oldest first
+        self.condition = threading.Condition()
+        self.threads = []
+        self.counters = {'submitted': 0, 'already_cached': 0, 'dropped': 0, 'stale': 0,
+                         'classified': 0, 'uncacheable': 0, 'errors': 0, 'hits': 0, 'late': 0}
+
+    def submit(self, cues, playback_time=None, now=None):
+        """
+        Queue cues ({'text', 'start_time'} in video seconds) for classification.
+        Returns counts of queued, already cached and dropped cues.
+        """
+        now = time.time() if now is None else now
+        texts = {}
+        for cue in cues:
+            text = (cue.get('text') or '').strip() if isinstance(cue, dict) else ''
+            if not text:
+                continue
+            lead = None
+            if playback_time is not None and cue.get('start_time') is not None:
+                lead = min(self.max_lead, max(0.0, float(cue['start_time']) - float(playback_time)))
+            if text not in texts or (lead is not None and (texts[text] is None or lead < texts[text])):
+                texts[text] = lead
+
+        cached = self.is_cached(list(texts)) if texts else set()
+        result = {'queued': 0, 'cached': 0, 'dropped': 0}
+        with self.condition:
+            for text, lead in texts.items():
+                self.counters['submitted'] += 1
+                if text in cached or text in self.queued:
+                    self.counters['already_cached'] += 1
+                    result['cached'] += 1
+                    continue
+                if len(self.queued) >= self.max_pending:
+                    self.counters['dropped'] += 1
+                    result['dropped'] += 1
+                    continue
+                # Cache long enough to cover the wait until the cue is displayed;
+                # cues without a start time go after the timed ones
+                timed = lead is not None
+                due_at = now + lead if timed else now + self.max_lead
+                heapq.heappush(self.heap, (due_at, next(self.sequence), text,
+                                           (lead if timed else 0.0) + self.slack, timed))
+                self.queued.add(text)
+                result['queued'] += 1
+            if result['queued']:
+                self._ensure_workers()
+                self.condition.notify(result['queued'])
+        return result
+
+    def _ensure_workers(self):
+        self.threads = [thread for thread in self.threads if thread.is_alive()]
+        while len(self.threads) < self.worker_count:
+            thread = threading.Thread(target=self._run, name=f'crest-prefetch-{len(self.threads)}',
+                                      daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _next_cue(self):
+        with self.condition:
+            while not self.heap:
+                self.condition.wait()
+            due_at, _, text, ttl, timed = heapq.heappop(self.heap)
+            return due_at, text, ttl, timed
+
+    def run_one(self, due_at, text, ttl, timed=True):
+        """Classify one cue; used by the workers and by tests"""
+        try:
+            if timed and due_at < time.time():
+                # Already displayed: /data has classified it by now
+                with self.condition:
+                    self.counters['stale'] += 1
+                return None
+            try:
+                decision, cacheable = self.classify(text)
+            except Exception:
+                with self.condition:
+                    self.counters['errors'] += 1
+                return None
+            if not cacheable:
+                # Left for the display-time /data call to classify properly
+                with self.condition:
+                    self.counters['uncacheable'] += 1
+                return decision
+            self.store(text, decision, ttl)
+            with self.condition:
+                self.counters['classified'] += 1
+                self.prefetched.pop(text, None)
+                self.prefetched[text] = time.time() + ttl
+            return decision
+        finally:
+            with self.condition:
+                self.queued.discard(text)
+
+    def _run(self):
+        while True:
+            self.run_one(*self._next_cue())
+
+    def record_lookup(self, text):
+        """Count a live lookup of text; returns True if prefetch answered it ahead of time"""
+        with self.condition:
+            if self.prefetched.pop(text, None) is not None:
+                self.counters['hits'] += 1
+                return True
+            if text in self.queued:
+                self.counters['late'] += 1
+            return False
+
+    def expire(self, max_items):
+        """Forget prefetched texts whose cache entries have expired"""
+        now = time.time()
+        reclaimed = 0
+        with self.condition:
+            while self.prefetched and reclaimed < max_items:
+                text, expires_at = next(iter(self.prefetched.items()))
+                if expires_at > now:
+                    return reclaimed, False
+                del self.prefetched[text]
+                reclaimed += 1
+            return reclaimed, bool(self.prefetched) and next(iter(self.prefetched.values())) <= now
+
+    def stats(self):
+        with self.condition:
+            classified = self.counters['classified']
+            return dict(
+                self.counters,
+                pending=len(self.queued),
+                hit_rate=round(self.counters['hits'] / classified, 4) if classified else 0.0
+            )
@@ -0,0 +1,150 @@
+"""
+Background dependency probes behind a precomputed readiness response.
+
+Each registered probe (LLM gateway, cache tier, metrics sink, queues) runs
+on a daemon thread every interval, never on a request. A probe is
+fn() -> details dict and signals failure by raising. Results are kept per
+dependency with a small circuit: 'closed' while it passes, 'open' after
+open_after consecutive failures, 'half_open' for the first pass after
+that.
+
+After each round the readiness JSON body and status code are encoded once,
+so /readyz only hands out the cached bytes. The service is ready when every
+critical probe passes and the last round isn't older than stale_after;
+non-critical failures report 'degraded' but stay ready, since those paths
+fall back (heuristics, local cache, buffered metrics).
+"""
+import json
+import os
+import threading
+import time
+
+
+class ProbeResult:
+    __slots__ = ('ok', 'latency_ms', 'checked_at', 'details', 'error', 'failures', 'circuit')
+
+    def __init__(self):
+        self.ok = None
+        self.latency_ms = None
+        self.checked_at = None
+        self.details = {}
+        self.error = None
+        self.failures = 0
+        self.circuit = 'closed'
+
+    def to_dict(self):
+        return {
+            'ok': self.ok,
+            'circuit': self.circuit,
+            'latency_ms': round(self.latency_ms, 3) if self.latency_ms is not None else None,
+            'checked_at': self.checked_at,
+            'consecutive_failures': self.failures,
+            'error': self.error,
+            'details': self.details,
+        }
+
+
+class ReadinessMonitor:
+    """Runs dependency probes on a schedule and caches the readiness response"""
+    def __init__(self, interval_seconds=5.0, stale_after=30.0, open_after=3, clock=time.time):
+        self.interval = interval_seconds
+        self.stale_after = stale_after
+        self.open_after = open_after
+        self.clock = clock
+        self.probes = {}  # name -> (fn, critical)
+        self.results = {}
+        self.rounds = 0
+        self.last_round_at = None
+        self.lock = threading.Lock()
+        self.thread = None
+        self.thread_pid = None
+        self.stop_event = threading.Event()
+        self.cached = (self._encode({'status': 'starting', 'ready': False, 'checks': {}}), 503)
+        # Served instead of the cache if the probe thread stops refreshing it
+        self.stale_response = (self._encode({'status': 'not_ready', 'ready': False, 'stale': True}), 503)
+
+    def register(self, name, fn, critical=False):
+        self.probes[name] = (fn, critical)
+        self.results[name] = ProbeResult()
+
+    def run_probe(self, name):
+        fn, _ = self.probes[name]
+        result = self.results[name]
+        started = time.perf_counter()
+        try:
+            details = fn() or {}
+            ok, error = True, None
+        except Exception as e:
+            details, ok, error = {}, False, f"{type(e).__name__}: {e}"
+        result.latency_ms = (time.perf_counter() - started) * 1000
+        result.checked_at = self.clock()
+        result.details = details
+        result.error = error
+        result.ok = ok
+        if ok:
+            result.circuit = 'half_open' if result.circuit == 'open' else 'closed'
+            result.failures = 0
+        else:
+            result.failures += 1
+            if result.failures >= self.open_after:
+                result.circuit = 'open'
+
+    def run_round(self):
+        """Probe every dependency once and refresh the cached response"""
+        for name in list(self.probes):
+            self.run_probe(name)
+        with self.lock:
+            self.rounds += 1
+            self.last_round_at = self.clock()
+        self.refresh()
+
+    def refresh(self):
+        """Re-encode the cached response from the latest results"""
+        now = self.clock()
+        checks = {name: result.to_dict() for name, result in self.results.items()}
+        critical_ok = all(self.results[name].ok for name, (_, critical) in self.probes.items() if critical)
+        all_ok = all(result.ok for result in self.results.values())
+        stale = self.last_round_at is None or now - self.last_round_at > self.stale_after
+        ready = critical_ok and not stale
+        body = {
+            'status': 'not_ready' if not ready else ('ready' if all_ok else 'degraded'),
+            'ready': ready,
+            'stale': stale,
+            'rounds': self.rounds,
+            'last_round_at': self.last_round_at,
+            'checks': checks,
+        }
+        with self.lock:
+            self.cached = (self._encode(body), 200 if ready else 503)
+
+    @staticmethod
+    def _encode(body):
+        return json.dumps(body, separators=(',', ':'), default=str).encode('utf-8')
+
+    def response(self):
+        """(body bytes, status) of the latest round; no probing, no encoding"""
+        last_round_at = self.last_round_at
+        if last_round_at is not None and self.clock() - last_round_at > self.stale_after:
+            return self.stale_response
+        return self.cached
+
+    def snapshot(self):
+        body, _ = self.cached
+        return json.loads(body)
+
+    def start(self):
+        with self.lock:
+            # A thread inherited across fork isn't running in this process
+            if self.thread is not None and self.thread_pid == os.getpid():
+                return
+            self.thread_pid = os.getpid()
+            self.thread = threading.Thread(target=self._loop, name='crest-readiness', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _loop(self):
+        while not self.stop_event.is_set():
+            self.run_round()
+            self.stop_event.wait(self.interval)
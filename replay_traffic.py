@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Replay a traffic journal against this build and diff the outcomes
+
+Reads the journal written by the server (CREST_JOURNAL_DIR) and re-drives
+every journaled request, either in-process through the Flask
+app (the default: the analyzers, caches and rules of this checkout, with
+admission rate limits lifted) or against a running server with --target.
+Requests go out at their original pace scaled by --speed, or back to back
+with --speed 0. Decisions, status codes and (in-process) the answering path
+are diffed against the journal, and latency distributions compared.
+
+Session state such as duck windows and rolling captions depends on pacing,
+so accelerated replays can legitimately differ on those requests.
+
+Usage: python replay_traffic.py journal_dir [--target http://localhost:5000] [--speed 1.0] [--fail-on-diff]
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from traffic_journal import JournalError, read_journal
+
+
+def decision_of(response):
+    """The action a response asked the extension to take"""
+    if not isinstance(response, dict):
+        return None
+    return response.get('action') or ('ERROR' if 'error' in response else None)
+
+
+def in_process_sender():
+    """Send through the app's test client; returns send(record) -> (status, response, path)"""
+    # Imported here so --help and journal errors don't pay for app startup
+    import app
+    from admission import ClientRateLimiter
+
+    # Don't journal the replay itself, and don't shed a replayed burst
+    app.traffic_journal = None
+    app.subtitle_rate_limiter = ClientRateLimiter(rate=1e9, burst=1e9)
+    app.audio_rate_limiter = ClientRateLimiter(rate=1e9, burst=1e9)
+    clients = threading.local()
+
+    def send(record):
+        if not hasattr(clients, 'client'):
+            clients.client = app.app.test_client()
+        response = clients.client.post(record.endpoint, json=record.request)
+        return response.status_code, response.get_json(silent=True), getattr(app.decision_trace, 'path', None)
+    return send
+
+
+def http_sender(target, timeout=10.0):
+    """Send to a running server; the answering path isn't visible over HTTP"""
+    import requests
+
+    sessions = threading.local()
+
+    def send(record):
+        if not hasattr(sessions, 'session'):
+            sessions.session = requests.Session()
+        try:
+            response = sessions.session.post(target.rstrip('/') + record.endpoint,
+                                             json=record.request, timeout=timeout)
+        except requests.RequestException as e:
+            return 0, {'error': str(e)}, None
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body, None
+    return send
+
+
+def replay(records, send, speed=0.0, workers=8):
+    """
+    Re-drive records through send, paced at speed x the original timing
+    (0 = as fast as the workers allow). Returns (status, response, path,
+    latency_ms) per record, in journal order.
+    """
+    if not records:
+        return []
+    first_timestamp = records[0].timestamp
+    started = time.monotonic()
+
+    def timed_send(record):
+        sent = time.perf_counter()
+        status, response, path = send(record)
+        return status, response, path, (time.perf_counter() - sent) * 1000
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for record in records:
+            if speed > 0:
+                delay = started + (record.timestamp - first_timestamp) / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(executor.submit(timed_send, record))
+        return [future.result() for future in futures]
+
+
+def percentiles(values):
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+
+    def rank(q):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+    return {'count': len(ordered), 'p50': rank(0.5), 'p90': rank(0.9), 'p99': rank(0.99),
+            'max': round(ordered[-1], 3)}
+
+
+def compare(records, results):
+    """Per-endpoint diff of decisions, statuses and paths, plus latency distributions"""
+    report = defaultdict(lambda: {
+        'requests': 0, 'decision_changed': 0, 'status_changed': 0, 'path_changed': 0,
+        'transitions': Counter(), 'examples': [], 'original_latency': [], 'replay_latency': []
+    })
+    for record, (status, response, path, latency_ms) in zip(records, results):
+        entry = report[record.endpoint]
+        entry['requests'] += 1
+        entry['original_latency'].append(record.latency_ms)
+        entry['replay_latency'].append(latency_ms)
+        before, after = decision_of(record.response), decision_of(response)
+        changed = before != after
+        if changed:
+            entry['decision_changed'] += 1
+            entry['transitions'][f'{before} -> {after}'] += 1
+        if status != record.status:
+            entry['status_changed'] += 1
+        if path is not None and path != record.path:
+            entry['path_changed'] += 1
+        if changed or status != record.status:
+            entry['examples'].append({
+                'request': record.request, 'before': before, 'after': after,
+                'status': (record.status, status), 'path': (record.path, path)
+            })
+
+    for entry in report.values():
+        entry['original_latency'] = percentiles(entry['original_latency'])
+        entry['replay_latency'] = percentiles(entry['replay_latency'])
+    return dict(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Crest traffic journal and diff the decisions")
+    parser.add_argument('journals', nargs='+', help="journal directories or .crtj files")
+    parser.add_argument('--target', help="base URL of a running server (default: replay in-process)")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="pace relative to the original traffic; 0 replays back to back")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--limit', type=int, default=0, help="replay at most this many requests")
+    parser.add_argument('--show', type=int, default=10, help="changed requests to print per endpoint")
+    parser.add_argument('--fail-on-diff', action='store_true', help="exit 1 if any decision changed")
+    args = parser.parse_args()
+
+    try:
+        records = list(read_journal(args.journals))
+    except JournalError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    # Rate-limited requests were never analyzed, so there is nothing to compare
+    skipped = sum(1 for record in records if record.status == 429)
+    records = [record for record in records if record.status != 429]
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print("❌ No replayable requests in the journal")
+        sys.exit(1)
+
+    send = http_sender(args.target) if args.target else in_process_sender()
+    started = time.time()
+    results = replay(records, send, speed=args.speed, workers=args.workers)
+    report = compare(records, results)
+
+    print("🔁 CREST TRAFFIC REPLAY")
+    print("=" * 40)
+    print(f"   Target:   {args.target or 'in-process'} at "
+          f"{'full speed' if args.speed <= 0 else f'{args.speed:g}x'}")
+    print(f"   Replayed: {len(records)} requests in {time.time() - started:.1f}s "
+          f"({skipped} rate-limited skipped)")
+    changed = 0
+    for endpoint, entry in sorted(report.items()):
+        changed += entry['decision_changed']
+        print(f"\n   {endpoint}: {entry['requests']} requests")
+        print(f"      Decisions changed: {entry['decision_changed']}  "
+              f"statuses changed: {entry['status_changed']}  paths changed: {entry['path_changed']}")
+        for transition, count in entry['transitions'].most_common():
+            print(f"         {transition}: {count}")
+        for label in ('original_latency', 'replay_latency'):
+            stats = entry[label]
+            print(f"      {label.replace('_', ' ').capitalize():17} p50 {stats['p50']}ms  "
+                  f"p90 {stats['p90']}ms  p99 {stats['p99']}ms  max {stats['max']}ms")
+        for example in entry['examples'][:args.show]:
+            print(f"      ≠ {example['request']}: {example['before']} -> {example['after']} "
+                  f"(path {example['path'][0]} -> {example['path'][1]})")
+
+    if changed:
+        print(f"\n⚠️  {changed} decisions changed")
+        if args.fail_on_diff:
+            sys.exit(1)
+    else:
+        print("\n✅ Every decision matched the journal")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Fast-path JSON encoding for the hot response shapes.
+
+dumps() uses orjson when it is installed (several times faster than the
+stdlib encoder behind jsonify, and it returns bytes directly) and falls
+back to a compact json.dumps otherwise.
+
+Most responses are one of a few fixed shapes whose varying fields take a
+handful of values (a confidence tier, an onset phase, 'NO'). A
+ResponseTemplate encodes its shape once per distinct set of slot values
+and serves the cached bytes after that; a shape without slots is encoded
+once at import. A template stops caching once max_cached bodies are
+stored; templates whose slots carry client-supplied values (echoed text)
+use max_cached=0 and encode every body through dumps() without keeping it.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENCODER = 'orjson' if orjson is not None else 'json'
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj):
+        """Compact JSON bytes of obj"""
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+else:
+    _encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+    def dumps(obj):
+        """Compact JSON bytes of obj"""
+        return _encoder.encode(obj).encode('utf-8')
+
+
+class Slot:
+    """Placeholder for a value filled in when a template is rendered"""
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+
+def _fill_slots(value, values):
+    if isinstance(value, Slot):
+        return values[value.name]
+    if isinstance(value, dict):
+        return {key: _fill_slots(item, values) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_fill_slots(item, values) for item in value]
+    return value
+
+
+def _slot_names(value):
+    if isinstance(value, Slot):
+        return [value.name]
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        return [name for item in value for name in _slot_names(item)]
+    return []
+
+
+class ResponseTemplate:
+    """A response shape whose encoded bodies are cached per distinct slot values"""
+    def __init__(self, shape, max_cached=256):
+        self.shape = shape
+        self.slots = tuple(_slot_names(shape))
+        self.max_cached = max_cached
+        self.bodies = {}
+        self.constant = dumps(shape) if not self.slots else None
+
+    def render(self, **values):
+        """JSON bytes of the shape with the slots filled in"""
+        if self.constant is not None:
+            return self.constant
+        if not self.max_cached:
+            return dumps(_fill_slots(self.shape, values))
+        # Types are part of the key: 1, 1.0 and True are equal but encode differently
+        try:
+            key = tuple([(type(values[name]), values[name]) for name in self.slots])
+            body = self.bodies.get(key)
+        except TypeError:  # unhashable slot value
+            return dumps(_fill_slots(self.shape, values))
+        if body is None:
+            body = dumps(_fill_slots(self.shape, values))
+            if len(self.bodies) < self.max_cached:
+                self.bodies[key] = body
+        return body
+
+    def to_dict(self, **values):
+        """The rendered response as a dict, for code that inspects responses"""
+        return _fill_slots(self.shape, values)
+
+    def field(self, name, values):
+        """One top-level field of the rendered response, without building the rest"""
+        value = self.shape.get(name)
+        return values[value.name] if isinstance(value, Slot) else value
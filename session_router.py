@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Session-affine dispatcher in front of Crest workers or nodes
+
+Per-session state (duck windows, rolling captions, onset detectors, the
+feedback index) lives in the memory of whichever process served the
+session. This dispatcher consistent-hashes each request's video/session id
+onto a ring of backends, so a session keeps landing on the same warm
+worker, and forwards the request over a kept-alive connection.
+
+The ring gives every backend many virtual points; adding or removing a
+backend only moves the keys on the arcs it gains or loses (about 1/N of
+them). Backends that refuse connections are taken off the ring after a few
+failures and put back when /livez answers again. A request is only sent
+again (retried or failed over) if it never reached the backend, or if its
+method is idempotent. Per-backend load is served at /router/stats.
+
+Usage: python session_router.py --backend http://10.0.0.1:5003 --backend http://10.0.0.2:5003 [--port 5003]
+"""
+import argparse
+import bisect
+import hashlib
+import http.client
+import json
+import re
+import select
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+# Same precedence as the app's resolve_session_id, with the video first so
+# every tab on one video shares its feedback index
+ROUTING_FIELDS = (b'video_id', b'session_id', b'tab_id', b'client_id')
+# Found by pattern rather than by parsing: bodies can carry large analyser frames.
+# The lookbehind skips keys quoted inside other strings
+ROUTING_FIELD_PATTERNS = [
+    re.compile(rb'(?<!\\)"' + field + rb'"\s*:\s*(?:"((?:[^"\\]|\\.)*)"|(-?\d+))')
+    for field in ROUTING_FIELDS
+]
+HOP_BY_HOP_HEADERS = frozenset((
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade'
+))
+MAX_BODY_BYTES = 4 * 1024 * 1024
+# Safe to send again when the response was lost after the request went out
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+
+def ring_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+    def __init__(self, nodes=(), vnodes=160):
+        self.vnodes = vnodes
+        self.points = []  # sorted hashes
+        self.owners = []  # node owning each point
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        if node in self.nodes:
+            return False
+        self.nodes.add(node)
+        for replica in range(self.vnodes):
+            point = ring_hash(f"{node}#{replica}")
+            index = bisect.bisect(self.points, point)
+            self.points.insert(index, point)
+            self.owners.insert(index, node)
+        return True
+
+    def remove(self, node):
+        if node not in self.nodes:
+            return False
+        self.nodes.discard(node)
+        kept = [(point, owner) for point, owner in zip(self.points, self.owners) if owner != node]
+        self.points = [point for point, _ in kept]
+        self.owners = [owner for _, owner in kept]
+        return True
+
+    def lookup(self, key, count=1):
+        """The first count distinct nodes clockwise from the key's hash"""
+        if not self.points:
+            return []
+        index = bisect.bisect(self.points, ring_hash(key)) % len(self.points)
+        found = []
+        for step in range(len(self.points)):
+            owner = self.owners[(index + step) % len(self.points)]
+            if owner not in found:
+                found.append(owner)
+                if len(found) == count:
+                    break
+        return found
+
+    def shares(self):
+        """Fraction of the hash space each node owns"""
+        shares = dict.fromkeys(self.nodes, 0.0)
+        if not self.points:
+            return shares
+        space = float(1 << 64)
+        previous = self.points[-1] - (1 << 64)
+        for point, owner in zip(self.points, self.owners):
+            shares[owner] += (point - previous) / space
+            previous = point
+        return shares
+
+
+def routing_key(body, query_string, headers, remote_addr):
+    """The id a request's session state is keyed by, from the body, query or headers"""
+    if body:
+        for pattern in ROUTING_FIELD_PATTERNS:
+            match = pattern.search(body)
+            if match:
+                return (match.group(1) or match.group(2)).decode('utf-8', 'replace')
+    if query_string:
+        query = parse_qs(query_string)
+        for field in ROUTING_FIELDS:
+            values = query.get(field.decode())
+            if values and values[0]:
+                return values[0]
+    return headers.get('X-Crest-Client-Id') or remote_addr or ''
+
+
+class ResponseLost(Exception):
+    """The request was sent but the connection failed before a response arrived"""
+
+
+class Backend:
+    """One worker or node: its address, kept-alive connections and load counters"""
+    def __init__(self, url, timeout=30.0):
+        parts = urlsplit(url if '://' in url else f"http://{url}")
+        self.name = f"{parts.hostname}:{parts.port or 80}"
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.counters = {'requests': 0, 'errors': 0, 'failovers_in': 0, 'in_flight': 0}
+        self.consecutive_failures = 0
+        self.up = True
+
+    def connection(self, fresh=False):
+        """This thread's connection to the backend"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None and not fresh and connection.sock is not None:
+            # An idle kept-alive socket is only readable once the backend closed it
+            fresh = bool(select.select([connection.sock], [], [], 0)[0])
+        if connection is None or fresh:
+            if connection is not None:
+                connection.close()
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.local.connection = connection
+        return connection
+
+    def discard_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    def count(self, name, delta=1):
+        with self.lock:
+            self.counters[name] += delta
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, up=self.up)
+
+
+class SessionRouter:
+    """WSGI app forwarding each request to the backend its session hashes to"""
+    def __init__(self, backends, vnodes=160, eject_after=3, probe_interval=2.0, timeout=30.0):
+        self.backends = {}
+        for url in backends:
+            backend = Backend(url, timeout=timeout)
+            self.backends[backend.name] = backend
+        self.ring = HashRing(self.backends, vnodes=vnodes)
+        self.ring_lock = threading.Lock()
+        self.eject_after = eject_after
+        self.probe_interval = probe_interval
+        self.started_at = time.time()
+        self.prober = None
+
+    def start_probing(self):
+        """Re-admit ejected backends once their /livez answers"""
+        def probe_loop():
+            while True:
+                time.sleep(self.probe_interval)
+                for backend in list(self.backends.values()):
+                    if not backend.up and self.probe(backend):
+                        self.mark_up(backend)
+        self.prober = threading.Thread(target=probe_loop, name='router-prober', daemon=True)
+        self.prober.start()
+
+    def probe(self, backend):
+        connection = http.client.HTTPConnection(backend.host, backend.port, timeout=2.0)
+        try:
+            connection.request('GET', '/livez')
+            return connection.getresponse().status == 200
+        except (OSError, http.client.HTTPException):
+            return False
+        finally:
+            connection.close()
+
+    def mark_down(self, backend):
+        with backend.lock:
+            backend.consecutive_failures += 1
+            eject = backend.up and backend.consecutive_failures >= self.eject_after
+            if eject:
+                backend.up = False
+        # Keep at least one backend on the ring: with none, every request would fail anyway
+        if eject:
+            with self.ring_lock:
+                if len(self.ring.nodes) > 1:
+                    self.ring.remove(backend.name)
+                else:
+                    backend.up = True
+
+    def mark_up(self, backend):
+        with backend.lock:
+            backend.consecutive_failures = 0
+            backend.up = True
+        with self.ring_lock:
+            self.ring.add(backend.name)
+
+    def candidates(self, key):
+        with self.ring_lock:
+            names = self.ring.lookup(key, count=2)
+        return [self.backends[name] for name in names]
+
+    def stats(self):
+        with self.ring_lock:
+            shares = self.ring.shares()
+        return {
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'backends': {
+                name: dict(backend.stats(), ring_share=round(shares.get(name, 0.0), 4))
+                for name, backend in self.backends.items()
+            }
+        }
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') == '/router/stats':
+            body = json.dumps(self.stats()).encode('utf-8')
+            start_response('200 OK', [('Content-Type', 'application/json'),
+                                      ('Content-Length', str(len(body)))])
+            return [body]
+
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        if length > MAX_BODY_BYTES:
+            start_response('413 Payload Too Large', [('Content-Type', 'text/plain')])
+            return [b'Request body too large']
+        body = environ['wsgi.input'].read(length) if length else b''
+
+        headers = {}
+        for name, value in environ.items():
+            if name.startswith('HTTP_'):
+                header = name[5:].replace('_', '-').title()
+                if header.lower() not in HOP_BY_HOP_HEADERS:
+                    headers[header] = value
+        if environ.get('CONTENT_TYPE'):
+            headers['Content-Type'] = environ['CONTENT_TYPE']
+        headers['Content-Length'] = str(len(body))
+        remote_addr = environ.get('REMOTE_ADDR', '')
+        forwarded = headers.get('X-Forwarded-For')
+        headers['X-Forwarded-For'] = f"{forwarded}, {remote_addr}" if forwarded else remote_addr
+
+        path = environ.get('PATH_INFO', '/')
+        if environ.get('QUERY_STRING'):
+            path += '?' + environ['QUERY_STRING']
+        key = routing_key(body, environ.get('QUERY_STRING'), headers, remote_addr)
+
+        candidates = self.candidates(key)
+        for position, backend in enumerate(candidates):
+            try:
+                response = self.forward(backend, environ['REQUEST_METHOD'], path, body, headers)
+            except TimeoutError:
+                # The backend may still be working on it: don't send it twice
+                start_response('504 Gateway Timeout', [('Content-Type', 'text/plain')])
+                return [b'Backend timed out']
+            except ResponseLost:
+                start_response('502 Bad Gateway', [('Content-Type', 'text/plain')])
+                return [b'Backend closed the connection before answering']
+            if response is None:
+                continue
+            if position:
+                backend.count('failovers_in')
+            return self.relay(backend, response, start_response)
+
+        start_response('502 Bad Gateway', [('Content-Type', 'text/plain')])
+        return [b'No backend available']
+
+    def forward(self, backend, method, path, body, headers):
+        """Send the request; None if it never reached the backend, TimeoutError if the
+        backend didn't answer, ResponseLost if a non-idempotent request lost its answer"""
+        # A kept-alive connection the backend already closed gets one fresh retry
+        for fresh in (False, True):
+            connection = backend.connection(fresh=fresh)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+            except TimeoutError:
+                backend.discard_connection()
+                backend.count('errors')
+                raise
+            except (OSError, http.client.HTTPException):
+                backend.discard_connection()
+                if fresh:
+                    backend.count('errors')
+                    self.mark_down(backend)
+                    return None
+                continue
+            try:
+                response = connection.getresponse()
+            except TimeoutError:
+                backend.discard_connection()
+                backend.count('errors')
+                raise
+            except (OSError, http.client.HTTPException) as e:
+                backend.discard_connection()
+                if method not in IDEMPOTENT_METHODS:
+                    # The backend may have acted on it: sending it again could duplicate a POST
+                    backend.count('errors')
+                    raise ResponseLost(f"{backend.name}: {e!r}") from e
+                if fresh:
+                    backend.count('errors')
+                    self.mark_down(backend)
+                    return None
+                continue
+            with backend.lock:
+                backend.consecutive_failures = 0
+            backend.count('requests')
+            return response
+        return None
+
+    def relay(self, backend, response, start_response):
+        headers = [(name, value) for name, value in response.getheaders()
+                   if name.lower() not in HOP_BY_HOP_HEADERS]
+        start_response(f"{response.status} {response.reason}", headers)
+        backend.count('in_flight')
+
+        def body():
+            finished = False
+            try:
+                # read1 hands over whatever has arrived, so event streams aren't held back
+                while True:
+                    chunk = response.read1(65536)
+                    if not chunk:
+                        break
+                    yield chunk
+                finished = True
+            finally:
+                backend.count('in_flight', -1)
+                if not finished or response.will_close:
+                    backend.discard_connection()
+        return body()
+
+
+def serve(router, host, port, listener_fd=None):
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, router, threaded=True, fd=listener_fd)
+    router.start_probing()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crest session-affine dispatcher")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5003)
+    parser.add_argument('--backend', action='append', required=True,
+                        help="backend base URL; repeat for each worker or node")
+    parser.add_argument('--vnodes', type=int, default=160, help="ring points per backend")
+    args = parser.parse_args(argv)
+
+    router = SessionRouter(args.backend, vnodes=args.vnodes)
+    server = serve(router, args.host, args.port)
+    print(f"🔀 Crest router on {args.host}:{args.port} -> {', '.join(router.backends)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Fixed-capacity per-session records in preallocated typed columns.
+
+Each field is one array.array column of `capacity` slots (8 bytes for a
+double, 1-4 for small ints) instead of a Python object per session, and an
+index maps session ids to slots. Freed slots are reused; when every slot is
+taken the least recently used session is evicted, so memory is bounded by
+the capacity chosen up front (derived from a byte budget, with an allowance
+for the index entry and key string of each session).
+
+Not thread-safe: callers serialize access, e.g. one store per lock shard.
+"""
+import array
+import sys
+
+# Index cost per session besides the key string: dict entry and table share, slot int
+INDEX_ENTRY_BYTES = 100
+
+
+class CompactSessionStore:
+    """Session id -> slot in typed columns, with LRU eviction at capacity"""
+    def __init__(self, fields, capacity=None, max_bytes=None, expected_key_bytes=64):
+        """
+        fields: {name: array typecode}; an 'updated_at' double is always added.
+        Give either capacity (sessions) or max_bytes (memory budget).
+        """
+        fields = dict(fields, updated_at='d')
+        record_bytes = sum(array.array(code).itemsize for code in fields.values())
+        # One int32 free-list entry per slot as well
+        self.bytes_per_session = record_bytes + 4 + INDEX_ENTRY_BYTES + expected_key_bytes
+        if capacity is None:
+            if max_bytes is None:
+                raise ValueError("either capacity or max_bytes is required")
+            capacity = max_bytes // self.bytes_per_session
+        self.capacity = max(1, int(capacity))
+        self.columns = {name: array.array(code, bytes(array.array(code).itemsize * self.capacity))
+                        for name, code in fields.items()}
+        self.updated_at = self.columns['updated_at']
+        self.index = {}  # session_id -> slot, least recently used first
+        self.free = array.array('i', range(self.capacity - 1, -1, -1))
+        self.key_bytes = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def find(self, session_id):
+        """Slot of a session, or None; doesn't count as a use"""
+        return self.index.get(session_id)
+
+    def acquire(self, session_id, now):
+        """
+        Slot for session_id, marked most recently used at `now`.
+        Returns (slot, created); a created slot has every field zeroed.
+        """
+        index = self.index
+        slot = index.pop(session_id, None)
+        created = slot is None
+        if created:
+            if self.free:
+                slot = self.free.pop()
+            else:
+                oldest = next(iter(index))
+                slot = index.pop(oldest)
+                self.key_bytes -= sys.getsizeof(oldest)
+                self.evictions += 1
+            for column in self.columns.values():
+                column[slot] = 0
+            self.key_bytes += sys.getsizeof(session_id)
+        index[session_id] = slot
+        self.updated_at[slot] = now
+        return slot, created
+
+    def remove(self, session_id):
+        slot = self.index.pop(session_id, None)
+        if slot is None:
+            return False
+        self.free.append(slot)
+        self.key_bytes -= sys.getsizeof(session_id)
+        return True
+
+    def expire(self, cutoff, max_items):
+        """Remove sessions last used before cutoff, oldest first; (reclaimed, more_pending)"""
+        index, updated_at = self.index, self.updated_at
+        reclaimed = 0
+        while index:
+            oldest = next(iter(index))
+            if updated_at[index[oldest]] >= cutoff:
+                return reclaimed, False
+            if reclaimed >= max_items:
+                return reclaimed, True
+            self.remove(oldest)
+            reclaimed += 1
+        return reclaimed, False
+
+    def memory_bytes(self):
+        """Bytes held by the columns, free list, index and keys"""
+        columns = sum(column.itemsize * len(column) for column in self.columns.values())
+        # Slot numbers up to 256 are shared small ints; larger ones are objects
+        slot_ints = max(0, len(self.index) - 257) * sys.getsizeof(self.capacity)
+        return (columns + self.free.itemsize * self.capacity + sys.getsizeof(self.index)
+                + self.key_bytes + slot_ints)
+
+    def stats(self):
+        return {
+            'sessions': len(self.index),
+            'capacity': self.capacity,
+            'evictions': self.evictions,
+            'memory_bytes': self.memory_bytes(),
+            'max_bytes': self.capacity * self.bytes_per_session,
+        }
@@ -0,0 +1,232 @@
+"""
+Shared cache tier for multi-process Crest deployments.
+
+The production launcher starts one cache server process that owns the shared
+decision and baseline entries. Worker processes connect to it over a local
+Unix socket, so a decision computed by one worker is a cache hit for all of
+them instead of every worker warming its own cold cache.
+
+A manager proxy opens a connection (connect, auth handshake, server-side
+accept) per thread, and the threaded server runs each request on a new
+thread. Workers therefore call the store through SharedStoreClient, which
+keeps a small pool of authenticated connections and lends them to whichever
+request thread needs one.
+"""
+import heapq
+import os
+import secrets
+import signal
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client
+from multiprocessing.managers import BaseManager, convert_to_error, dispatch
+
+SHARED_CACHE_ADDRESS_ENV = 'CREST_SHARED_CACHE_ADDRESS'
+SHARED_CACHE_AUTHKEY_ENV = 'CREST_SHARED_CACHE_AUTHKEY'
+
+
+class SharedStore:
+    """Namespaced key/value store with per-entry expiry, hosted by the cache server"""
+    def __init__(self, max_entries=50000):
+        self.entries = {}  # (namespace, key) -> (value, stored_at, expires_at)
+        self.expiry_heap = []  # (expires_at, namespace, key), may hold stale items
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+
+    def get(self, namespace, key):
+        """Return (value, stored_at) for a live entry, or None"""
+        entry_key = (namespace, key)
+        with self.lock:
+            entry = self.entries.get(entry_key)
+            if entry is None:
+                return None
+            value, stored_at, expires_at = entry
+            if time.time() >= expires_at:
+                del self.entries[entry_key]
+                return None
+            return value, stored_at
+
+    def get_many(self, namespace, keys):
+        """Return {key: (value, stored_at)} for live entries, in one round trip"""
+        results = {}
+        for key in keys:
+            entry = self.get(namespace, key)
+            if entry is not None:
+                results[key] = entry
+        return results
+
+    def set(self, namespace, key, value, ttl_seconds):
+        """Store a value for ttl_seconds, evicting the oldest entries when full"""
+        entry_key = (namespace, key)
+        now = time.time()
+        with self.lock:
+            # Re-insert so dict order stays oldest-first for eviction
+            self.entries.pop(entry_key, None)
+            self.entries[entry_key] = (value, now, now + ttl_seconds)
+            heapq.heappush(self.expiry_heap, (now + ttl_seconds, namespace, key))
+            while len(self.entries) > self.max_entries:
+                del self.entries[next(iter(self.entries))]
+
+    def delete(self, namespace, key):
+        """Remove an entry if present"""
+        with self.lock:
+            self.entries.pop((namespace, key), None)
+
+    def expire(self, max_items):
+        """Remove up to max_items expired entries; returns (reclaimed, more_pending)"""
+        now = time.time()
+        reclaimed = 0
+        with self.lock:
+            heap = self.expiry_heap
+            for _ in range(max_items):
+                if not heap or heap[0][0] > now:
+                    return reclaimed, False
+                expires_at, namespace, key = heapq.heappop(heap)
+                entry = self.entries.get((namespace, key))
+                if entry is not None and entry[2] == expires_at:
+                    del self.entries[(namespace, key)]
+                    reclaimed += 1
+            # Drop heap items left behind by evictions once they dominate
+            if len(heap) > 4 * max(len(self.entries), 1000):
+                self.expiry_heap = [(e[2], ns, k) for (ns, k), e in self.entries.items()]
+                heapq.heapify(self.expiry_heap)
+            return reclaimed, bool(self.expiry_heap) and self.expiry_heap[0][0] <= now
+
+    def stats(self):
+        """Entry counts per namespace"""
+        counts = {}
+        with self.lock:
+            for namespace, _ in self.entries:
+                counts[namespace] = counts.get(namespace, 0) + 1
+        return {'entries': len(self.entries), 'namespaces': counts}
+
+
+_server_store = None
+
+
+def _get_server_store():
+    """Return the store instance living inside the cache server process"""
+    global _server_store
+    if _server_store is None:
+        _server_store = SharedStore(
+            max_entries=int(os.getenv('CREST_SHARED_CACHE_MAX_ENTRIES', '50000'))
+        )
+    return _server_store
+
+
+class SharedCacheManager(BaseManager):
+    """Manager exposing the shared store over a local socket"""
+
+
+SharedCacheManager.register('get_store', callable=_get_server_store)
+
+
+def _ignore_interrupts():
+    """Leave Ctrl+C handling to the launcher so the cache outlives draining workers"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def start_cache_server(address=None, authkey=None):
+    """
+    Start the shared cache server in its own process.
+    Returns (manager, address, authkey); call manager.shutdown() to stop it.
+    """
+    if address is None:
+        address = os.path.join(tempfile.mkdtemp(prefix='crest-cache-'), 'cache.sock')
+    if authkey is None:
+        authkey = secrets.token_bytes(16)
+
+    manager = SharedCacheManager(address=address, authkey=authkey)
+    manager.start(_ignore_interrupts)
+    return manager, address, authkey
+
+
+class SharedStoreClient:
+    """The SharedStore API over a pool of persistent connections shared by all threads"""
+    def __init__(self, proxy, address, authkey, pool_size=8):
+        self.proxy = proxy  # keeps the server's reference to the store
+        self.store_id = proxy._token.id
+        self.address = address
+        self.authkey = authkey
+        self.pool_size = pool_size
+        self.idle = []
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.connects = 0
+
+    def _acquire(self):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Connections inherited across a fork belong to the parent
+                self.idle = []
+                self.pid = os.getpid()
+            if self.idle:
+                return self.idle.pop()
+            self.connects += 1
+        connection = Client(self.address, authkey=self.authkey)
+        dispatch(connection, None, 'accept_connection', (f"crest-pool-{os.getpid()}",))
+        return connection
+
+    def _release(self, connection):
+        with self.lock:
+            if len(self.idle) < self.pool_size and self.pid == os.getpid():
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def _call(self, method, *args):
+        connection = self._acquire()
+        try:
+            connection.send((self.store_id, method, args, {}))
+            kind, result = connection.recv()
+        except BaseException:
+            # A half-finished exchange leaves the connection out of step
+            connection.close()
+            raise
+        self._release(connection)
+        if kind == '#RETURN':
+            return result
+        raise convert_to_error(kind, result)
+
+    def get(self, namespace, key):
+        return self._call('get', namespace, key)
+
+    def get_many(self, namespace, keys):
+        return self._call('get_many', namespace, keys)
+
+    def set(self, namespace, key, value, ttl_seconds):
+        return self._call('set', namespace, key, value, ttl_seconds)
+
+    def delete(self, namespace, key):
+        return self._call('delete', namespace, key)
+
+    def expire(self, max_items):
+        return self._call('expire', max_items)
+
+    def stats(self):
+        return self._call('stats')
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+def connect_shared_store(address, authkey, pool_size=None):
+    """Connect to a running cache server and return a pooled client for its store"""
+    manager = SharedCacheManager(address=address, authkey=authkey)
+    manager.connect()
+    if pool_size is None:
+        pool_size = int(os.getenv('CREST_SHARED_CACHE_POOL', '8'))
+    return SharedStoreClient(manager.get_store(), address, authkey, pool_size=pool_size)
+
+
+def connect_from_environment():
+    """Connect using the address and key the launcher exported, if any"""
+    address = os.getenv(SHARED_CACHE_ADDRESS_ENV)
+    authkey = os.getenv(SHARED_CACHE_AUTHKEY_ENV)
+    if not address or not authkey:
+        return None
+    return connect_shared_store(address, bytes.fromhex(authkey))
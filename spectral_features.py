@@ -0,0 +1,125 @@
+"""
+Spectral transient detection over the extension's analyser frames.
+
+The content script reads getByteFrequencyData from a 128-bin analyser at
+10 Hz. Given a batch of those frames (oldest first, the spike last), this
+computes per-band energies, half-wave rectified spectral flux and crest
+factors with NumPy over the whole batch at once, and separates sharp,
+broadband transients (gunshots, explosions, crashes) from sustained or
+gradually swelling content (music, speech) with plain arithmetic.
+"""
+import numpy as np
+
+# Frequency bands in Hz: (name, low, high)
+BANDS_HZ = (
+    ('sub_bass', 20, 120),
+    ('bass', 120, 500),
+    ('mid', 500, 2000),
+    ('presence', 2000, 6000),
+    ('brilliance', 6000, 20000),
+)
+MAX_FRAMES = 64
+MIN_BINS = 16
+MAX_BINS = 4096
+
+# Classification thresholds, on magnitudes scaled to 0..1
+ENERGY_JUMP = 0.12        # peak RMS over the pre-onset RMS
+FLUX_ONSET = 0.05         # spectral flux of the onset frame
+FLUX_CONTRAST = 3.0       # onset flux over the typical flux before it
+TEMPORAL_CREST = 1.25     # peak RMS over the RMS of the envelope
+SPECTRAL_CREST = 4.0      # peak bin over mean bin; below this the onset is broadband
+LOW_BAND_GAIN = 2.0       # sub-bass + bass energy growth at the onset
+EPSILON = 1e-6
+
+
+class SpectrumError(ValueError):
+    """The frames are not a usable batch of analyser magnitudes"""
+
+
+def to_frames(frames, max_frames=MAX_FRAMES):
+    """Validate a list of equal-length byte magnitude frames into a (frames, bins) float array in 0..1"""
+    if not isinstance(frames, list) or not frames:
+        raise SpectrumError("frames must be a non-empty list of magnitude arrays")
+    if len(frames) > max_frames:
+        raise SpectrumError(f"at most {max_frames} frames per batch")
+    try:
+        array = np.asarray(frames, dtype=np.float32)
+    except (TypeError, ValueError) as e:
+        raise SpectrumError("frames must all have the same number of numeric bins") from e
+    if array.ndim != 2 or not MIN_BINS <= array.shape[1] <= MAX_BINS:
+        raise SpectrumError(f"each frame needs {MIN_BINS}-{MAX_BINS} bins")
+    if not np.isfinite(array).all() or array.min() < 0 or array.max() > 255:
+        raise SpectrumError("bin magnitudes must be between 0 and 255")
+    return array / 255.0
+
+
+def band_slices(n_bins, sample_rate):
+    """(start, stop) bin indices of each band; the analyser's bins span 0..sample_rate/2"""
+    bin_hz = sample_rate / 2 / n_bins
+    slices = []
+    for _, low, high in BANDS_HZ:
+        start = min(n_bins - 1, int(low / bin_hz))
+        stop = max(start + 1, min(n_bins, int(np.ceil(high / bin_hz))))
+        slices.append((start, stop))
+    return slices
+
+
+def spectral_features(frames, sample_rate=48000):
+    """Features of a (frames, bins) batch in 0..1 whose last frames hold the event"""
+    n_frames, n_bins = frames.shape
+    power = frames * frames
+    rms = np.sqrt(power.mean(axis=1))
+    bands = np.stack([power[:, start:stop].mean(axis=1)
+                      for start, stop in band_slices(n_bins, sample_rate)], axis=1)
+
+    # Half-wave rectified flux: only energy appearing between frames counts
+    flux = np.zeros(n_frames, dtype=np.float32)
+    if n_frames > 1:
+        flux[1:] = np.clip(np.diff(frames, axis=0), 0, None).mean(axis=1)
+    onset = int(np.argmax(flux)) if n_frames > 1 else 0
+    before = slice(0, onset) if onset > 0 else slice(0, 1)
+    peak = onset + int(np.argmax(rms[onset:]))
+
+    baseline_rms = float(np.median(rms[before]))
+    typical_flux = float(np.median(flux[1:onset])) if onset > 1 else 0.0
+    low_before = float(bands[before, :2].sum(axis=1).mean())
+    peak_frame = frames[peak]
+
+    return {
+        'frames': n_frames,
+        'bins': n_bins,
+        'baseline_rms': baseline_rms,
+        'peak_rms': float(rms[peak]),
+        'energy_jump': float(rms[peak]) - baseline_rms,
+        'onset_frame': onset,
+        'onset_flux': float(flux[onset]),
+        'flux_contrast': float(flux[onset] / max(typical_flux, EPSILON)) if onset > 0 else 0.0,
+        'temporal_crest': float(rms.max() / max(float(np.sqrt(np.mean(rms * rms))), EPSILON)),
+        'spectral_crest': float(peak_frame.max() / max(float(peak_frame.mean()), EPSILON)),
+        'low_band_gain': float(bands[peak, :2].sum() / max(low_before, EPSILON)),
+        'band_energy': {name: round(float(value), 6) for (name, _, _), value in zip(BANDS_HZ, bands[peak])},
+    }
+
+
+def classify_spectrum(features):
+    """
+    ('YES'|'NO', confidence, kind) where kind is 'transient', 'sustained' or 'quiet'.
+    A transient needs a large energy jump arriving in one sharp onset frame,
+    plus either a peaky envelope or a broadband / low-end-heavy spectrum.
+    """
+    if features['energy_jump'] < ENERGY_JUMP:
+        return 'NO', 0.85, 'quiet'
+
+    sharp_onset = (features['onset_flux'] >= FLUX_ONSET
+                   and (features['flux_contrast'] >= FLUX_CONTRAST or features['onset_frame'] <= 1))
+    peaky = features['temporal_crest'] >= TEMPORAL_CREST
+    broadband = features['spectral_crest'] <= SPECTRAL_CREST
+    low_heavy = features['low_band_gain'] >= LOW_BAND_GAIN
+
+    if not sharp_onset or not (peaky or broadband or low_heavy):
+        return 'NO', 0.7 if sharp_onset or peaky else 0.85, 'sustained'
+
+    confidence = 0.6
+    confidence += 0.1 * min(features['energy_jump'] / ENERGY_JUMP - 1, 2.0)
+    confidence += 0.1 * peaky + 0.05 * broadband + 0.05 * low_heavy
+    return 'YES', round(min(0.99, confidence), 3), 'transient'
@@ -73,18 +73,22 @@ def start_server():
                               stdout=subprocess.PIPE, 
                               stderr=subprocess.PIPE)
     
-    # Wait for server to start
+    # Wait for server to start - the app answers /health as soon as the mock
+    # path can serve, so poll tightly instead of sleeping whole seconds
     print("⏳ Waiting for server to start...")
-    for i in range(10):
+    start_time = time.time()
+    deadline = start_time + 10
+    while time.time() < deadline:
+        if process.poll() is not None:
+            break
         try:
-            response = requests.get("http://localhost:5003/health", timeout=2)
+            response = requests.get("http://localhost:5003/health", timeout=0.5)
             if response.status_code == 200:
-                print("✅ Server started successfully on port 5003")
+                print(f"✅ Server started successfully on port 5003 ({time.time() - start_time:.2f}s)")
                 return process
-        except:
+        except requests.exceptions.RequestException:
             pass
-        time.sleep(1)
-        print(f"   Attempt {i+1}/10...")
+        time.sleep(0.05)
     
     print("❌ Server failed to start")
     return None
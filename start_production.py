@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Production launcher for the Crest Flask server
+Runs a pre-fork pool of worker processes sharing one listening socket and one
+shared cache server, with graceful reloads and worker recycling.
+
+With --route-sessions each worker slot gets its own loopback socket instead,
+and a session router process (session_router.py) owns the public port and
+consistent-hashes video/session ids onto the slots, so per-session state
+stays in one warm worker. A recycled or reloaded worker takes over its
+slot's socket, so its sessions keep their place on the ring.
+
+Signals:
+    SIGHUP          start a fresh generation of workers, then drain the old one
+    SIGTERM/SIGINT  drain all workers and stop
+"""
+import argparse
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+
+import shared_cache
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crest production launcher")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5003)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per core)")
+    parser.add_argument('--max-requests', type=int, default=5000,
+                        help="recycle a worker after this many requests (0 disables)")
+    parser.add_argument('--max-requests-jitter', type=int, default=500,
+                        help="random extra requests so workers do not recycle together")
+    parser.add_argument('--graceful-timeout', type=float, default=30.0,
+                        help="seconds a draining worker may finish in-flight requests")
+    parser.add_argument('--route-sessions', action='store_true',
+                        help="pin each video/session to one worker through a consistent-hash router")
+    return parser.parse_args(argv)
+
+
+def create_listener(host, port):
+    """Bind the listening socket once in the parent so every worker can accept on it"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(2048)
+    listener.set_inheritable(True)
+    return listener
+
+
+class RequestCounter:
+    """WSGI middleware that asks the worker to recycle after max_requests"""
+    def __init__(self, wsgi_app, max_requests, on_limit):
+        self.wsgi_app = wsgi_app
+        self.max_requests = max_requests
+        self.on_limit = on_limit
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self.lock:
+            self.count += 1
+            reached = self.count == self.max_requests
+        if reached:
+            self.on_limit()
+        return self.wsgi_app(environ, start_response)
+
+
+def run_worker(listener, options):
+    """Serve requests from the shared socket until told to drain"""
+    from werkzeug.serving import make_server
+
+    # The arbiter owns Ctrl+C and reloads; workers only react to SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    # Imported after fork so a reload picks up new code
+    from app import app, logger, start_background_initialization
+    start_background_initialization()
+
+    server = None
+    draining = threading.Event()
+
+    def drain(*_):
+        if not draining.is_set():
+            draining.set()
+            # shutdown() blocks until serve_forever returns, so never call it
+            # from the thread that is running serve_forever
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+    wsgi_app = app
+    if options.route_sessions:
+        # Behind the router the peer is always loopback; keep per-client rate limits per client
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        wsgi_app = ProxyFix(app, x_for=1)
+    if options.max_requests > 0:
+        limit = options.max_requests + random.randint(0, max(0, options.max_requests_jitter))
+        wsgi_app = RequestCounter(wsgi_app, limit, drain)
+
+    server = make_server(options.host, options.port, wsgi_app, threaded=True,
+                         fd=listener.fileno())
+    # Let in-flight request threads finish when the server closes
+    server.daemon_threads = False
+    server.block_on_close = True
+    signal.signal(signal.SIGTERM, drain)
+
+    logger.info("Crest worker started", extra={'pid': os.getpid()})
+    server.serve_forever()
+    server.server_close()
+    logger.info("Crest worker exited", extra={'pid': os.getpid()})
+
+
+def run_router(listener, options, backend_urls):
+    """Serve the public socket, forwarding each session to its worker slot"""
+    from session_router import SessionRouter, serve
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    server = serve(SessionRouter(backend_urls), options.host, options.port, listener_fd=listener.fileno())
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    server.serve_forever()
+    server.server_close()
+
+
+class Arbiter:
+    """Keeps the worker pool at size and handles reloads and shutdown"""
+    def __init__(self, options):
+        self.options = options
+        self.workers = {}  # pid -> generation
+        self.slots = {}  # pid -> worker slot, with --route-sessions
+        self.draining = {}  # pid -> kill deadline
+        self.slot_listeners = []
+        self.router_pid = None
+        self.generation = 0
+        self.reload_requested = False
+        self.stop_requested = False
+
+    def fork(self, target, *args):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                target(*args)
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        return pid
+
+    def spawn_worker(self, slot=None):
+        listener = self.slot_listeners[slot] if slot is not None else self.listener
+        pid = self.fork(run_worker, listener, self.options)
+        self.workers[pid] = self.generation
+        if slot is not None:
+            self.slots[pid] = slot
+        return pid
+
+    def spawn_router(self):
+        backend_urls = ["http://{}:{}".format(*listener.getsockname()[:2]) for listener in self.slot_listeners]
+        self.router_pid = self.fork(run_router, self.listener, self.options, backend_urls)
+
+    def replace_missing_workers(self):
+        """Keep the pool at size; with routing, one current worker per slot"""
+        active = self.active_workers()
+        if not self.options.route_sessions:
+            for _ in range(self.options.workers - len(active)):
+                self.spawn_worker()
+            return
+        served = {self.slots[pid] for pid in active}
+        for slot in range(self.options.workers):
+            if slot not in served:
+                self.spawn_worker(slot)
+
+    def drain_worker(self, pid):
+        if pid in self.draining:
+            return
+        self.draining[pid] = time.time() + self.options.graceful_timeout
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def reap_workers(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid == self.router_pid:
+                self.router_pid = None
+            self.workers.pop(pid, None)
+            self.slots.pop(pid, None)
+            self.draining.pop(pid, None)
+
+    def kill_overdue_workers(self):
+        now = time.time()
+        for pid, deadline in list(self.draining.items()):
+            if now >= deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def active_workers(self):
+        return [pid for pid, generation in self.workers.items()
+                if generation == self.generation and pid not in self.draining]
+
+    def reload(self):
+        """Start a new generation of workers, then drain the previous one"""
+        self.generation += 1
+        print(f"🔄 Reloading workers (generation {self.generation})")
+        previous = list(self.workers)
+        for slot in range(self.options.workers):
+            self.spawn_worker(slot if self.options.route_sessions else None)
+        for pid in previous:
+            self.drain_worker(pid)
+
+    def run(self):
+        self.cache_manager, address, authkey = shared_cache.start_cache_server()
+        os.environ[shared_cache.SHARED_CACHE_ADDRESS_ENV] = address
+        os.environ[shared_cache.SHARED_CACHE_AUTHKEY_ENV] = authkey.hex()
+
+        self.listener = create_listener(self.options.host, self.options.port)
+        if self.options.route_sessions:
+            # Ephemeral loopback ports, bound for the launcher's lifetime
+            self.slot_listeners = [create_listener('127.0.0.1', 0) for _ in range(self.options.workers)]
+
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, 'reload_requested', True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, 'stop_requested', True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, 'stop_requested', True))
+
+        print(f"🚀 Crest listening on {self.options.host}:{self.options.port} "
+              f"with {self.options.workers} workers (arbiter pid {os.getpid()})"
+              f"{', sessions routed by consistent hash' if self.options.route_sessions else ''}")
+
+        try:
+            while not self.stop_requested:
+                self.reap_workers()
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.reload()
+                # Replace recycled or crashed workers (and the router)
+                self.replace_missing_workers()
+                if self.options.route_sessions and self.router_pid is None:
+                    self.spawn_router()
+                self.kill_overdue_workers()
+                time.sleep(0.1)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        print("👋 Draining workers...")
+        if self.router_pid is not None:
+            # The router stops accepting; workers still finish what it already forwarded
+            self.workers[self.router_pid] = self.generation
+            self.drain_worker(self.router_pid)
+        for pid in list(self.workers):
+            self.drain_worker(pid)
+        while self.workers:
+            self.reap_workers()
+            self.kill_overdue_workers()
+            time.sleep(0.1)
+        for listener in self.slot_listeners:
+            listener.close()
+        self.listener.close()
+        self.cache_manager.shutdown()
+        print("✅ Crest stopped")
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    if options.workers < 1:
+        print("❌ --workers must be at least 1")
+        sys.exit(1)
+    Arbiter(options).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 """
 Startup script for Crest Flask server with Datadog tracing
 Use this instead of running app.py directly for full observability
+Pass --production to run the multi-process launcher (start_production.py)
 """
 import os
 import subprocess
@@ -29,13 +30,18 @@ def main():
     # Set environment variables
     set_environment_variables()
     
+    # Single dev-server process by default, pre-fork worker pool with --production
+    launcher_args = ['app.py']
+    if '--production' in sys.argv[1:]:
+        launcher_args = ['start_production.py'] + [arg for arg in sys.argv[1:] if arg != '--production']
+    
     # Check if ddtrace is available
     try:
         import ddtrace
         print("✅ ddtrace available - starting with APM instrumentation")
         
         # Start with ddtrace-run for automatic instrumentation
-        cmd = [sys.executable, '-m', 'ddtrace.commands.ddtrace_run', sys.executable, 'app.py']
+        cmd = [sys.executable, '-m', 'ddtrace.commands.ddtrace_run', sys.executable] + launcher_args
         print(f"Command: {' '.join(cmd)}")
         print("=" * 60)
         
@@ -48,7 +54,7 @@ def main():
         print("=" * 60)
         
         # Fallback to regular Python
-        subprocess.run([sys.executable, 'app.py'])
+        subprocess.run([sys.executable] + launcher_args)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for per-client rate limiting and backend load shedding
+"""
+import os
+import threading
+import unittest.mock
+
+from admission import ClientRateLimiter
+from backend_scheduler import PriorityScheduler
+
+
+def test_token_bucket_refills_per_client():
+    print("🧪 Testing per-client token buckets...")
+    limiter = ClientRateLimiter(rate=2, burst=3)
+    assert all(limiter.allow('tab-1', now=100.0)[0] for _ in range(3))
+    allowed, retry_after = limiter.allow('tab-1', now=100.0)
+    assert not allowed and abs(retry_after - 0.5) < 1e-9
+    # Other clients keep their own budget
+    assert limiter.allow('tab-2', now=100.0)[0]
+    # Half a second refills one token
+    assert limiter.allow('tab-1', now=100.5)[0]
+    assert not limiter.allow('tab-1', now=100.5)[0]
+    assert limiter.stats()['limited'] == 2
+    print("✅ A noisy client is limited without affecting others")
+
+
+def test_idle_buckets_expire():
+    print("🧪 Testing idle bucket expiry...")
+    limiter = ClientRateLimiter(rate=10, burst=10, shards=1)
+    for i in range(5):
+        limiter.allow(f'tab-{i}', now=0.0)
+    limiter.allow('recent')
+    assert limiter.expire(3) == (3, True)
+    assert limiter.expire(3) == (2, False)
+    assert limiter.stats()['clients'] == 1
+    print("✅ Fully refilled buckets are dropped by housekeeping")
+
+
+def test_endpoints_return_429_with_retry_after():
+    print("🧪 Testing 429 responses...")
+    import app
+
+    with unittest.mock.patch.object(app, 'audio_rate_limiter', ClientRateLimiter(rate=1, burst=2)):
+        with app.app.test_client() as client:
+            frame = {"volume": 0.2, "baseline": 0.2, "spike": 0.05, "client_id": "test-flood"}
+            statuses = [client.post('/audio-data', json=frame).status_code for _ in range(4)]
+            assert statuses == [200, 200, 429, 429]
+            response = client.post('/audio-data', json=frame)
+            assert response.headers['Retry-After'] == '1'
+            assert response.get_json()['retry_after'] > 0
+            # A different client is unaffected
+            assert client.post('/audio-data', json=dict(frame, client_id='test-quiet')).status_code == 200
+    print("✅ Over-rate clients get a fast 429 with Retry-After")
+
+
+def test_overloaded_backend_degrades_to_rules():
+    print("🧪 Testing degradation under backend overload...")
+    import app
+
+    release = threading.Event()
+    started = threading.Event()
+    fake_client = unittest.mock.MagicMock()
+
+    def slow_completion(**kwargs):
+        started.set()
+        release.wait(5)
+        return unittest.mock.MagicMock(choices=[unittest.mock.MagicMock(
+            message=unittest.mock.MagicMock(content='NO'))])
+
+    fake_client.chat.completions.create.side_effect = slow_completion
+    results = {}
+
+    with unittest.mock.patch.dict(os.environ, {'TRUEFOUNDRY_API_KEY': 'test-key'}), \
+            unittest.mock.patch('app.get_truefoundry_client', return_value=fake_client), \
+            unittest.mock.patch('app.local_classifier_model', None), \
+            unittest.mock.patch.object(app, 'backend_scheduler', PriorityScheduler(1, {
+                'subtitle': dict(weight=1, max_concurrency=1, max_queue=4, max_wait=0.05)
+            })), \
+            unittest.mock.patch('signal.signal'), unittest.mock.patch('signal.alarm'):
+        worker = threading.Thread(target=lambda: results.update(
+            slow=app.analyze_subtitle_for_loud_events("admission slow line")))
+        worker.start()
+        assert started.wait(5)
+        # The only backend slot is taken: this line is answered by the rules
+        assert app.analyze_subtitle_for_loud_events("admission [explosion] line") == 'YES'
+        assert app.backend_scheduler.stats()['shed'] == 1
+        release.set()
+        worker.join(5)
+
+    assert results['slow'] == 'NO'
+    assert fake_client.chat.completions.create.call_count == 1
+    print("✅ Requests over the backend limit use the rule-based path")
+
+
+if __name__ == "__main__":
+    test_token_bucket_refills_per_client()
+    test_idle_buckets_expire()
+    test_endpoints_return_429_with_retry_after()
+    test_overloaded_backend_degrades_to_rules()
+    print("\n🎉 Admission control tests passed!")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for audio thresholds and the threshold tuning engine
+"""
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import unittest.mock
+
+import numpy as np
+
+from audio_thresholds import AudioThresholds, ThresholdsFormatError
+from tune_thresholds import evaluate_thresholds, load_traces, tune
+
+
+def write_synthetic_traces(path, count=3000, seed=7):
+    """Traces where a spike above 0.35 is a loud event, with a few noisy labels"""
+    rng = np.random.default_rng(seed)
+    spike = rng.uniform(0, 0.9, count)
+    baseline = rng.uniform(0.05, 0.4, count)
+    volume = np.clip(baseline + spike, 0, 1)
+    loud = (spike > 0.35) ^ (rng.uniform(size=count) < 0.02)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['volume', 'baseline', 'spike', 'decision', 'corrected'])
+        for v, b, s, label in zip(volume, baseline, spike, loud):
+            # Half the rows record a served decision the user corrected
+            corrected = rng.uniform() < 0.5
+            writer.writerow([f'{v:.4f}', f'{b:.4f}', f'{s:.4f}',
+                             'YES' if label != corrected else 'NO', int(corrected)])
+
+
+def test_thresholds_round_trip():
+    print("🧪 Testing thresholds file round trip...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'thresholds.json')
+        AudioThresholds(version='v1', quiet_spike=0.15, heuristic_ratio=2.5).save(path)
+        loaded = AudioThresholds.load(path)
+        assert loaded.version == 'v1' and loaded.quiet_spike == 0.15 and loaded.heuristic_ratio == 2.5
+        assert loaded.loud_spike == 0.6  # unspecified thresholds keep their defaults
+        for bad in ({'format': 'other'}, {'format': 'crest-audio-thresholds', 'format_version': 1,
+                                          'version': 'x', 'thresholds': {'bogus': 1}}):
+            try:
+                AudioThresholds.from_dict(bad)
+                assert False, "expected ThresholdsFormatError"
+            except ThresholdsFormatError:
+                pass
+    print("✅ Thresholds files are versioned and validated")
+
+
+def test_tuning_recovers_the_boundary():
+    print("🧪 Testing vectorized threshold search...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'traces.csv')
+        write_synthetic_traces(path)
+        traces = load_traces([path])
+        assert len(traces['spike']) == 3000
+        assert abs(traces['label'].mean() - 0.6) < 0.05
+
+        tuned, evaluated = tune(traces, steps=6, workers=1)
+        assert evaluated > 6 ** 5
+        assert abs(tuned.fallback_spike - 0.35) < 0.03
+        # The confidence tiers move with the decision boundary
+        assert abs(tuned.confidence_spike_moderate - tuned.fallback_spike) < 1e-9
+        assert abs(tuned.confidence_spike_high - tuned.fallback_spike - 0.2) < 1e-9
+        before = evaluate_thresholds(AudioThresholds(), traces, 2.0, 0.05)
+        after = evaluate_thresholds(tuned, traces, 2.0, 0.05)
+        assert after['prefilter_cost'] <= before['prefilter_cost']
+        assert after['escalation_rate'] < before['escalation_rate']
+        assert after['heuristic_accuracy'] > before['heuristic_accuracy']
+    print("✅ Tuned thresholds escalate less and err less than the defaults")
+
+
+def test_cli_and_server_use_tuned_thresholds():
+    print("🧪 Testing tuning CLI and server thresholds...")
+    import app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        traces = os.path.join(tmp, 'traces.csv')
+        write_synthetic_traces(traces, count=500)
+        output = os.path.join(tmp, 'models', 'audio_thresholds.json')
+        result = subprocess.run(
+            [sys.executable, 'tune_thresholds.py', traces, '--output', output, '--steps', '4', '--workers', '2'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=120
+        )
+        assert result.returncode == 0, result.stderr
+        tuned = app.load_audio_thresholds(output)
+        assert tuned.metadata['traces'] == 500
+
+    strict = AudioThresholds(quiet_spike=0.2, heuristic_spike=0.5)
+    with unittest.mock.patch.object(app, 'audio_thresholds', strict), \
+            unittest.mock.patch('app.get_truefoundry_client', return_value=None):
+        # Below the tuned quiet_spike the pre-filter answers on its own
+        assert app.analyze_audio_for_loud_events(0.5, 0.3, 0.15) == ('NO', 0.9)
+        assert app.analyze_audio_for_loud_events(0.3, 0.3, 0.45)[0] == 'NO'
+    assert app.analyze_audio_for_loud_events(0.3, 0.3, 0.45)[0] == 'YES'
+
+    # Served confidences come from the loaded tiers, not constants in app.py
+    assert app.calculate_audio_confidence(0.35, 0.5, 0.2, 'YES') == 0.85
+    shifted = AudioThresholds(agreement_spike=0.3, confidence_spike_high=0.6, confidence_spike_strong=0.5,
+                              confidence_spike_moderate=0.4, confidence_spike_weak=0.3)
+    with unittest.mock.patch.object(app, 'audio_thresholds', shifted):
+        assert app.calculate_audio_confidence(0.35, 0.5, 0.2, 'YES') == 0.7
+    try:
+        AudioThresholds(confidence_spike_weak=0.6)
+        assert False, "expected ThresholdsFormatError"
+    except ThresholdsFormatError:
+        pass
+    print("✅ The server loads tuned thresholds and decides with them")
+
+
+if __name__ == "__main__":
+    test_thresholds_round_trip()
+    test_tuning_recovers_the_boundary()
+    test_cli_and_server_use_tuned_thresholds()
+    print("\n🎉 Audio threshold tests passed!")
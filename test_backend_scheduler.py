@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for priority scheduling of backend classification calls
+"""
+import threading
+import time
+
+from backend_scheduler import PriorityScheduler
+
+CLASSES = {
+    'audio': dict(weight=8, max_concurrency=2, max_queue=8, max_wait=5.0),
+    'subtitle': dict(weight=3, max_concurrency=2, max_queue=8, max_wait=5.0),
+    'bulk': dict(weight=1, max_concurrency=1, max_queue=64, max_wait=5.0),
+}
+
+
+def queue_waiters(scheduler, name, count, order):
+    """Start `count` threads waiting on work class `name`; each records its grant"""
+    threads = []
+    for i in range(count):
+        def wait(i=i):
+            if scheduler.acquire(name):
+                order.append(name)
+        thread = threading.Thread(target=wait)
+        thread.start()
+        threads.append(thread)
+    deadline = time.time() + 5
+    while len(scheduler.classes[name].queue) < count and time.time() < deadline:
+        time.sleep(0.001)
+    return threads
+
+
+def test_audio_is_granted_before_queued_caption_work():
+    print("🧪 Testing priority dispatch...")
+    scheduler = PriorityScheduler(1, CLASSES)
+    assert scheduler.acquire('bulk')  # occupies the only slot
+    order = []
+    threads = queue_waiters(scheduler, 'bulk', 3, order)
+    threads += queue_waiters(scheduler, 'subtitle', 2, order)
+    threads += queue_waiters(scheduler, 'audio', 1, order)
+
+    scheduler.release('bulk')
+    for _ in range(5):
+        deadline = time.time() + 5
+        granted = len(order)
+        while len(order) == granted and time.time() < deadline:
+            time.sleep(0.001)
+        scheduler.release(order[-1])
+    for thread in threads:
+        thread.join(5)
+
+    assert order[0] == 'audio'
+    assert order.index('subtitle') < order.index('bulk')
+    print(f"✅ Dispatch order: {' -> '.join(order)}")
+
+
+def test_bulk_work_respects_its_concurrency_cap():
+    print("🧪 Testing per-class caps...")
+    scheduler = PriorityScheduler(4, CLASSES)
+    assert scheduler.acquire('bulk')
+    assert not scheduler.acquire('bulk', timeout=0.01)
+    # The rest of the pool stays available to latency-critical classes
+    assert scheduler.acquire('audio') and scheduler.acquire('audio') and scheduler.acquire('subtitle')
+    stats = scheduler.stats()
+    assert stats['in_flight'] == 4
+    assert stats['classes']['bulk']['shed'] == 1
+    print("✅ Bulk work cannot take the whole pool")
+
+
+def test_full_queue_sheds_and_queue_time_is_recorded():
+    print("🧪 Testing queue limits and queue-time metrics...")
+    grants = []
+    sheds = []
+    scheduler = PriorityScheduler(1, {
+        'audio': dict(weight=1, max_concurrency=1, max_queue=1, max_wait=5.0),
+    }, on_grant=lambda name, seconds: grants.append(seconds),
+        on_shed=lambda name, reason: sheds.append(reason))
+    assert scheduler.acquire('audio')
+    order = []
+    threads = queue_waiters(scheduler, 'audio', 1, order)
+    assert not scheduler.acquire('audio')
+    time.sleep(0.05)
+    scheduler.release('audio')
+    for thread in threads:
+        thread.join(5)
+
+    assert sheds == ['queue_full']
+    assert grants[0] == 0.0 and grants[1] >= 0.04
+    assert scheduler.stats()['classes']['audio']['max_queue_ms'] >= 40
+    print("✅ Overflow is shed and queue time is reported per class")
+
+
+if __name__ == "__main__":
+    test_audio_is_granted_before_queued_caption_work()
+    test_bulk_work_respects_its_concurrency_cap()
+    test_full_queue_sheds_and_queue_time_is_recorded()
+    print("\n🎉 Backend scheduler tests passed!")
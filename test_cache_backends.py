@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Tests for the pluggable cache backends, including the Redis-protocol backend
+against a small local Redis-compatible stand-in
+"""
+import json
+import os
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import cache_backends
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Speaks enough RESP for the commands RedisBackend sends"""
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def write_bulk(self, value):
+        if value is None:
+            return b'$-1\r\n'
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def handle(self):
+        server = self.server
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            name = command[0].upper()
+            server.commands.append(name)
+            now = time.time()
+            with server.lock:
+                if name == b'PING':
+                    reply = b'+PONG\r\n'
+                elif name == b'SET':
+                    expires_at = None
+                    if len(command) >= 5 and command[3].upper() == b'PX':
+                        expires_at = now + int(command[4]) / 1000
+                    server.data[command[1]] = (command[2], expires_at)
+                    reply = b'+OK\r\n'
+                elif name in (b'GET', b'MGET'):
+                    values = []
+                    for key in command[1:]:
+                        value, expires_at = server.data.get(key, (None, None))
+                        if expires_at is not None and now >= expires_at:
+                            value = None
+                        values.append(value)
+                    if name == b'GET':
+                        reply = self.write_bulk(values[0])
+                    else:
+                        reply = b'*%d\r\n' % len(values) + b''.join(self.write_bulk(v) for v in values)
+                elif name == b'DEL':
+                    removed = sum(1 for key in command[1:] if server.data.pop(key, None) is not None)
+                    reply = b':%d\r\n' % removed
+                else:
+                    reply = b'-ERR unknown command\r\n'
+            self.wfile.write(reply)
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeRedisHandler)
+        self.data = {}
+        self.commands = []
+        self.lock = threading.Lock()
+
+
+def start_fake_redis():
+    server = FakeRedisServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check_backend_contract(backend):
+    """Behaviour every backend must share"""
+    assert backend.get('subtitle', 'missing') is None
+
+    backend.set('subtitle', 'k1', 'YES', 30)
+    backend.set('subtitle', 'k2', 'NO', 30)
+    backend.set('baseline', 'k1', 0.25, 30)
+    value, stored_at = backend.get('subtitle', 'k1')
+    assert value == 'YES'
+    assert abs(stored_at - time.time()) < 5
+    assert backend.get('baseline', 'k1')[0] == 0.25
+
+    many = backend.get_many('subtitle', ['k1', 'k2', 'missing'])
+    assert {k: v for k, (v, _) in many.items()} == {'k1': 'YES', 'k2': 'NO'}
+
+    backend.set('subtitle', 'short', 'YES', 0.05)
+    time.sleep(0.1)
+    assert backend.get('subtitle', 'short') is None
+
+    backend.delete('subtitle', 'k1')
+    assert backend.get('subtitle', 'k1') is None
+
+
+def test_memory_backend():
+    print("🧪 Testing memory backend...")
+    check_backend_contract(cache_backends.MemoryBackend())
+    check_backend_contract(cache_backends.ShardedMemoryBackend(shards=4))
+    print("✅ Memory backends work")
+
+
+def test_sqlite_backend():
+    print("🧪 Testing SQLite backend...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite3')
+        check_backend_contract(cache_backends.SQLiteBackend(path))
+
+        # A second handle on the same file sees the same entries
+        first = cache_backends.SQLiteBackend(path)
+        first.set('subtitle', 'shared', 'YES', 30)
+        assert cache_backends.SQLiteBackend(path).get('subtitle', 'shared')[0] == 'YES'
+    print("✅ SQLite backend works")
+
+
+def test_redis_backend():
+    print("🧪 Testing Redis-protocol backend...")
+    server = start_fake_redis()
+    try:
+        url = f"redis://127.0.0.1:{server.server_address[1]}/0"
+        check_backend_contract(cache_backends.RedisBackend(url))
+
+        server.commands.clear()
+        backend = cache_backends.RedisBackend(url)
+        backend.get_many('subtitle', [f'key{i}' for i in range(50)])
+        assert server.commands == [b'MGET']
+        print("✅ Batch lookups use a single MGET")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    unreachable = cache_backends.RedisBackend(url, timeout=0.2)
+    try:
+        unreachable.get('subtitle', 'k1')
+        assert False, "expected CacheBackendError"
+    except cache_backends.CacheBackendError:
+        print("✅ Unreachable server raises CacheBackendError")
+
+
+def test_near_cache_absorbs_repeat_lookups():
+    print("🧪 Testing near cache...")
+    server = start_fake_redis()
+    try:
+        url = f"redis://127.0.0.1:{server.server_address[1]}/0"
+        near = cache_backends.NearCache(cache_backends.RedisBackend(url), ttl_seconds=5)
+        check_backend_contract(near)
+
+        # Another node writes, this node reads once remotely then locally
+        cache_backends.RedisBackend(url).set('subtitle', 'remote', 'YES', 30)
+        server.commands.clear()
+        for _ in range(10):
+            assert near.get('subtitle', 'remote')[0] == 'YES'
+        assert server.commands == [b'GET']
+        print("✅ Repeat lookups are served from the near cache")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_decision_cache_on_redis_backend():
+    print("🧪 Testing DecisionCache across two nodes...")
+    from app import DecisionCache
+
+    server = start_fake_redis()
+    try:
+        url = f"redis://127.0.0.1:{server.server_address[1]}/0"
+        node_a = DecisionCache(backend=cache_backends.NearCache(cache_backends.RedisBackend(url)))
+        node_b = DecisionCache(backend=cache_backends.NearCache(cache_backends.RedisBackend(url)))
+
+        node_a.cache_decision("[gunshot]", 'YES')
+        node_a.cache_decision("hello there", 'NO')
+        assert node_b.get_cached_decision("[gunshot]") == 'YES'
+        assert node_b.get_cached_decisions(["[gunshot]", "hello there", "[thunder]"]) == {
+            "[gunshot]": 'YES',
+            "hello there": 'NO',
+        }
+        print("✅ Node B sees node A's decisions")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # With the store gone, lookups degrade to misses instead of errors
+    assert node_b.get_cached_decision("[thunder]") is None
+    print("✅ Backend outage degrades to cache misses")
+
+
+def test_deduplicator_try_acquire_is_atomic():
+    print("🧪 Testing striped deduplicator...")
+    from app import RequestDeduplicator
+
+    deduplicator = RequestDeduplicator(shards=8)
+    winners = []
+    barrier = threading.Barrier(16)
+
+    def contend():
+        barrier.wait()
+        if deduplicator.try_acquire('subtitle_same_line'):
+            winners.append(threading.current_thread().name)
+
+    threads = [threading.Thread(target=contend) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(winners) == 1
+    assert deduplicator.is_duplicate('subtitle_same_line')
+    deduplicator.remove_request('subtitle_same_line')
+    assert deduplicator.try_acquire('subtitle_same_line')
+    assert deduplicator.pending_count() == 1
+    print("✅ Exactly one concurrent caller acquires a request key")
+
+
+def test_create_backend_selection():
+    print("🧪 Testing backend selection...")
+    assert isinstance(cache_backends.create_backend('memory'), cache_backends.ShardedMemoryBackend)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['CREST_CACHE_SQLITE_PATH'] = os.path.join(tmp, 'cache.sqlite3')
+        try:
+            assert cache_backends.create_backend('sqlite').name == 'near+sqlite'
+        finally:
+            del os.environ['CREST_CACHE_SQLITE_PATH']
+    assert cache_backends.create_backend('redis').name == 'near+redis'
+    try:
+        cache_backends.create_backend('memcached')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✅ Backends are selected by name")
+
+
+def test_cache_shards_setting():
+    print("🧪 Testing CREST_CACHE_SHARDS...")
+    probe = (
+        "import json, app\n"
+        "print(json.dumps([len(app.decision_cache.backend.shards), len(app.audio_decision_cache.backend.shards),\n"
+        "                  len(app.baseline_cache.backend.shards), len(app.request_deduplicator.shards)]))\n"
+    )
+    env = {k: v for k, v in os.environ.items() if not k.startswith('CREST_SHARED_CACHE')}
+    env.update(CREST_CACHE_SHARDS='4', CREST_CACHE_BACKEND='memory')
+    result = subprocess.run([sys.executable, '-c', probe], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == [4, 4, 4, 4]
+    print("✅ The default memory caches and the deduplicator use the configured shard count")
+
+
+if __name__ == "__main__":
+    test_memory_backend()
+    test_sqlite_backend()
+    test_redis_backend()
+    test_near_cache_absorbs_repeat_lookups()
+    test_decision_cache_on_redis_backend()
+    test_deduplicator_try_acquire_is_atomic()
+    test_create_backend_selection()
+    test_cache_shards_setting()
+    print("\n🎉 Cache backend tests passed!")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental handling of rolling auto-generated captions
+"""
+import unittest.mock
+
+from caption_sessions import RollingCaptionTracker
+
+
+def test_tracker_recognizes_extensions():
+    print("🧪 Testing caption line tracking...")
+    tracker = RollingCaptionTracker(min_escalation_words=3)
+
+    assert tracker.observe('tab-1', "There was a").kind == 'new'
+    update = tracker.observe('tab-1', "there was a  loud")
+    assert update.kind == 'extension' and update.suffix == ' loud'
+    assert tracker.observe('tab-1', "there was a loud").kind == 'repeat'
+    assert tracker.observe('tab-1', "something else").kind == 'new'
+    # Sessions are independent
+    assert tracker.observe('tab-2', "there was a loud explosion").kind == 'new'
+    print("✅ New lines, repeats and extensions are told apart per session")
+
+
+def test_tracker_debounces_while_in_flight():
+    print("🧪 Testing escalation debounce...")
+    tracker = RollingCaptionTracker(min_escalation_words=3)
+    tracker.observe('tab-1', "the storm")
+    tracker.start_classification('tab-1', "the storm")
+
+    update = tracker.observe('tab-1', "the storm is getting closer now")
+    assert update.kind == 'extension' and not update.should_escalate
+
+    tracker.finish_classification('tab-1', "the storm", 'NO')
+    tracker.observe('tab-2', "the storm")
+    tracker.start_classification('tab-2', "the storm")
+    tracker.finish_classification('tab-2', "the storm", 'NO')
+    assert not tracker.observe('tab-2', "the storm is").should_escalate
+    assert tracker.observe('tab-2', "the storm is getting closer").should_escalate
+    print("✅ Full classification waits for enough new words and no call in flight")
+
+
+def test_tracker_expires_idle_sessions():
+    print("🧪 Testing idle session expiry...")
+    tracker = RollingCaptionTracker(idle_ttl_seconds=60)
+    for i in range(5):
+        tracker.observe(f'tab-{i}', "hello")
+    for session in list(tracker.sessions.values())[:3]:
+        session.updated_at -= 120
+
+    assert tracker.expire(2) == (2, True)
+    assert tracker.expire(2) == (1, False)
+    assert list(tracker.sessions) == ['tab-3', 'tab-4']
+    print("✅ Idle sessions are dropped in slices")
+
+
+def test_rolling_captions_skip_redundant_classification():
+    print("🧪 Testing /data with rolling captions...")
+    import app
+
+    calls = []
+
+    def classify(text, **kwargs):
+        calls.append(text)
+        return 'YES' if app.matches_loud_event_rules(text) else 'NO'
+
+    with unittest.mock.patch('app.analyze_subtitle_for_loud_events', side_effect=classify):
+        with app.app.test_client() as client:
+            def post(text):
+                response = client.post('/data', json={"text": text, "session_id": "test-rolling"})
+                return response.get_json()['action']
+
+            assert post("we heard a") == 'NONE'
+            assert post("we heard a very") == 'NONE'
+            assert post("we heard a very big [dramatic") == 'NONE'
+            assert post("we heard a very big [dramatic music]") == 'LOWER_VOLUME'
+            # The YES carries over to the rest of the line without reclassifying
+            assert post("we heard a very big [dramatic music] and then") == 'LOWER_VOLUME'
+
+    assert calls == ["we heard a"]
+    assert app.caption_tracker.stats()['rule_hits'] >= 1
+    print("✅ Extensions are decided from their suffix without extra classification")
+
+
+if __name__ == "__main__":
+    test_tracker_recognizes_extensions()
+    test_tracker_debounces_while_in_flight()
+    test_tracker_expires_idle_sessions()
+    test_rolling_captions_skip_redundant_classification()
+    print("\n🎉 Caption session tests passed!")
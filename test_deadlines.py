@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for deadline-aware decision path selection
+"""
+import os
+import time
+import unittest.mock
+
+from deadlines import DeadlinePlanner, remaining_ms
+
+
+def test_planner_tracks_latency_and_picks_path():
+    print("🧪 Testing latency estimates...")
+    planner = DeadlinePlanner({'llm': 600.0, 'local': 1.0, 'rules': 0.1})
+    assert planner.fits('llm', None) and planner.fits('llm', 5000)
+    assert not planner.fits('llm', 100) and planner.fits('local', 100)
+    assert not planner.fits('local', 0.5) and planner.fits('rules', 0.5)
+
+    # A gateway that got fast fits tight budgets again
+    for _ in range(50):
+        planner.observe('llm', 80.0)
+    assert planner.estimate('llm') < 100
+    assert planner.fits('llm', 100)
+    assert planner.stats()['llm']['samples'] == 50
+    print("✅ Paths fit the budget from live latency estimates")
+
+
+def test_probes_let_a_skipped_path_recover():
+    print("🧪 Testing latency probes for skipped paths...")
+    clock = [0.0]
+    planner = DeadlinePlanner({'llm': 800.0, 'heuristic': 0.1}, probe_interval=10.0, clock=lambda: clock[0])
+    assert not planner.fits('llm', 400)
+    assert planner.claim_probe('llm')
+    assert not planner.claim_probe('llm')
+    clock[0] += 10
+    assert planner.claim_probe('llm')
+
+    # Each probe measures the real (fast) latency until the path fits again
+    probes = 0
+    while not planner.fits('llm', 400):
+        clock[0] += 10
+        assert planner.claim_probe('llm')
+        planner.observe('llm', 120.0)
+        probes += 1
+    assert probes < 30 and planner.stats()['llm']['probes'] == probes + 2
+    print(f"✅ A skipped path fits again after {probes} probes")
+
+
+def test_remaining_budget():
+    assert remaining_ms(None) is None
+    assert 900 < remaining_ms(time.monotonic() + 1) <= 1000
+
+
+def test_tight_deadline_skips_llm():
+    print("🧪 Testing deadline-aware /data...")
+    import app
+
+    fake_client = unittest.mock.MagicMock()
+    fake_client.chat.completions.create.return_value = unittest.mock.MagicMock(
+        choices=[unittest.mock.MagicMock(message=unittest.mock.MagicMock(content='NO'))])
+    planner = DeadlinePlanner({'llm': 600.0, 'local': 1.0, 'rules': 0.1})
+
+    with unittest.mock.patch.dict(os.environ, {'TRUEFOUNDRY_API_KEY': 'test-key'}), \
+            unittest.mock.patch('app.get_truefoundry_client', return_value=fake_client), \
+            unittest.mock.patch('app.local_classifier_model', None), \
+            unittest.mock.patch.object(app, 'subtitle_deadlines', planner), \
+            unittest.mock.patch('signal.signal'), unittest.mock.patch('signal.alarm'):
+        with app.app.test_client() as client:
+            tight = client.post('/data', json={"text": "deadline [gunshot] nearby", "deadline_ms": 50})
+            assert tight.get_json()['action'] == 'LOWER_VOLUME'
+            assert planner.stats()['llm']['late_avoided'] == 1
+            # The skipped call is made once in the background to keep the estimate measured
+            waited = time.monotonic() + 5
+            while planner.stats()['llm']['samples'] == 0 and time.monotonic() < waited:
+                time.sleep(0.005)
+            assert planner.stats()['llm']['probes'] == 1
+            assert fake_client.chat.completions.create.call_count == 1
+
+            # Playback timestamps work too: the event is 3 s ahead, plenty of time
+            relaxed = client.post('/data', json={"text": "deadline quiet line",
+                                                 "event_time": 63.0, "playback_time": 60.0})
+            assert relaxed.get_json()['action'] == 'NONE'
+            assert fake_client.chat.completions.create.call_count == 2
+            assert planner.stats()['llm']['samples'] == 2
+    print("✅ The LLM is skipped only when it can't answer in time")
+
+
+def test_tight_deadline_uses_audio_heuristics():
+    print("🧪 Testing deadline-aware audio analysis...")
+    import app
+
+    fake_client = unittest.mock.MagicMock()
+    with unittest.mock.patch.dict(os.environ, {'TRUEFOUNDRY_API_KEY': 'test-key'}), \
+            unittest.mock.patch('app.get_truefoundry_client', return_value=fake_client), \
+            unittest.mock.patch('app.start_latency_probe') as start_probe:
+        decision, _ = app.analyze_audio_for_loud_events(
+            0.9, 0.2, 0.45, deadline=time.monotonic() + 0.05
+        )
+    assert decision == 'YES'
+    assert fake_client.chat.completions.create.call_count == 0
+    assert start_probe.call_count == 1
+    print("✅ Borderline spikes fall back to heuristics under a tight deadline")
+
+
+def test_audio_llm_recovers_under_tight_deadline():
+    print("🧪 Testing that the audio LLM path recovers from a pessimistic prior...")
+    import app
+
+    fake_client = unittest.mock.MagicMock()
+    fake_client.chat.completions.create.return_value = unittest.mock.MagicMock(
+        choices=[unittest.mock.MagicMock(message=unittest.mock.MagicMock(content='YES'))])
+    planner = DeadlinePlanner({'llm': 800.0, 'heuristic': 0.1}, probe_interval=0)
+    with unittest.mock.patch.dict(os.environ, {'TRUEFOUNDRY_API_KEY': 'test-key'}), \
+            unittest.mock.patch('app.get_truefoundry_client', return_value=fake_client), \
+            unittest.mock.patch.object(app, 'audio_deadlines', planner), \
+            unittest.mock.patch.object(app.audio_decision_cache, 'get_cached_decision', return_value=None):
+        for _ in range(60):
+            if planner.fits('llm', 400):
+                break
+            samples = planner.stats()['llm']['samples']
+            app.analyze_audio_for_loud_events(0.9, 0.2, 0.45, deadline=time.monotonic() + 0.4)
+            # The request itself took the heuristic; wait for its background probe
+            waited = time.monotonic() + 5
+            while planner.stats()['llm']['samples'] == samples and time.monotonic() < waited:
+                time.sleep(0.005)
+        assert planner.fits('llm', 400), planner.stats()
+        calls = fake_client.chat.completions.create.call_count
+        app.analyze_audio_for_loud_events(0.9, 0.2, 0.45, deadline=time.monotonic() + 0.4)
+        assert fake_client.chat.completions.create.call_count == calls + 1
+    print(f"✅ The LLM is back on the 400 ms audio path after {planner.stats()['llm']['probes']} probes")
+
+
+if __name__ == "__main__":
+    test_planner_tracks_latency_and_picks_path()
+    test_probes_let_a_skipped_path_recover()
+    test_remaining_budget()
+    test_tight_deadline_skips_llm()
+    test_tight_deadline_uses_audio_heuristics()
+    test_audio_llm_recovers_under_tight_deadline()
+    print("\n🎉 Deadline tests passed!")
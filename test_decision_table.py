@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the precomputed decision table and the precompute CLI
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+from decision_table import DecisionTable, DecisionTableError, write_decision_table
+
+
+def test_table_round_trip():
+    print("🧪 Testing decision table round trip...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'table.bin')
+        decisions = {f'[caption {i}]': 'YES' if i % 3 == 0 else 'NO' for i in range(1000)}
+        assert write_decision_table(path, decisions) == 1000
+        assert os.path.getsize(path) == 12 + 1000 * 9
+
+        table = DecisionTable(path)
+        assert all(table.lookup(text) == decision for text, decision in decisions.items())
+        # Lookups are normalized like the corpus
+        assert table.lookup('  [CAPTION   3] ') == 'YES'
+        assert table.lookup('[caption 1000]') is None
+        assert table.stats()['hits'] == 1001
+    print("✅ Every entry is found by binary search over the mapped file")
+
+
+def test_corrupt_tables_are_rejected():
+    print("🧪 Testing corrupt table handling...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'table.bin')
+        write_decision_table(path, {'[boom]': 'YES', '[music]': 'NO'})
+        with open(path, 'r+b') as f:
+            f.truncate(20)
+        for bad_path in (path, os.path.join(tmp, 'missing.bin')):
+            try:
+                DecisionTable(bad_path)
+                assert False, "expected DecisionTableError"
+            except DecisionTableError:
+                pass
+    print("✅ Truncated and missing tables raise DecisionTableError")
+
+
+def test_decision_cache_falls_back_to_table():
+    print("🧪 Testing precomputed tier below DecisionCache...")
+    from app import DecisionCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'table.bin')
+        write_decision_table(path, {'[applause]': 'NO', '[explosion]': 'YES'})
+        cache = DecisionCache(precomputed=DecisionTable(path))
+        assert cache.get_cached_decision('[Explosion]') == 'YES'
+        cache.cache_decision('[explosion]', 'NO')
+        assert cache.get_cached_decision('[explosion]') == 'NO'  # the live cache wins
+        assert cache.get_cached_decisions(['[applause]', '[laughter]', '[explosion]']) == {
+            '[applause]': 'NO', '[explosion]': 'NO'
+        }
+    print("✅ Cache misses are answered from the table")
+
+
+def test_precompute_cli_builds_table():
+    print("🧪 Testing precompute CLI...")
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, 'captions.txt')
+        with open(corpus, 'w') as f:
+            f.write('[Music]\n[music]\n[explosion]\n{"text": "[gunshot]"}\nhello there\n')
+        output = os.path.join(tmp, 'models', 'table.bin')
+        env = {k: v for k, v in os.environ.items() if k != 'TRUEFOUNDRY_API_KEY'}
+        result = subprocess.run(
+            [sys.executable, 'precompute_decisions.py', corpus, '--output', output, '--top', '3'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+            capture_output=True, text=True, timeout=60
+        )
+        assert result.returncode == 0, result.stderr
+        table = DecisionTable(output)
+        assert len(table) == 3
+        assert table.lookup('[MUSIC]') == 'NO'
+        assert table.lookup('[explosion]') == 'YES'
+    print("✅ The most frequent captions are classified into a table")
+
+
+if __name__ == "__main__":
+    test_table_round_trip()
+    test_corrupt_tables_are_rejected()
+    test_decision_cache_falls_back_to_table()
+    test_precompute_cli_builds_table()
+    print("\n🎉 Decision table tests passed!")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for server-side suppression of spikes during an active duck window
+"""
+import unittest.mock
+
+from duck_windows import DuckWindowTracker
+
+
+def test_spikes_inside_window_are_absorbed():
+    print("🧪 Testing duck window absorption...")
+    tracker = DuckWindowTracker(extend_threshold_ms=750, extension_ms=2000, max_window_ms=5000)
+    assert tracker.absorb('tab-1', now=100.0) is None
+
+    tracker.open('tab-1', 0.2, 3000, 0.9, now=100.0)
+    window, extension_ms = tracker.absorb('tab-1', now=101.0)
+    assert extension_ms == 0 and window.level == 0.2
+    assert tracker.absorb('tab-2', now=101.0) is None
+
+    # Close to the end the window is extended once per threshold crossing
+    assert tracker.absorb('tab-1', now=102.5)[1] == 2000
+    assert tracker.absorb('tab-1', now=103.0)[1] == 0
+    # ...but never beyond the maximum window length
+    assert tracker.absorb('tab-1', now=104.3)[1] == 0
+    assert tracker.absorb('tab-1', now=104.6) is None
+
+    stats = tracker.stats()
+    assert stats['opened'] == 1 and stats['suppressed'] == 4 and stats['extended'] == 1
+    print("✅ Spikes merge into the active window and extensions are capped")
+
+
+def test_closed_windows_expire():
+    print("🧪 Testing duck window expiry...")
+    tracker = DuckWindowTracker()
+    tracker.open('tab-1', 0.2, 0, 0.9)
+    tracker.open('tab-2', 0.2, 0, 0.9)
+    tracker.open('tab-3', 0.2, 60000, 0.9)
+    assert tracker.expire(1) == (1, True)
+    assert tracker.expire(10) == (1, False)
+    assert list(tracker.windows) == ['tab-3']
+    print("✅ Closed windows are dropped by housekeeping")
+
+
+def test_audio_endpoint_skips_analysis_during_duck():
+    print("🧪 Testing /audio-data suppression...")
+    import app
+
+    frame = {"volume": 0.9, "baseline": 0.3, "spike": 0.6, "session_id": "test-duck"}
+    with unittest.mock.patch('app.analyze_audio_for_loud_events', return_value=('YES', 0.9)) as analyze:
+        with app.app.test_client() as client:
+            first = client.post('/audio-data', json=frame).get_json()
+            assert first['action'] == 'LOWER_VOLUME' and first['duration'] == 4000
+            for _ in range(5):
+                follow_up = client.post('/audio-data', json=frame).get_json()
+                assert follow_up['action'] == 'NONE' and follow_up['suppressed']
+            # Without a session id every spike is still analyzed on its own
+            anonymous = dict(frame, session_id=None)
+            assert client.post('/audio-data', json=anonymous).get_json()['action'] == 'LOWER_VOLUME'
+
+    assert analyze.call_count == 2
+    print("✅ Only the spike that opened the window was analyzed")
+
+
+if __name__ == "__main__":
+    test_spikes_inside_window_are_absorbed()
+    test_closed_windows_expire()
+    test_audio_endpoint_skips_analysis_during_duck()
+    print("\n🎉 Duck window tests passed!")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the dashboard event feed and the /events endpoints
+"""
+import os
+import tempfile
+import threading
+import time
+
+from event_feed import EventFeed, EventRing
+from feedback_store import FeedbackStore
+
+
+def test_ring_reads_from_cursor():
+    print("🧪 Testing ring buffer cursors...")
+    ring = EventRing(4)
+    for seq in (2, 5, 7, 9, 12, 13):
+        ring.append(seq, {'seq': seq})
+    # 2 and 5 were overwritten; the search skips to the first seq after the cursor
+    assert [event['seq'] for event in ring.since(0, 10)] == [7, 9, 12, 13]
+    assert [event['seq'] for event in ring.since(9, 10)] == [12, 13]
+    assert [event['seq'] for event in ring.since(8, 1)] == [9]
+    assert ring.since(13, 10) == []
+    assert ring.overwritten_seq == 5
+    print("✅ Reads start at the cursor and return only newer entries")
+
+
+def test_feed_cursors_and_stats():
+    print("🧪 Testing feed cursors and incremental stats...")
+    feed = EventFeed(per_client=3, total=5)
+    feed.append('tab-1', {'type': 'decision', 'endpoint': '/data', 'action': 'LOWER_VOLUME', 'path': 'llm'})
+    feed.append('tab-2', {'type': 'decision', 'endpoint': '/audio-data', 'action': 'NONE', 'path': 'heuristic'})
+    feed.append('tab-1', {'type': 'decision', 'endpoint': '/audio-levels', 'action': 'LOWER_VOLUME',
+                          'path': 'onset'})
+
+    first = feed.read('tab-1')
+    assert [event['seq'] for event in first['events']] == [1, 3] and first['cursor'] == 3
+    assert feed.read('tab-1', since=first['cursor'])['events'] == []
+
+    feed.append('tab-1', {'type': 'user_correction'})
+    update = feed.read('tab-1', since=first['cursor'])
+    assert [event['type'] for event in update['events']] == ['user_correction']
+    stats = update['stats']
+    assert stats['totalAdjustments'] == 2 and stats['userCorrections'] == 1
+    assert stats['subtitleDetections'] == 1 and stats['audioDetections'] == 1
+    assert stats['accuracyRate'] == 0.5 and stats['paths'] == {'llm': 1, 'onset': 1}
+
+    everyone = feed.read()
+    assert everyone['cursor'] == 4 and everyone['stats']['decisions'] == 3
+    assert feed.read('unknown')['events'] == []
+
+    # A dashboard that fell behind the ring learns that it missed events
+    for _ in range(3):
+        feed.append('tab-1', {'type': 'decision', 'action': 'NONE'})
+    assert feed.read('tab-1', since=first['cursor'])['truncated']
+    assert not feed.read('tab-1', since=5)['truncated']
+    print("✅ Polls return only new events, stats are kept up to date on append")
+
+
+def test_waiters_are_woken_by_appends():
+    print("🧪 Testing streaming waits...")
+    feed = EventFeed()
+    results = []
+
+    def follow():
+        results.append(feed.wait('tab-1', since=0, timeout=5.0))
+
+    followers = [threading.Thread(target=follow) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    feed.append('tab-1', {'type': 'decision', 'action': 'LOWER_VOLUME'})
+    for follower in followers:
+        follower.join()
+    assert time.monotonic() - started < 1.0
+    assert [len(result['events']) for result in results] == [1, 1, 1]
+    assert feed.wait('tab-1', since=1, timeout=0.05)['events'] == []
+    print("✅ Every following dashboard is woken by a new event")
+
+
+def test_events_endpoints():
+    print("🧪 Testing /events endpoints...")
+    import app
+
+    app.event_feed = EventFeed()
+    previous = app.feedback_store
+    with tempfile.TemporaryDirectory() as tmp, app.app.test_client() as client:
+        app.feedback_store = FeedbackStore(os.path.join(tmp, 'feedback.sqlite3'), flush_interval=0.05)
+        try:
+            client.post('/audio-data', json={'volume': 0.95, 'baseline': 0.2, 'spike': 0.75,
+                                             'client_id': 'events-tab'})
+            client.post('/feedback', json={'client_id': 'events-tab'})
+            assert app.feedback_store.flush()
+        finally:
+            app.feedback_store.close()
+            app.feedback_store = previous
+
+        data = client.get('/events?client_id=events-tab').get_json()
+        assert [event['type'] for event in data['events']] == ['decision', 'user_correction']
+        assert data['events'][0]['endpoint'] == '/audio-data' and data['events'][0]['path']
+        assert data['stats']['userCorrections'] == 1
+        assert client.get(f"/events?client_id=events-tab&since={data['cursor']}").get_json()['events'] == []
+        assert client.get('/events?since=soon').status_code == 400
+
+        response = client.get('/events/stream?client_id=events-tab&timeout=0.2')
+        assert response.mimetype == 'text/event-stream'
+        body = response.get_data(as_text=True)
+        assert 'id: 1\nevent: decision\n' in body and 'event: stats' in body
+        resumed = client.get('/events/stream?client_id=events-tab&timeout=0.2',
+                             headers={'Last-Event-ID': '1'}).get_data(as_text=True)
+        assert 'id: 1\n' not in resumed and 'id: 2\n' in resumed
+    print("✅ Dashboards poll with cursors or follow the SSE stream")
+
+
+if __name__ == "__main__":
+    test_ring_reads_from_cursor()
+    test_feed_cursors_and_stats()
+    test_waiters_are_woken_by_appends()
+    test_events_endpoints()
+    print("\n🎉 Event feed tests passed!")
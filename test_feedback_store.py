@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for write-behind feedback storage and correction-based suppression
+"""
+import os
+import tempfile
+import time
+
+from feedback_store import FeedbackStore
+
+
+def test_corrections_are_written_in_batches():
+    print("🧪 Testing write-behind correction storage...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeedbackStore(os.path.join(tmp, 'feedback.sqlite3'), flush_interval=0.05)
+        for playback_time in (95.0, 12.5, 40.0):
+            assert store.record_correction(client_id='tab-1', video_id='vid-a', playback_time=playback_time,
+                                           path='llm', endpoint='/data', confidence=0.9)
+        store.record_correction(client_id='tab-2', video_id='vid-b', playback_time=3.0, path='onset')
+        assert store.flush()
+
+        corrections = store.corrections_for_video('vid-a')
+        assert [c['playback_time'] for c in corrections] == [12.5, 40.0, 95.0]
+        assert corrections[0]['path'] == 'llm' and corrections[0]['endpoint'] == '/data'
+        assert len(store.corrections_for_video('vid-a', start=30, end=60)) == 1
+        stats = store.stats()
+        assert stats['written'] == 4 and stats['queue_depth'] == 0 and stats['batches'] >= 1
+        store.close()
+
+        # The suppression index is rebuilt from the file
+        reopened = FeedbackStore(os.path.join(tmp, 'feedback.sqlite3'))
+        assert reopened.suppresses('vid-b', 4.0) == 3.0
+        reopened.close()
+    print("✅ Corrections are committed off the request path and indexed by video")
+
+
+def test_false_positive_rates_per_path():
+    print("🧪 Testing false-positive rates...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeedbackStore(os.path.join(tmp, 'feedback.sqlite3'), flush_interval=0.05)
+        now = time.time()
+        for _ in range(8):
+            store.record_duck('llm', now=now)
+        for _ in range(4):
+            store.record_duck('onset', now=now)
+        store.record_duck('llm', now=now - 7200)
+        store.record_correction(video_id='v', playback_time=1.0, path='llm', now=now)
+        store.record_correction(video_id='v', playback_time=9.0, path='llm', now=now)
+        store.record_correction(video_id='v', playback_time=5.0, path='llm', now=now - 7200)
+        assert store.flush()
+
+        rates = store.false_positive_rates(3600, now=now)
+        assert rates['llm'] == {'ducks': 8, 'corrections': 2, 'rate': 0.25}
+        assert rates['onset'] == {'ducks': 4, 'corrections': 0, 'rate': 0.0}
+        assert store.false_positive_rates(3 * 3600, now=now)['llm']['ducks'] == 9
+        store.close()
+    print("✅ Rates come from per-minute duck counts and indexed corrections")
+
+
+def test_corrected_moments_are_suppressed():
+    print("🧪 Testing repeat-duck suppression...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeedbackStore(os.path.join(tmp, 'feedback.sqlite3'), suppress_window=3.0, max_per_video=2)
+        store.record_correction(video_id='vid-a', playback_time=60.0)
+        # Indexed at once, before the writer commits anything
+        assert store.suppresses('vid-a', 62.5) == 60.0
+        assert store.suppresses('vid-a', 57.5) == 60.0
+        assert store.suppresses('vid-a', 64.0) is None
+        assert store.suppresses('vid-b', 60.0) is None
+        assert store.suppresses('vid-a', None) is None
+
+        store.record_correction(video_id='vid-a', playback_time=10.0)
+        store.record_correction(video_id='vid-a', playback_time=120.0)
+        # Bounded per video: the earliest moment leaves the index
+        assert store.suppresses('vid-a', 10.0) is None and store.suppresses('vid-a', 121.0) == 120.0
+        assert store.stats()['suppressed'] == 3
+        store.close()
+    print("✅ Spikes near a corrected moment are recognised without analysis")
+
+
+def test_feedback_endpoints_suppress_repeat_ducks():
+    print("🧪 Testing /feedback attribution and suppression...")
+    import app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        previous = app.feedback_store
+        app.feedback_store = FeedbackStore(os.path.join(tmp, 'feedback.sqlite3'), flush_interval=0.05)
+        try:
+            with app.app.test_client() as client:
+                spike = {'volume': 0.95, 'baseline': 0.2, 'spike': 0.75, 'client_id': 'fb-tab',
+                         'video_id': 'fb-video', 'playback_time': 42.0}
+                first = client.post('/audio-data', json=spike).get_json()
+                assert first['action'] == 'LOWER_VOLUME'
+
+                # Reported a few seconds later; attributed to the duck at 42s
+                client.post('/feedback', json={'client_id': 'fb-tab', 'video_id': 'fb-video',
+                                               'playback_time': 46.5})
+                assert app.feedback_store.flush()
+                data = client.get('/feedback/corrections?video_id=fb-video').get_json()
+                assert [c['playback_time'] for c in data['corrections']] == [42.0]
+                assert data['corrections'][0]['endpoint'] == '/audio-data'
+
+                again = client.post('/audio-data', json=dict(spike, client_id='fb-other',
+                                                             playback_time=43.0)).get_json()
+                assert again['action'] == 'NONE' and again['trigger'] == 'user_feedback'
+                assert client.get('/feedback/corrections').status_code == 400
+                rates = client.get('/feedback/false-positives').get_json()
+                assert rates['window_seconds'] == 3600
+        finally:
+            app.feedback_store.close()
+            app.feedback_store = previous
+    print("✅ A corrected moment isn't ducked again for anyone watching that video")
+
+
+if __name__ == "__main__":
+    test_corrections_are_written_in_batches()
+    test_false_positive_rates_per_path()
+    test_corrected_moments_are_suppressed()
+    test_feedback_endpoints_suppress_repeat_ducks()
+    print("\n🎉 Feedback store tests passed!")
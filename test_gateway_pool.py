@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-warmed gateway connection pool against a local stub gateway
+"""
+import json
+import threading
+import time
+import unittest.mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gateway_pool import GatewayConnectionPool
+
+
+class StubGatewayHandler(BaseHTTPRequestHandler):
+    """Answers /v1/models and /v1/chat/completions over keep-alive HTTP/1.1"""
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # Hold warm-up requests briefly so concurrent ones need separate connections
+        time.sleep(self.server.get_delay)
+        self.send_json({'object': 'list', 'data': []})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_json({
+            'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': int(time.time()),
+            'model': 'stub-model',
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': self.server.answer}}],
+            'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2},
+        })
+
+
+def start_stub_gateway(answer='YES'):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubGatewayHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.answer = answer
+    server.get_delay = 0.05
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def test_warmed_connections_are_reused():
+    print("🧪 Testing connection warm-up and reuse...")
+    server, base_url = start_stub_gateway()
+    pool = GatewayConnectionPool(base_url, api_key='test', pool_size=4, warm_connections=3)
+    try:
+        assert pool.warm() == 3
+        assert server.connections == 3
+        for _ in range(10):
+            assert pool.client.post(f'{base_url}/chat/completions', json={}).status_code == 200
+        stats = pool.stats()
+        assert server.connections == 3
+        assert stats['connections_opened'] == 3 and stats['requests'] == 13
+        assert stats['open_connections'] == 3 and stats['idle_connections'] == 3
+    finally:
+        pool.close()
+        server.shutdown()
+    print("✅ Requests after warm-up open no new connections")
+
+
+def test_keepalive_and_saturation():
+    print("🧪 Testing keep-alive pings and saturation counts...")
+    server, base_url = start_stub_gateway()
+    saturated = []
+    pool = GatewayConnectionPool(base_url, pool_size=2, warm_connections=2, keepalive_interval=0.0,
+                                 on_saturated=lambda: saturated.append(1))
+    try:
+        assert pool.keepalive(10) == (2, False)
+        pool.keepalive_thread.join()
+        assert pool.stats()['keepalive_pings'] == 2
+
+        # A slow gateway holds up the keep-alive thread, not housekeeping
+        server.get_delay = 1.0
+        started = time.monotonic()
+        assert pool.keepalive(10) == (2, False)
+        assert pool.keepalive(10) == (0, False)  # one refresh at a time
+        assert time.monotonic() - started < 0.5
+        pool.keepalive_thread.join()
+        assert pool.stats()['keepalive_pings'] == 4
+        server.get_delay = 0.05
+
+        pool.keepalive_interval = 60
+        assert pool.keepalive(10) == (0, False)  # recent traffic: nothing to do
+
+        threads = [threading.Thread(target=pool.client.get, args=(f'{base_url}/models',))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert pool.stats()['saturated'] == len(saturated) >= 1
+        assert pool.stats()['peak_in_flight'] > 2
+    finally:
+        pool.close()
+        server.shutdown()
+    print("✅ Idle pools are pinged and oversubscription is counted")
+
+
+def test_live_mode_uses_the_shared_pool():
+    print("🧪 Testing the OpenAI client on the shared pool...")
+    import app
+
+    server, base_url = start_stub_gateway(answer='YES')
+    env = {'TRUEFOUNDRY_API_KEY': 'test-key', 'TRUEFOUNDRY_BASE_URL': base_url,
+           'CREST_LLM_WARM_CONNECTIONS': '2'}
+    with unittest.mock.patch.dict('os.environ', env), \
+            unittest.mock.patch.object(app, 'truefoundry_client', None), \
+            unittest.mock.patch.object(app, 'llm_connection_pool', None), \
+            unittest.mock.patch.object(app, 'local_classifier_model', None):
+        try:
+            client = app.get_truefoundry_client()
+            assert app.llm_connection_pool.warm() == 2
+            assert app.analyze_subtitle_for_loud_events("stub gateway [thunder] rolls") == 'YES'
+            assert server.connections == 2
+            assert app.llm_connection_pool.stats()['requests'] == 3
+            assert client._client is app.llm_connection_pool.client
+        finally:
+            app.llm_connection_pool.close()
+            server.shutdown()
+    print("✅ LLM calls reuse the warmed connections")
+
+
+if __name__ == "__main__":
+    test_warmed_connections_are_reused()
+    test_keepalive_and_saturation()
+    test_live_mode_uses_the_shared_pool()
+    print("\n🎉 Gateway pool tests passed!")
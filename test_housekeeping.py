@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for background housekeeping and incremental expiry
+"""
+import threading
+import time
+import unittest.mock
+
+import cache_backends
+from housekeeping import HousekeepingScheduler
+
+
+def test_memory_backend_expires_in_slices():
+    print("🧪 Testing incremental cache expiry...")
+    backend = cache_backends.MemoryBackend()
+    for i in range(25):
+        backend.set('subtitle', f'old{i}', 'NO', 0)
+    backend.set('subtitle', 'fresh', 'YES', 30)
+    # Overwritten entries must not be expired by their stale heap item
+    backend.set('subtitle', 'rewritten', 'NO', 0)
+    backend.set('subtitle', 'rewritten', 'YES', 30)
+
+    assert backend.expire(10) == (10, True)
+    assert backend.expire(10) == (10, True)
+    reclaimed, more_pending = backend.expire(10)
+    assert reclaimed == 5 and not more_pending
+    assert set(backend.entries) == {('subtitle', 'fresh'), ('subtitle', 'rewritten')}
+    print("✅ Expired entries are reclaimed at most one slice at a time")
+
+
+def test_deduplicator_cleanup_is_incremental():
+    print("🧪 Testing stale request cleanup...")
+    from app import RequestDeduplicator
+
+    deduplicator = RequestDeduplicator(shards=1)
+    pending, _ = deduplicator.shards[0]
+    for i in range(5):
+        deduplicator.add_request(f'stale{i}')
+    for key in list(pending):
+        pending[key] -= 60
+    deduplicator.add_request('active')
+
+    assert deduplicator.cleanup_stale_requests(max_items=3) == (3, True)
+    assert deduplicator.cleanup_stale_requests(max_items=3) == (2, False)
+    assert list(pending) == ['active']
+    print("✅ Only stale requests are removed, oldest first")
+
+
+def test_scheduler_reports_and_drains_backlog():
+    print("🧪 Testing housekeeping scheduler...")
+    runs = []
+    backlog = {'items': 7}
+
+    def expire(max_items):
+        reclaimed = min(max_items, backlog['items'])
+        backlog['items'] -= reclaimed
+        return reclaimed, backlog['items'] > 0
+
+    scheduler = HousekeepingScheduler(
+        on_task_run=lambda task, reclaimed, duration_ms: runs.append((task.name, reclaimed))
+    )
+    scheduler.add_task('cache', expire, interval_seconds=0.01, batch_size=3)
+    scheduler.start()
+    try:
+        deadline = time.time() + 5
+        while backlog['items'] and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        scheduler.stop()
+
+    assert backlog['items'] == 0
+    assert [r for _, r in runs[:3]] == [3, 3, 1]
+    stats = scheduler.stats()['tasks']['cache']
+    assert stats['reclaimed'] == 7 and stats['runs'] >= 3
+    print("✅ Backlog drained in slices with duration and reclaimed counts")
+
+
+def test_failing_task_does_not_stop_scheduler():
+    print("🧪 Testing task error isolation...")
+    errors = []
+    scheduler = HousekeepingScheduler(on_task_error=lambda task, e: errors.append(task.name))
+
+    def broken(max_items):
+        raise RuntimeError("store unavailable")
+
+    scheduler.add_task('broken', broken, interval_seconds=60)
+    scheduler.add_task('healthy', lambda max_items: (1, False), interval_seconds=60)
+    scheduler.run_pending(now=time.monotonic() + 61)
+    assert errors == ['broken']
+    assert scheduler.tasks['broken'].errors == 1
+    assert scheduler.tasks['healthy'].reclaimed == 1
+    print("✅ A failing task is counted and the others still run")
+
+
+def test_requests_never_run_cleanup():
+    print("🧪 Testing request path stays free of cleanup...")
+    import app
+
+    cleanup_threads = []
+
+    def record_cleanup(**kwargs):
+        cleanup_threads.append(threading.current_thread())
+        return 0, False
+
+    with unittest.mock.patch.object(app.request_deduplicator, 'cleanup_stale_requests',
+                                    side_effect=record_cleanup), \
+            unittest.mock.patch('app.get_truefoundry_client', return_value=None):
+        with app.app.test_client() as client:
+            for i in range(30):
+                client.post('/data', json={"text": f"[explosion {i}]"})
+    assert threading.current_thread() not in cleanup_threads
+    assert 'request_deduplicator' in app.housekeeping.tasks
+    print("✅ /data never runs housekeeping inline")
+
+
+if __name__ == "__main__":
+    test_memory_backend_expires_in_slices()
+    test_deduplicator_cleanup_is_incremental()
+    test_scheduler_reports_and_drains_backlog()
+    test_failing_task_does_not_stop_scheduler()
+    test_requests_never_run_cleanup()
+    print("\n🎉 Housekeeping tests passed!")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for latency-ranked, hedged LLM routing
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+from llm_router import LLMRouter, Route
+
+
+class FakeClient:
+    """Chat client that answers `answer` after `delay` seconds (or raises)"""
+    def __init__(self, answer, delay=0.0, error=None):
+        self.answer = answer
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, **kwargs):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(model=model, answer=self.answer)
+
+
+def test_slow_primary_is_hedged():
+    print("🧪 Testing hedge past the primary's delay...")
+    events = []
+    slow, fast = FakeClient('slow', delay=0.5), FakeClient('fast', delay=0.01)
+    router = LLMRouter([Route('slow', slow, 'model-a'), Route('fast', fast, 'model-b')],
+                       default_hedge_delay_ms=50, on_event=events.append)
+    started = time.perf_counter()
+    response = router.complete(messages=[])
+    elapsed = time.perf_counter() - started
+    assert response.answer == 'fast' and response.model == 'model-b'
+    assert elapsed < 0.3, elapsed
+    stats = router.stats()
+    assert stats['hedges_issued'] == 1 and stats['hedges_won'] == 1
+    assert events == ['hedge_issued', 'hedge_won']
+    router.close()
+    print("✅ The hedged route answered first")
+
+
+def test_hedge_budget_is_capped():
+    print("🧪 Testing hedge budget...")
+    client = FakeClient('late', delay=0.03)
+    router = LLMRouter([Route('only', client, 'model-a')], hedge_ratio=0.0, hedge_burst=2,
+                       default_hedge_delay_ms=1)
+    for _ in range(5):
+        assert router.complete(messages=[]).answer == 'late'
+    stats = router.stats()
+    assert stats['hedges_issued'] == 2 and stats['hedges_denied'] == 3
+    assert client.calls == 7
+    router.close()
+    print("✅ Hedges stop once the budget is spent")
+
+
+def test_faster_route_is_preferred():
+    print("🧪 Testing latency ranking...")
+    slow, fast = FakeClient('slow', delay=0.05), FakeClient('fast')
+    router = LLMRouter([Route('slow', slow, 'a'), Route('fast', fast, 'b')],
+                       hedge_ratio=0.0, hedge_burst=0)
+    answers = [router.complete(messages=[]).answer for _ in range(10)]
+    # Both routes are sampled once, then traffic sticks to the faster one
+    assert answers.count('slow') == 1 and answers[-1] == 'fast'
+    assert router.stats()['routes']['fast']['wins'] == 9
+    router.close()
+    print("✅ Calls go to the route with the lowest latency EWMA")
+
+
+def test_fast_failure_fails_over():
+    print("🧪 Testing failover after a failed primary...")
+    broken = FakeClient(None, error=RuntimeError('502 from gateway'))
+    healthy = FakeClient('ok', delay=0.01)
+    router = LLMRouter([Route('broken', broken, 'a'), Route('healthy', healthy, 'b')],
+                       default_hedge_delay_ms=1000, hedge_burst=0)
+    assert router.complete(messages=[]).answer == 'ok'
+    stats = router.stats()
+    assert stats['routes']['broken']['errors'] == 1
+    # Failing over doesn't spend (or need) hedge budget
+    assert stats['failovers'] == 1 and stats['hedges_issued'] == 0 and stats['hedges_won'] == 0
+
+    router = LLMRouter([Route('broken', broken, 'a')], hedge_burst=0)
+    try:
+        router.complete(messages=[])
+        assert False, "expected the route's error"
+    except RuntimeError:
+        pass
+    print("✅ Failures go to the next route at once, or are raised when none is left")
+
+
+def test_fast_failing_route_is_ejected():
+    print("🧪 Testing a fast-failing route next to a healthy one...")
+    broken = FakeClient(None, error=RuntimeError('502 from gateway'))
+    healthy = FakeClient('ok', delay=0.05)
+    events = []
+    router = LLMRouter([Route('broken', broken, 'a'), Route('healthy', healthy, 'b')],
+                       hedge_ratio=0.0, hedge_burst=0, eject_after=3, eject_seconds=60,
+                       on_event=events.append)
+    answers = [router.complete(messages=[]).answer for _ in range(50)]
+    assert answers == ['ok'] * 50
+    stats = router.stats()['routes']
+    # Instant errors don't make the route look fast: it's ranked last after its first failure
+    assert broken.calls <= 3 and stats['broken']['errors'] == broken.calls
+    assert stats['healthy']['wins'] == 50
+    router.close()
+
+    # Consecutive errors eject the route for the cooldown
+    router = LLMRouter([Route('broken', broken, 'a'), Route('healthy', healthy, 'b')],
+                       hedge_ratio=0.0, hedge_burst=0, eject_after=1, eject_seconds=60,
+                       on_event=events.append)
+    router.complete(messages=[])
+    assert router.stats()['routes']['broken']['ejected'] and router.stats()['ejections'] == 1
+    assert 'route_ejected' in events and 'failover' in events
+    router.close()
+    print("✅ Errors cost a fixed penalty and eject the route; calls keep succeeding")
+
+
+if __name__ == "__main__":
+    test_slow_primary_is_hedged()
+    test_hedge_budget_is_capped()
+    test_faster_route_is_preferred()
+    test_fast_failure_fails_over()
+    test_fast_failing_route_is_ejected()
+    print("\n🎉 LLM router tests passed!")
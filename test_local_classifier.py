@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the local classifier tier and its training CLI
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest.mock
+
+from local_classifier import HashedNgramClassifier, ModelFormatError
+
+LOUD = ['explosion', 'gunshot', 'thunder', 'crash', 'screaming', 'bang', 'boom', 'gunfire']
+QUIET = ['whispering', 'birds chirping', 'soft music', 'footsteps', 'sighs', 'laughs softly']
+DIALOGUE = ['how are you today', 'see you tomorrow', 'I think we should go', 'what time is it',
+            'that sounds great', 'where did you put the keys']
+
+
+def make_examples():
+    examples = []
+    for word in LOUD:
+        examples += [(f"[{word}]", 'YES'), (f"[loud {word}]", 'YES'), (f"[{word} in distance]", 'YES')]
+    for word in QUIET:
+        examples += [(f"[{word}]", 'NO'), (f"[{word} continues]", 'NO')]
+    for line in DIALOGUE:
+        examples += [(line, 'NO'), (line.upper(), 'NO'), (f"- {line}", 'NO')]
+    return examples
+
+
+def test_classifier_learns_and_round_trips():
+    print("🧪 Testing local classifier training...")
+    model = HashedNgramClassifier(n_features=2 ** 16, model_version='test-1').fit(make_examples(), epochs=30)
+
+    assert model.predict("[explosion]")[0] == 'YES'
+    assert model.predict("[gunshot]")[0] == 'YES'
+    assert model.predict("how are you today")[0] == 'NO'
+    print("✅ Obvious tags and dialogue are classified correctly")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.json')
+        model.save(path)
+        loaded = HashedNgramClassifier.load(path)
+        assert loaded.model_version == 'test-1'
+        assert abs(loaded.predict_proba("[thunder]") - model.predict_proba("[thunder]")) < 1e-4
+
+        with open(path) as f:
+            data = json.load(f)
+        data['format_version'] = 99
+        try:
+            HashedNgramClassifier.from_dict(data)
+            assert False, "expected ModelFormatError"
+        except ModelFormatError:
+            pass
+    print("✅ Model files round-trip and unknown versions are rejected")
+
+
+def test_training_cli_reads_server_logs():
+    print("🧪 Testing train_classifier.py...")
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'server.log')
+        with open(log_path, 'w') as f:
+            for text, decision in make_examples():
+                f.write(json.dumps({'message': 'OpenAI decision', 'decision': decision,
+                                    'subtitle_text': text}) + '\n')
+                f.write(json.dumps({'message': 'Health check requested'}) + '\n')
+        output = os.path.join(tmp, 'models', 'model.json')
+        result = subprocess.run(
+            [sys.executable, 'train_classifier.py', log_path, '--output', output,
+             '--model-version', 'cli-1', '--epochs', '30', '--holdout', '0.1'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        model = HashedNgramClassifier.load(output)
+        assert model.model_version == 'cli-1'
+        assert model.metadata['training_examples'] > 0
+    print("✅ CLI trains from logged LLM decisions")
+
+
+def test_cascade_answers_locally_and_escalates():
+    print("🧪 Testing cascade in live mode...")
+    import app
+
+    model = HashedNgramClassifier(n_features=2 ** 16, confidence_threshold=0.8).fit(make_examples(), epochs=30)
+    mock_client = unittest.mock.MagicMock()
+    mock_client.chat.completions.create.return_value.choices[0].message.content = "YES"
+
+    live_env = {'TRUEFOUNDRY_API_KEY': 'test-key', 'TRUEFOUNDRY_BASE_URL': 'https://gateway.invalid'}
+    with unittest.mock.patch.dict(os.environ, live_env), \
+            unittest.mock.patch('app.truefoundry_client', mock_client), \
+            unittest.mock.patch('app.local_classifier_model', model):
+        before = dict(app.cascade_stats)
+
+        assert app.analyze_subtitle_for_loud_events("[loud explosion in distance]") == 'YES'
+        assert mock_client.chat.completions.create.call_count == 0
+        assert app.cascade_stats['local'] == before['local'] + 1
+        print("✅ Confident item answered without calling the gateway")
+
+        ambiguous = "the crowd goes quiet then suddenly erupts"
+        assert not model.is_confident(model.predict(ambiguous)[1])
+        assert app.analyze_subtitle_for_loud_events(ambiguous) == 'YES'
+        assert mock_client.chat.completions.create.call_count == 1
+        assert app.cascade_stats['llm'] == before['llm'] + 1
+        assert (app.cascade_stats['agree'] + app.cascade_stats['disagree']
+                == before['agree'] + before['disagree'] + 1)
+        print("✅ Low-confidence item escalated and agreement recorded")
+
+
+if __name__ == "__main__":
+    test_classifier_learns_and_round_trips()
+    test_training_cli_reads_server_logs()
+    test_cascade_answers_locally_and_escalates()
+    print("\n🎉 Local classifier tests passed!")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming onset detector and the /audio-levels endpoint
+"""
+import random
+import time
+
+from onset_detector import OnsetDetector, OnsetState
+
+
+def noisy_levels(count, baseline=0.2, noise=0.02, seed=3):
+    rng = random.Random(seed)
+    return [max(0.0, baseline + rng.gauss(0, noise)) for _ in range(count)]
+
+
+def test_spike_is_picked_at_its_peak():
+    print("🧪 Testing onset peak picking...")
+    detector = OnsetDetector(hold_frames=2)
+    assert detector.process('tab', noisy_levels(30)) == []
+    onsets = detector.process('tab', [0.5, 0.7, 0.3, 0.2, 0.2])
+    assert len(onsets) == 1
+    onset = onsets[0]
+    # Reported on frame 32, once the envelope stopped rising, with its peak from frame 31
+    assert onset.frame == 32 and abs(onset.peak - 0.57) < 0.02
+    assert 0.15 < onset.baseline < 0.25 and onset.strength > 0.3
+    assert detector.phase('tab') in ('release', 'idle')
+    # After the release the detector re-arms for the next spike
+    detector.process('tab', noisy_levels(10, seed=4))
+    assert detector.phase('tab') == 'idle'
+    assert len(detector.process('tab', [0.8, 0.8, 0.3])) == 1
+    print("✅ One onset per spike, reported at the envelope's peak")
+
+
+def test_adaptive_threshold():
+    print("🧪 Testing adaptive threshold...")
+    detector = OnsetDetector()
+    # A noisy scene raises the threshold: swings that are normal here don't trigger
+    busy = noisy_levels(200, baseline=0.4, noise=0.06, seed=8)
+    assert len(detector.process('busy', busy)) <= 2
+    # The same absolute jump after a quiet stretch is an onset
+    assert len(detector.process('quiet', noisy_levels(50, noise=0.005) + [0.45, 0.45])) == 1
+    # A scene that gets loud and stays loud becomes the new baseline
+    sustained = detector.process('sustained', noisy_levels(30) + [0.7] * 200 + [0.95, 0.95])
+    assert len(sustained) == 2 and sustained[1].baseline > 0.6
+    print("✅ Thresholds follow each stream's own level and variability")
+
+
+def test_state_is_compact_and_expires():
+    print("🧪 Testing session state and expiry...")
+    assert not hasattr(OnsetState(0.1, 0.0), '__dict__')
+    detector = OnsetDetector(idle_ttl=10, shards=4)
+    now = time.time()
+    for i in range(100):
+        detector.process(f'tab-{i}', [0.1, 0.2], now=now - 60 if i < 70 else now)
+    assert detector.stats()['sessions'] == 100 and detector.stats()['frames'] == 200
+    assert detector.expire(50) == (50, True)
+    assert detector.expire(50) == (20, False)
+    assert detector.stats()['sessions'] == 30
+    print("✅ Per-session state uses __slots__ and idle sessions expire")
+
+
+def test_audio_levels_endpoint():
+    print("🧪 Testing /audio-levels endpoint...")
+    import app
+
+    with app.app.test_client() as client:
+        response = client.post('/audio-levels', json={'session_id': 'levels-tab', 'levels': noisy_levels(20)})
+        assert response.get_json() == {'action': 'NONE', 'trigger': 'onset_detector', 'phase': 'idle'}
+        response = client.post('/audio-levels', json={'session_id': 'levels-tab', 'levels': [0.9, 0.9, 0.5]})
+        data = response.get_json()
+        assert data['action'] == 'LOWER_VOLUME' and data['trigger'] == 'onset_detector'
+        assert data['onset']['strength'] > 0.5 and data['confidence'] > 0.9
+        assert app.duck_windows.absorb('levels-tab') is not None
+
+        assert client.post('/audio-levels', json={'levels': [0.1]}).status_code == 400
+        assert client.post('/audio-levels', json={'session_id': 'x', 'levels': ['loud']}).status_code == 400
+        assert client.post('/audio-levels', json={'session_id': 'x', 'levels': [0.1] * 101}).status_code == 400
+    print("✅ Streamed levels duck on onsets without thresholds or an LLM")
+
+
+if __name__ == "__main__":
+    test_spike_is_picked_at_its_peak()
+    test_adaptive_threshold()
+    test_state_is_compact_and_expires()
+    test_audio_levels_endpoint()
+    print("\n🎉 Onset detector tests passed!")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for speculative prefetch of upcoming caption decisions
+"""
+import time
+import unittest.mock
+
+from prefetch import Prefetcher
+
+
+def make_prefetcher(cached=()):
+    stored = {}
+    prefetcher = Prefetcher(
+        classify=lambda text: ('YES' if 'boom' in text else 'NO', 'shed' not in text),
+        store=lambda text, decision, ttl: stored.update({text: (decision, ttl)}),
+        is_cached=lambda texts: {text for text in texts if text in cached},
+        workers=0, slack_seconds=30
+    )
+    return prefetcher, stored
+
+
+def test_cues_are_classified_earliest_first_with_long_ttl():
+    print("🧪 Testing prefetch ordering and TTL...")
+    prefetcher, stored = make_prefetcher(cached={'[music]'})
+    result = prefetcher.submit([
+        {'text': 'a distant boom', 'start_time': 130},
+        {'text': 'hello again', 'start_time': 105},
+        {'text': '[music]', 'start_time': 101},
+        {'text': '  ', 'start_time': 102},
+        {'text': 'untimed line'},
+    ], playback_time=100)
+    assert result == {'queued': 3, 'cached': 1, 'dropped': 0}
+
+    order = []
+    while prefetcher.heap:
+        cue = prefetcher._next_cue()
+        order.append(cue[1])
+        prefetcher.run_one(*cue)
+    assert order == ['hello again', 'a distant boom', 'untimed line']
+    assert stored['a distant boom'] == ('YES', 60)
+    assert stored['hello again'] == ('NO', 35)
+    assert stored['untimed line'] == ('NO', 30)
+    print("✅ Earliest cues first, cached until past their start time")
+
+
+def test_hit_rate_and_stale_cues():
+    print("🧪 Testing prefetch hit accounting...")
+    prefetcher, stored = make_prefetcher()
+    prefetcher.submit([{'text': 'boom boom', 'start_time': 12}, {'text': 'too late', 'start_time': 10}],
+                      playback_time=10)
+    for _ in range(2):
+        prefetcher.run_one(*prefetcher._next_cue())
+    assert 'too late' not in stored
+
+    assert prefetcher.record_lookup('boom boom')
+    assert not prefetcher.record_lookup('boom boom')
+    stats = prefetcher.stats()
+    assert stats['stale'] == 1 and stats['classified'] == 1
+    assert stats['hits'] == 1 and stats['hit_rate'] == 1.0 and stats['pending'] == 0
+    print("✅ Displayed cues are skipped and hits are counted once")
+
+
+def test_queue_is_bounded():
+    prefetcher, _ = make_prefetcher()
+    prefetcher.max_pending = 2
+    result = prefetcher.submit([{'text': f'line {i}'} for i in range(5)])
+    assert result == {'queued': 2, 'cached': 0, 'dropped': 3}
+
+
+def test_fallback_decisions_are_not_stored():
+    prefetcher, stored = make_prefetcher()
+    prefetcher.submit([{'text': 'boom, shed under load', 'start_time': 70}], playback_time=60)
+    assert prefetcher.run_one(*prefetcher._next_cue()) == 'YES'
+    assert stored == {} and prefetcher.stats()['uncacheable'] == 1
+    assert not prefetcher.record_lookup('boom, shed under load')
+
+
+def test_shed_or_failed_prefetch_leaves_cache_empty():
+    print("🧪 Testing that fallback prefetch answers aren't cached...")
+    import app
+
+    fake_client = unittest.mock.MagicMock()
+    fake_client.chat.completions.create.side_effect = TimeoutError("gateway timed out")
+    cue_text = "prefetch fallback [explosion] ahead"
+    with unittest.mock.patch.dict('os.environ', {'TRUEFOUNDRY_API_KEY': 'test-key'}), \
+            unittest.mock.patch('app.get_truefoundry_client', return_value=fake_client), \
+            unittest.mock.patch('app.local_classifier_model', None):
+        # Bulk work shed under load
+        with unittest.mock.patch.object(app.backend_scheduler, 'acquire', return_value=False):
+            assert app.prefetcher.run_one(time.time() + 300, cue_text, 330) == 'YES'
+        assert app.decision_cache.get_cached_decision(cue_text) is None
+
+        # The LLM call fails
+        assert app.prefetcher.run_one(time.time() + 300, cue_text, 330) == 'NO'
+        assert fake_client.chat.completions.create.called
+        assert app.decision_cache.get_cached_decision(cue_text) is None
+    print("✅ Shed and failed prefetches leave the cue to the display-time /data call")
+
+
+def test_prefetched_caption_is_a_cache_hit():
+    print("🧪 Testing /prefetch end to end...")
+    import app
+
+    cue_text = "prefetch test [explosion] ahead"
+    with unittest.mock.patch('app.get_truefoundry_client', return_value=None):
+        with app.app.test_client() as client:
+            response = client.post('/prefetch', json={
+                "playback_time": 60.0,
+                "cues": [{"text": cue_text, "start_time": 64.0}]
+            })
+            assert response.status_code == 202 and response.get_json()['queued'] == 1
+
+            deadline = time.time() + 5
+            while app.decision_cache.get_cached_decision(cue_text) is None and time.time() < deadline:
+                time.sleep(0.01)
+            hits_before = app.prefetcher.stats()['hits']
+
+            with unittest.mock.patch('app.matches_loud_event_rules') as rules:
+                result = client.post('/data', json={"text": cue_text}).get_json()
+            assert result['action'] == 'LOWER_VOLUME'
+            rules.assert_not_called()
+            assert app.prefetcher.stats()['hits'] == hits_before + 1
+
+            assert client.post('/prefetch', json={"cues": "nope"}).status_code == 400
+    print("✅ The display-time /data call is answered from the prefetched decision")
+
+
+if __name__ == "__main__":
+    test_cues_are_classified_earliest_first_with_long_ttl()
+    test_hit_rate_and_stale_cues()
+    test_queue_is_bounded()
+    test_fallback_decisions_are_not_stored()
+    test_shed_or_failed_prefetch_leaves_cache_empty()
+    test_prefetched_caption_is_a_cache_hit()
+    print("\n🎉 Prefetch tests passed!")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tests for the production launcher and the shared cache tier
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+import shared_cache
+
+
+def find_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_launcher(port, *extra_args):
+    env = {k: v for k, v in os.environ.items() if not k.startswith('TRUEFOUNDRY_')}
+    return subprocess.Popen(
+        [sys.executable, 'start_production.py', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', '2', '--graceful-timeout', '5', *extra_args],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_for_health(base_url):
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.1)
+    return False
+
+
+def test_shared_store_expiry_and_eviction():
+    """Entries expire after their TTL and the oldest are evicted when full"""
+    print("🧪 Testing shared store semantics...")
+    store = shared_cache.SharedStore(max_entries=2)
+
+    store.set('subtitle', 'a', 'YES', 30)
+    value, stored_at = store.get('subtitle', 'a')
+    assert value == 'YES'
+    assert stored_at <= time.time()
+    assert store.get('audio', 'a') is None
+    print("✅ Namespaced get/set works")
+
+    store.set('subtitle', 'expired', 'NO', 0)
+    assert store.get('subtitle', 'expired') is None
+    print("✅ Expired entries are dropped")
+
+    store.set('subtitle', 'b', 'NO', 30)
+    store.set('subtitle', 'c', 'NO', 30)
+    assert store.get('subtitle', 'a') is None
+    assert store.stats()['entries'] == 2
+    print("✅ Oldest entries are evicted at capacity")
+
+
+def test_decision_cache_shares_across_processes():
+    """A decision cached through one connection is a hit through another"""
+    print("🧪 Testing decision sharing through the cache server...")
+    from app import DecisionCache
+    from cache_backends import create_backend
+
+    manager, address, authkey = shared_cache.start_cache_server()
+    try:
+        worker_a = DecisionCache(ttl_seconds=30, backend=create_backend(
+            'shared', shared_store=shared_cache.connect_shared_store(address, authkey)))
+        worker_b = DecisionCache(ttl_seconds=30, backend=create_backend(
+            'shared', shared_store=shared_cache.connect_shared_store(address, authkey)))
+
+        assert worker_b.get_cached_decision("[explosion]") is None
+        worker_a.cache_decision("[explosion]", 'YES')
+        assert worker_b.get_cached_decision("[explosion]") == 'YES'
+        print("✅ Worker B hits on worker A's decision")
+    finally:
+        manager.shutdown()
+
+
+def test_store_client_reuses_connections():
+    """Request threads borrow pooled connections instead of each opening one"""
+    print("🧪 Testing pooled shared cache connections...")
+    manager, address, authkey = shared_cache.start_cache_server()
+    try:
+        client = shared_cache.connect_shared_store(address, authkey, pool_size=4)
+        # One short-lived thread per request, like the threaded dev server
+        for i in range(20):
+            thread = threading.Thread(target=client.set, args=('subtitle', f"k{i}", 'YES', 30))
+            thread.start()
+            thread.join()
+        assert client.connects == 1
+        assert client.get_many('subtitle', ['k0', 'k19', 'missing']).keys() == {'k0', 'k19'}
+
+        barrier = threading.Barrier(8)
+        def burst():
+            barrier.wait()
+            for _ in range(20):
+                assert client.get('subtitle', 'k3')[0] == 'YES'
+        threads = [threading.Thread(target=burst) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert client.connects <= 8 and len(client.idle) <= 4
+        client.close()
+        print("✅ Connections are authenticated once and reused across threads")
+    finally:
+        manager.shutdown()
+
+
+def test_launcher_serves_and_reloads():
+    """The launcher serves from several workers and survives a graceful reload"""
+    print("🧪 Testing production launcher...")
+    port = find_free_port()
+    process = start_launcher(port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        assert wait_for_health(base_url)
+        response = requests.post(f"{base_url}/data", json={"text": "[explosion]"}, timeout=5)
+        assert response.json()['action'] == 'LOWER_VOLUME'
+        print("✅ Workers serve requests")
+
+        process.send_signal(signal.SIGHUP)
+        time.sleep(0.5)
+        assert wait_for_health(base_url)
+        assert process.poll() is None
+        print("✅ Graceful reload keeps serving")
+    finally:
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=20) == 0
+        print("✅ Launcher drains and stops cleanly")
+
+
+def test_launcher_routes_sessions():
+    """With --route-sessions a session's requests all reach the same worker, across reloads"""
+    print("🧪 Testing session-routed launcher...")
+    port = find_free_port()
+    process = start_launcher(port, '--route-sessions')
+    base_url = f"http://127.0.0.1:{port}"
+
+    def levels(session_id):
+        return requests.post(f"{base_url}/audio-levels", timeout=5,
+                             json={'session_id': session_id, 'levels': [0.2] * 5}).json()
+
+    try:
+        assert wait_for_health(base_url)
+        stats = requests.get(f"{base_url}/router/stats", timeout=5).json()
+        assert len(stats['backends']) == 2
+        for _ in range(3):
+            assert levels('routed-tab')['phase'] == 'idle'
+        served = requests.get(f"{base_url}/router/stats", timeout=5).json()['backends']
+        # All three went to the worker the session hashes to
+        assert sorted(backend['requests'] for backend in served.values())[-1] >= 3
+        print("✅ Requests reach workers through the router")
+
+        process.send_signal(signal.SIGHUP)
+        time.sleep(0.5)
+        assert wait_for_health(base_url)
+        after = requests.get(f"{base_url}/router/stats", timeout=5).json()
+        # Reloaded workers take over the same slots, so the ring is unchanged
+        assert set(after['backends']) == set(stats['backends'])
+        assert all(backend['up'] for backend in after['backends'].values())
+        print("✅ Reloads keep every session's place on the ring")
+    finally:
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=20) == 0
+        print("✅ Routed launcher drains and stops cleanly")
+
+
+if __name__ == "__main__":
+    test_shared_store_expiry_and_eviction()
+    test_decision_cache_shares_across_processes()
+    test_store_client_reuses_connections()
+    test_launcher_serves_and_reloads()
+    test_launcher_routes_sessions()
+    print("\n🎉 Production launcher tests passed!")
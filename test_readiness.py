@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for background readiness probes and the /livez and /readyz endpoints
+"""
+import json
+import unittest.mock
+
+from readiness import ReadinessMonitor
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_critical_and_degraded_probes():
+    print("🧪 Testing readiness from probe results...")
+    state = {'queue_ok': True, 'cache_ok': True}
+
+    def queues():
+        if not state['queue_ok']:
+            raise RuntimeError("housekeeping is not running")
+        return {'depth': 3}
+
+    def cache():
+        if not state['cache_ok']:
+            raise ConnectionError("redis unreachable")
+        return {'entries': 10}
+
+    monitor = ReadinessMonitor(clock=FakeClock())
+    monitor.register('queues', queues, critical=True)
+    monitor.register('cache', cache)
+    body, status = monitor.response()
+    assert status == 503 and json.loads(body)['status'] == 'starting'
+
+    monitor.run_round()
+    body, status = monitor.response()
+    data = json.loads(body)
+    assert status == 200 and data['status'] == 'ready'
+    assert data['checks']['queues']['details'] == {'depth': 3}
+
+    state['cache_ok'] = False
+    monitor.run_round()
+    body, status = monitor.response()
+    data = json.loads(body)
+    assert status == 200 and data['status'] == 'degraded'
+    assert 'redis unreachable' in data['checks']['cache']['error']
+
+    state['queue_ok'] = False
+    monitor.run_round()
+    body, status = monitor.response()
+    assert status == 503 and json.loads(body)['status'] == 'not_ready'
+    print("✅ Critical failures make the service unready, others degrade it")
+
+
+def test_circuit_and_staleness():
+    print("🧪 Testing probe circuits and stale results...")
+    clock = FakeClock()
+    calls = {'count': 0, 'fail': True}
+
+    def gateway():
+        calls['count'] += 1
+        if calls['fail']:
+            raise TimeoutError("gateway timed out")
+        return {}
+
+    monitor = ReadinessMonitor(stale_after=30, open_after=3, clock=clock)
+    monitor.register('llm_gateway', gateway)
+    circuits = []
+    for _ in range(3):
+        monitor.run_round()
+        circuits.append(monitor.results['llm_gateway'].circuit)
+    calls['fail'] = False
+    for _ in range(2):
+        monitor.run_round()
+        circuits.append(monitor.results['llm_gateway'].circuit)
+    assert circuits == ['closed', 'closed', 'open', 'half_open', 'closed']
+
+    # Serving the response never runs a probe
+    for _ in range(100):
+        monitor.response()
+    assert calls['count'] == 5
+
+    clock.now += 31
+    body, status = monitor.response()
+    assert status == 503 and json.loads(body)['stale'] is True
+    print("✅ Repeated failures open the circuit and a stalled prober stops readiness")
+
+
+def test_liveness_and_readiness_endpoints():
+    print("🧪 Testing /livez and /readyz...")
+    import app
+
+    with app.app.test_client() as client:
+        with unittest.mock.patch.object(app.logger, 'info') as info, \
+                unittest.mock.patch.object(app.statsd, 'client', unittest.mock.Mock()) as metrics:
+            for _ in range(5):
+                response = client.get('/livez')
+                assert response.status_code == 200 and response.get_json() == {'status': 'alive'}
+            assert not info.called and not metrics.method_calls
+
+        app.readiness.run_round()
+        response = client.get('/readyz')
+        data = response.get_json()
+        assert set(data['checks']) == {'llm_gateway', 'decision_cache', 'metrics', 'queues'}
+        assert data['checks']['decision_cache']['ok'] is True
+        # Ready exactly when the critical queue probe passes
+        assert (response.status_code == 200) == data['checks']['queues']['ok']
+        # The background prober may have finished another round since
+        assert client.get('/health').get_json()['readiness']['rounds'] >= data['rounds']
+    print("✅ Liveness is free and readiness serves the last probe round")
+
+
+if __name__ == "__main__":
+    test_critical_and_degraded_probes()
+    test_circuit_and_staleness()
+    test_liveness_and_readiness_endpoints()
+    print("\n🎉 Readiness tests passed!")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for fast-path response encoding and the cached response templates
+"""
+import importlib.util
+import json
+import sys
+import unittest.mock
+
+import response_encoding
+from response_encoding import ResponseTemplate, Slot, dumps
+
+
+def test_templates_match_plain_encoding():
+    print("🧪 Testing template bodies against plain encoding...")
+    template = ResponseTemplate({"action": "NONE", "confidence": Slot('confidence'),
+                                 "nested": {"phase": Slot('phase'), "list": [1, Slot('extra')]}})
+    for values in ({'confidence': 0.35, 'phase': 'idle', 'extra': None},
+                   {'confidence': 'NO', 'phase': 'quote " and \\ and ☃', 'extra': [1, 2]},
+                   {'confidence': 1, 'phase': None, 'extra': True}):
+        body = template.render(**values)
+        assert json.loads(body) == template.to_dict(**values)
+        assert body == dumps(template.to_dict(**values))
+
+    # Equal values of different types are cached separately
+    assert json.loads(template.render(confidence=1, phase='a', extra=1))['nested']['list'] == [1, 1]
+    assert json.loads(template.render(confidence=1, phase='a', extra=True))['nested']['list'] == [1, True]
+    assert json.loads(template.render(confidence=1, phase='a', extra=1.0))['nested']['list'][1] == 1.0
+
+    constant = ResponseTemplate({"action": "LOWER_VOLUME", "level": 0.3, "duration": 5000})
+    assert constant.render() is constant.constant and not constant.bodies
+
+    bounded = ResponseTemplate({"text": Slot('text')}, max_cached=3)
+    for i in range(10):
+        assert json.loads(bounded.render(text=f"line {i}")) == {"text": f"line {i}"}
+    assert len(bounded.bodies) == 3
+    uncached = ResponseTemplate({"text": Slot('text')}, max_cached=0)
+    assert uncached.render(text="line") == dumps({"text": "line"}) and not uncached.bodies
+    print("✅ Cached bodies are the same JSON as encoding the filled-in shape")
+
+
+def test_stdlib_fallback():
+    print("🧪 Testing the encoder without orjson...")
+    # A separate copy of the module, so the app's templates keep the real one
+    spec = importlib.util.spec_from_file_location('response_encoding_fallback', response_encoding.__file__)
+    fallback = importlib.util.module_from_spec(spec)
+    with unittest.mock.patch.dict(sys.modules, {'orjson': None}):
+        spec.loader.exec_module(fallback)
+    assert fallback.ENCODER == 'json'
+    body = fallback.dumps({"text": "café ☃", "level": 0.3, "ok": True})
+    assert isinstance(body, bytes) and json.loads(body) == {"text": "café ☃", "level": 0.3, "ok": True}
+    assert b' ' not in fallback.dumps({"a": [1, 2]})
+    template = fallback.ResponseTemplate({"confidence": fallback.Slot('confidence')})
+    assert json.loads(template.render(confidence=0.9)) == {"confidence": 0.9}
+    print("✅ Responses stay compact JSON with the standard library encoder")
+
+
+def test_endpoints_use_fast_path():
+    print("🧪 Testing fast-path responses and the subtitle echo opt-out...")
+    import app
+    from event_feed import EventFeed
+
+    app.event_feed = EventFeed()
+    with app.app.test_client() as client, \
+            unittest.mock.patch.object(app, 'analyze_subtitle_for_loud_events', return_value='YES'):
+        echoed = client.post('/data', json={'text': "[EXPLOSION]", 'client_id': 'enc-tab'})
+        assert echoed.mimetype == 'application/json'
+        assert echoed.get_json() == {"action": "LOWER_VOLUME", "level": 0.3, "duration": 5000,
+                                     "confidence": "YES", "subtitle_text": "[EXPLOSION]", "processed": True}
+        quiet = client.post('/data', json={'text': "[EXPLOSION]", 'client_id': 'enc-tab', 'echo_text': False})
+        assert 'subtitle_text' not in quiet.get_json() and quiet.get_json()['processed'] is True
+        assert quiet.get_data() == app.SUBTITLE_DUCK_NO_ECHO.constant
+        # Client-supplied text is encoded per request, never kept in a template cache
+        for i in range(5):
+            client.post('/data', json={'text': f"[DOOR SLAMS {i}]", 'client_id': 'enc-tab'})
+        assert not app.SUBTITLE_DUCK.bodies and not app.SUBTITLE_NONE.bodies
+
+        with unittest.mock.patch.object(app, 'ECHO_SUBTITLE_TEXT', False):
+            assert 'subtitle_text' not in client.post('/data', json={'text': "hi", 'client_id': 'enc-tab'}).get_json()
+            opted_in = client.post('/data', json={'text': "hi", 'client_id': 'enc-tab', 'echo_text': True})
+            assert opted_in.get_json()['subtitle_text'] == "hi"
+
+        quiet_audio = client.post('/audio-data', json={'volume': 0.3, 'baseline': 0.3, 'spike': 0.0,
+                                                       'client_id': 'enc-tab'})
+        assert quiet_audio.get_json()['action'] == 'NONE'
+        assert quiet_audio.get_json()['trigger'] == 'audio_analysis'
+        loud_audio = client.post('/audio-data', json={'volume': 0.95, 'baseline': 0.2, 'spike': 0.75,
+                                                      'client_id': 'enc-tab'}).get_json()
+        assert loud_audio['action'] == 'LOWER_VOLUME'
+        assert loud_audio['volume_data'] == {'current': 0.95, 'baseline': 0.2, 'spike': 0.75}
+
+        # The hook reads decisions from the handler, not by parsing the response, and
+        # without a journal it doesn't rebuild templated bodies as dicts either
+        with unittest.mock.patch('flask.Response.get_json', side_effect=AssertionError("parsed")), \
+                unittest.mock.patch.object(ResponseTemplate, 'to_dict', side_effect=AssertionError("rebuilt")), \
+                unittest.mock.patch.object(app, 'traffic_journal', None):
+            client.post('/audio-levels', json={'session_id': 'enc-tab', 'levels': [0.2, 0.2],
+                                               'client_id': 'enc-tab'})
+            client.post('/data', json={'text': "[DOOR CREAKS]", 'client_id': 'enc-tab'})
+        events = client.get('/events?client_id=enc-tab').get_json()['events']
+        assert [event['action'] for event in events] == \
+            ['LOWER_VOLUME'] * 9 + ['NONE', 'LOWER_VOLUME', 'NONE', 'LOWER_VOLUME']
+        assert events[-2]['endpoint'] == '/audio-levels' and events[-2]['path']
+        assert events[-1]['endpoint'] == '/data' and events[-1]['confidence'] == 'YES'
+    print("✅ Hot endpoints answer through the fast encoder and omit the echo on request")
+
+
+if __name__ == "__main__":
+    test_templates_match_plain_encoding()
+    test_stdlib_fallback()
+    test_endpoints_use_fast_path()
+    print("\n🎉 Response encoding tests passed!")
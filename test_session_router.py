@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for the consistent-hash session router
+"""
+import json
+import socketserver
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+from session_router import HashRing, SessionRouter, routing_key
+
+
+def test_ring_rebalances_minimally():
+    print("🧪 Testing consistent hash rebalancing...")
+    keys = [f"video-{i}" for i in range(20000)]
+    ring = HashRing([f"worker-{i}" for i in range(4)])
+    before = {key: ring.lookup(key)[0] for key in keys}
+    shares = ring.shares()
+    assert abs(sum(shares.values()) - 1.0) < 1e-9
+    assert all(0.15 < share < 0.35 for share in shares.values())
+
+    ring.add('worker-4')
+    after = {key: ring.lookup(key)[0] for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    # Only keys taken over by the new worker move, about 1/5 of them
+    assert all(after[key] == 'worker-4' for key in moved)
+    assert 0.12 < len(moved) / len(keys) < 0.28
+
+    ring.remove('worker-2')
+    final = {key: ring.lookup(key)[0] for key in keys}
+    assert all(final[key] == after[key] for key in keys if after[key] != 'worker-2')
+    assert 'worker-2' not in final.values()
+    assert len(set(ring.lookup('video-1', count=3))) == 3
+    print("✅ Membership changes only move the keys of the changed worker")
+
+
+def test_routing_key_extraction():
+    print("🧪 Testing routing key extraction...")
+    assert routing_key(b'{"session_id": "tab-1", "video_id": "abc"}', '', {}, '10.0.0.1') == 'abc'
+    assert routing_key(b'{"tab_id": 17, "volume": 0.9}', '', {}, '10.0.0.1') == '17'
+    # A key quoted inside another string isn't a field
+    assert routing_key(b'{"text": "say \\"video_id\\": \\"x\\"", "session_id": "s"}', '', {}, '') == 's'
+    assert routing_key(b'', 'client_id=tab-4&since=3', {}, '10.0.0.1') == 'tab-4'
+    assert routing_key(b'{}', '', {'X-Crest-Client-Id': 'ext'}, '10.0.0.1') == 'ext'
+    assert routing_key(b'{}', '', {}, '10.0.0.1') == '10.0.0.1'
+    print("✅ Requests route by video, then session, tab or client id")
+
+
+def start_backend(name):
+    """A tiny backend answering with its name and the session it saw"""
+    def wsgi(environ, start_response):
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = json.loads(environ['wsgi.input'].read(length) or b'{}')
+        payload = json.dumps({'backend': name, 'session_id': body.get('session_id'),
+                              'forwarded_for': environ.get('HTTP_X_FORWARDED_FOR')}).encode()
+        start_response('200 OK', [('Content-Type', 'application/json'), ('Content-Length', str(len(payload)))])
+        return [payload]
+    server = make_server('127.0.0.1', 0, wsgi, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_raw_backend(answer):
+    """A backend that reads one request per connection, then answers it (or not) and closes"""
+    received = []
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request_line = self.rfile.readline().decode().strip()
+            length = 0
+            for line in iter(self.rfile.readline, b'\r\n'):
+                name, _, value = line.decode().partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            self.rfile.read(length)
+            received.append(request_line)
+            if answer:
+                # No "Connection: close", so the router keeps the socket it then finds closed
+                self.wfile.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                                 b'Content-Length: 2\r\n\r\n{}')
+
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+def test_lost_responses_are_not_replayed():
+    print("🧪 Testing retries after a lost response...")
+    closing, closing_received = start_raw_backend(answer=True)
+    router = SessionRouter([f"http://127.0.0.1:{closing.server_address[1]}"], timeout=5.0)
+    front = make_server('127.0.0.1', 0, router, threaded=True)
+    threading.Thread(target=front.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{front.server_port}"
+    try:
+        # A kept-alive connection the backend closed while idle is replaced before sending
+        for _ in range(3):
+            assert requests.post(f"{url}/data", json={'session_id': 'tab-1'}).status_code == 200
+            time.sleep(0.05)
+        assert len(closing_received) == 3
+    finally:
+        front.shutdown()
+        closing.shutdown()
+
+    dropping = [start_raw_backend(answer=False) for _ in range(2)]
+    router = SessionRouter([f"http://127.0.0.1:{server.server_address[1]}" for server, _ in dropping],
+                           timeout=5.0)
+    front = make_server('127.0.0.1', 0, router, threaded=True)
+    threading.Thread(target=front.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{front.server_port}"
+    try:
+        # The backend may have acted on the POST: it is neither retried nor failed over
+        response = requests.post(f"{url}/data", json={'session_id': 'tab-1', 'text': '[BOOM]'})
+        assert response.status_code == 502
+        assert sum(len(received) for _, received in dropping) == 1
+        # An idempotent GET is sent again
+        assert requests.get(f"{url}/events?client_id=tab-1").status_code == 502
+        assert sum(len(received) for _, received in dropping) > 2
+    finally:
+        front.shutdown()
+        for server, _ in dropping:
+            server.shutdown()
+    print("✅ Only requests that never arrived, or idempotent ones, are sent again")
+
+
+def test_router_keeps_sessions_on_one_backend():
+    print("🧪 Testing session affinity and failover...")
+    backends = [start_backend(f"b{i}") for i in range(3)]
+    router = SessionRouter([f"http://127.0.0.1:{server.server_port}" for server in backends],
+                           eject_after=1, timeout=5.0)
+    front = make_server('127.0.0.1', 0, router, threaded=True)
+    threading.Thread(target=front.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{front.server_port}"
+    try:
+        with requests.Session() as session:
+            placement = {}
+            for i in range(30):
+                for _ in range(3):
+                    data = session.post(f"{url}/audio-levels", json={'session_id': f"tab-{i}"}).json()
+                    assert data['session_id'] == f"tab-{i}" and data['forwarded_for'] == '127.0.0.1'
+                    assert placement.setdefault(i, data['backend']) == data['backend']
+            assert len(set(placement.values())) == 3
+
+            # A stopped backend is ejected; its sessions fail over, the others stay put
+            dead = backends[0]
+            dead_name = f"127.0.0.1:{dead.server_port}"
+            dead.shutdown()
+            dead.server_close()
+            for i in range(30):
+                data = session.post(f"{url}/audio-levels", json={'session_id': f"tab-{i}"}).json()
+                assert data['backend'] != 'b0'
+                if placement[i] != 'b0':
+                    assert data['backend'] == placement[i]
+
+            stats = session.get(f"{url}/router/stats").json()['backends']
+            assert stats[dead_name]['up'] is False and stats[dead_name]['ring_share'] == 0
+            assert sum(entry['requests'] for entry in stats.values()) == 120
+            assert sum(entry['failovers_in'] for entry in stats.values()) >= 1
+    finally:
+        front.shutdown()
+        for server in backends[1:]:
+            server.shutdown()
+    print("✅ Sessions stick to one backend and fail over when it goes away")
+
+
+if __name__ == "__main__":
+    test_ring_rebalances_minimally()
+    test_routing_key_extraction()
+    test_router_keeps_sessions_on_one_backend()
+    test_lost_responses_are_not_replayed()
+    print("\n🎉 Session router tests passed!")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-bounded compact session store
+"""
+from onset_detector import OnsetDetector
+from session_store import CompactSessionStore
+
+FIELDS = {'level': 'd', 'count': 'i'}
+
+
+def test_lru_eviction_at_capacity():
+    print("🧪 Testing LRU eviction at capacity...")
+    store = CompactSessionStore(FIELDS, capacity=3)
+    for i, session_id in enumerate(('a', 'b', 'c')):
+        slot, created = store.acquire(session_id, now=i)
+        assert created
+        store.columns['level'][slot] = i + 0.5
+    # Using 'a' again makes 'b' the least recently used
+    slot, created = store.acquire('a', now=3)
+    assert not created and store.columns['level'][slot] == 0.5
+
+    slot, created = store.acquire('d', now=4)
+    assert created and store.find('b') is None
+    assert store.columns['level'][slot] == 0 and store.columns['count'][slot] == 0
+    assert len(store) == 3 and store.stats()['evictions'] == 1
+    print("✅ The least recently used session makes room, and its slot starts zeroed")
+
+
+def test_slots_are_reused_and_expired():
+    print("🧪 Testing slot reuse and expiry...")
+    store = CompactSessionStore(FIELDS, capacity=4)
+    slots = {session_id: store.acquire(session_id, now=10)[0] for session_id in 'abcd'}
+    assert sorted(slots.values()) == [0, 1, 2, 3]
+    assert store.remove('b') and not store.remove('b')
+    assert store.acquire('e', now=11)[0] == slots['b']
+    assert store.stats()['evictions'] == 0
+
+    store.acquire('a', now=20)
+    assert store.expire(cutoff=15, max_items=2) == (2, True)
+    assert store.expire(cutoff=15, max_items=2) == (1, False)
+    assert len(store) == 1 and store.find('a') is not None
+    print("✅ Freed slots are reused and idle sessions expire oldest first")
+
+
+def test_memory_is_bounded_by_budget():
+    print("🧪 Testing memory accounting...")
+    budget = 256 * 1024
+    store = CompactSessionStore(FIELDS, max_bytes=budget)
+    assert store.capacity == budget // store.bytes_per_session
+    for i in range(store.capacity * 3):
+        store.acquire(f"tab-{i:06d}", now=i)
+    stats = store.stats()
+    assert stats['sessions'] == store.capacity
+    assert stats['evictions'] == store.capacity * 2
+    assert stats['memory_bytes'] <= stats['max_bytes'] <= budget
+
+    try:
+        CompactSessionStore(FIELDS)
+        assert False, "a store needs a capacity or a budget"
+    except ValueError:
+        pass
+    print("✅ Session count and memory stay within the budget")
+
+
+def test_onset_detector_stays_within_budget():
+    print("🧪 Testing onset detector memory budget...")
+    detector = OnsetDetector(max_bytes=64 * 1024, shards=4)
+    for i in range(5000):
+        detector.process(f"tab-{i}", [0.2, 0.2])
+    stats = detector.stats()
+    assert stats['sessions'] == stats['capacity'] < 5000
+    assert stats['evictions'] == 5000 - stats['capacity']
+    assert stats['memory_bytes'] <= stats['max_bytes'] <= 64 * 1024
+    # State survives the round trip through the columns
+    detector.process('tab-4999', [0.2] * 10)
+    assert detector.process('tab-4999', [0.9, 0.9, 0.4])
+    assert detector.phase('tab-0') is None
+    print("✅ Evicted sessions start over while recent ones keep their state")
+
+
+if __name__ == "__main__":
+    test_lru_eviction_at_capacity()
+    test_slots_are_reused_and_expired()
+    test_memory_is_bounded_by_budget()
+    test_onset_detector_stays_within_budget()
+    print("\n🎉 Session store tests passed!")
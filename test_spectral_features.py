@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for spectral transient detection and the /audio-spectrum endpoint
+"""
+import numpy as np
+
+from spectral_features import SpectrumError, classify_spectrum, spectral_features, to_frames
+
+BINS = 128
+
+
+def music_frames(count=12, level=70, swell=0.0, seed=1):
+    """Tonal frames: a few strong harmonics over a low floor, optionally swelling"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        frame = np.full(BINS, 15.0) + rng.uniform(0, 5, BINS)
+        gain = 1 + swell * i / count
+        for harmonic in (4, 8, 12, 16, 24):
+            frame[harmonic] = min(255, level * 2.5 * gain)
+            frame[harmonic + 1] = min(255, level * 1.5 * gain)
+        frames.append(frame.round().tolist())
+    return frames
+
+
+def explosion_frame(seed=2):
+    """Broadband burst, heaviest in the low end"""
+    rng = np.random.default_rng(seed)
+    frame = rng.uniform(170, 220, BINS)
+    frame[:6] = 250
+    return frame.round().tolist()
+
+
+def test_transient_is_detected():
+    print("🧪 Testing transient detection...")
+    frames = to_frames(music_frames(11) + [explosion_frame()])
+    features = spectral_features(frames)
+    assert features['onset_frame'] == 11
+    assert features['energy_jump'] > 0.3 and features['spectral_crest'] < 2
+    assert features['low_band_gain'] > 2
+    decision, confidence, kind = classify_spectrum(features)
+    assert (decision, kind) == ('YES', 'transient') and confidence > 0.8
+    print("✅ A broadband burst after music is a transient")
+
+
+def test_sustained_music_is_not():
+    print("🧪 Testing sustained and swelling music...")
+    steady = classify_spectrum(spectral_features(to_frames(music_frames(12, level=90))))
+    assert steady[0] == 'NO' and steady[2] == 'quiet'
+    # A big but gradual swell has the energy jump without a sharp onset
+    features = spectral_features(to_frames(music_frames(12, level=40, swell=4)))
+    assert features['energy_jump'] > 0.12 and features['flux_contrast'] < 2
+    assert classify_spectrum(features)[::2] == ('NO', 'sustained')
+    print("✅ Steady and gradually swelling music stays below the transient rule")
+
+
+def test_invalid_frames_are_rejected():
+    print("🧪 Testing frame validation...")
+    for bad in (None, [], [[1, 2, 3]], [[0] * BINS, [0] * 64], [[300] * BINS], [[0] * BINS] * 65):
+        try:
+            to_frames(bad)
+            assert False, f"expected SpectrumError for {str(bad)[:40]}"
+        except SpectrumError:
+            pass
+    print("✅ Ragged, out-of-range and oversized batches raise SpectrumError")
+
+
+def test_spectrum_endpoint():
+    print("🧪 Testing /audio-spectrum endpoint...")
+    import app
+
+    with app.app.test_client() as client:
+        response = client.post('/audio-spectrum', json={
+            'frames': music_frames(11) + [explosion_frame()], 'session_id': 'spectrum-tab'
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['action'] == 'LOWER_VOLUME' and data['trigger'] == 'spectral_analysis'
+        assert data['kind'] == 'transient' and data['features']['onset_frame'] == 11
+
+        # The next spike lands inside the duck window just opened
+        response = client.post('/audio-spectrum', json={
+            'frames': music_frames(11) + [explosion_frame(3)], 'session_id': 'spectrum-tab'
+        })
+        assert response.get_json()['trigger'].startswith('audio_window')
+
+        response = client.post('/audio-spectrum', json={'frames': music_frames(12)})
+        assert response.get_json()['action'] == 'NONE'
+        assert client.post('/audio-spectrum', json={'frames': [[1, 2]]}).status_code == 400
+    print("✅ Spectral decisions duck without any LLM call")
+
+
+if __name__ == "__main__":
+    test_transient_is_detected()
+    test_sustained_music_is_not()
+    test_invalid_frames_are_rejected()
+    test_spectrum_endpoint()
+    print("\n🎉 Spectral feature tests passed!")
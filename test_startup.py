@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for fast startup: deferred imports and background initialization
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from bench_import_time import measure_import
+
+
+def test_import_defers_heavy_dependencies():
+    """Importing app must not load openai, datadog or the shared cache client"""
+    print("🧪 Testing deferred imports...")
+    samples, eager = measure_import(runs=1)
+    assert eager == [], f"imported eagerly: {eager}"
+    print(f"✅ app imported in {samples[0]:.0f} ms with heavy dependencies deferred")
+
+
+def test_metrics_buffer_until_datadog_attaches():
+    """Metrics sent before Datadog loads are replayed, not lost"""
+    print("🧪 Testing deferred statsd...")
+    import app
+
+    class RecordingStatsd:
+        def __init__(self):
+            self.calls = []
+
+        def increment(self, metric, tags=None):
+            self.calls.append((metric, tags))
+
+    deferred = app.DeferredStatsd()
+    deferred.buffer.append(('increment', ('crest.test.early',), {'tags': ['a:b']}))
+    recorder = RecordingStatsd()
+    deferred.attach(recorder)
+    deferred.increment('crest.test.late')
+    assert recorder.calls == [('crest.test.early', ['a:b']), ('crest.test.late', None)]
+    print("✅ Buffered metrics are replayed in order")
+
+
+def test_first_request_starts_background_work():
+    """Metrics don't start the background work; the first request does, once per process"""
+    print("🧪 Testing that the first request starts background work...")
+    probe = (
+        "import json, os, threading\n"
+        "import app\n"
+        "app.statsd.increment('crest.test.early')\n"
+        "report = {'before': {'started': app.startup_state['started'], 'threads': threading.active_count(),\n"
+        "                     'buffered': len(app.statsd.buffer)}}\n"
+        "def state():\n"
+        "    return {'pid': app.startup_state['pid'] == os.getpid(),\n"
+        "            'housekeeping': app.housekeeping.thread.is_alive(),\n"
+        "            'readiness': app.readiness.thread.is_alive()}\n"
+        "with app.app.test_client() as client:\n"
+        "    client.get('/health')\n"
+        "    report['after'] = state()\n"
+        "    read_end, write_end = os.pipe()\n"
+        "    child = os.fork()\n"
+        "    if child == 0:\n"
+        "        # A forked worker inherits the started flag but none of the threads\n"
+        "        client.get('/health')\n"
+        "        os.write(write_end, json.dumps(state()).encode())\n"
+        "        os._exit(0)\n"
+        "    os.close(write_end)\n"
+        "    report['child'] = json.loads(os.read(read_end, 4096))\n"
+        "    os.waitpid(child, 0)\n"
+        "print(json.dumps(report))\n"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = {k: v for k, v in os.environ.items() if not k.startswith('CREST_SHARED_CACHE')}
+    result = subprocess.run([sys.executable, '-c', probe], cwd=here, env=env,
+                            capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report['before']['started'] is False and report['before']['threads'] == 1, report
+    assert report['before']['buffered'] >= 1
+    assert report['after'] == {'pid': True, 'housekeeping': True, 'readiness': True}, report
+    assert report['child'] == {'pid': True, 'housekeeping': True, 'readiness': True}, report
+    print("✅ Any WSGI host gets housekeeping and readiness probes, forked workers included")
+
+
+def test_onset_detector_is_built_on_first_use():
+    """The session store's buffers aren't allocated until /audio-levels needs them"""
+    print("🧪 Testing lazy onset detector...")
+    probe = (
+        "import json\n"
+        "import app\n"
+        "built = [app.onset_detector is not None]\n"
+        "with app.app.test_client() as client:\n"
+        "    client.get('/health')\n"
+        "    built.append(app.onset_detector is not None)\n"
+        "    client.post('/audio-levels', json={'session_id': 'tab', 'levels': [0.2, 0.2]})\n"
+        "    built.append(app.onset_detector is not None)\n"
+        "print(json.dumps({'built': built, 'sessions': app.onset_detector.stats()['sessions']}))\n"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = {k: v for k, v in os.environ.items() if not k.startswith('CREST_SHARED_CACHE')}
+    result = subprocess.run([sys.executable, '-c', probe], cwd=here, env=env,
+                            capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report == {'built': [False, False, True], 'sessions': 1}, report
+    print("✅ Workers that never serve /audio-levels don't allocate session memory")
+
+
+def test_background_initialization_completes():
+    """Once started, /health reports initialization as completed"""
+    print("🧪 Testing background initialization...")
+    import app
+
+    app.start_background_initialization()
+    deadline = time.time() + 30
+    while app.startup_state['background_init_ms'] is None and time.time() < deadline:
+        time.sleep(0.05)
+    assert app.startup_state['statsd_ready']
+    assert 'datadog' in sys.modules
+    with app.app.test_client() as client:
+        startup = client.get('/health').get_json()['startup']
+    assert startup['started'] is True and startup['completed'] is True
+    print("✅ Background initialization completes and is reported by /health")
+
+
+if __name__ == "__main__":
+    test_import_defers_heavy_dependencies()
+    test_metrics_buffer_until_datadog_attaches()
+    test_first_request_starts_background_work()
+    test_onset_detector_is_built_on_first_use()
+    test_background_initialization_completes()
+    print("\n🎉 Startup tests passed!")
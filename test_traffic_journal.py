@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the traffic journal and the replay harness
+"""
+import os
+import tempfile
+import unittest.mock
+
+from traffic_journal import JournalError, TrafficJournal, journal_files, read_journal
+
+
+def test_journal_round_trip_and_rotation():
+    print("🧪 Testing journal writes, rotation and size caps...")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TrafficJournal(tmp, max_file_bytes=4096, max_files=3)
+        for i in range(200):
+            journal.record('/data', {'text': f'[line {i}]'}, {'action': 'NONE'}, 200, 'mock', float(i))
+        journal.record('/health', {}, {}, 200, None, 0.0)  # not a journaled endpoint
+        journal.flush()
+        stats = journal.stats()
+        assert stats['written'] == 200 and stats['dropped'] == 0
+        assert stats['rotations'] >= 3
+
+        files = journal_files(tmp)
+        assert len(files) == 3
+        assert all(os.path.getsize(path) <= 4096 for path in files)
+        records = list(read_journal([tmp]))
+        # Oldest files were deleted; what is left is the newest, in order
+        assert records[-1].request == {'text': '[line 199]'} and records[-1].latency_ms == 199.0
+        assert [r.latency_ms for r in records] == sorted(r.latency_ms for r in records)
+        assert records[0].endpoint == '/data' and records[0].path == 'mock'
+
+        # A record cut short by a crash ends the file instead of failing the read
+        journal.close()
+        with open(files[-1], 'r+b') as f:
+            f.truncate(os.path.getsize(files[-1]) - 3)
+        assert list(read_journal([tmp]))[-1].request == {'text': '[line 198]'}
+
+        with open(os.path.join(tmp, 'bogus.crtj'), 'wb') as f:
+            f.write(b'not a journal at all')
+        try:
+            list(read_journal([os.path.join(tmp, 'bogus.crtj')]))
+            assert False, "expected JournalError"
+        except JournalError:
+            pass
+    print("✅ Journal files rotate, are capped and read back in order")
+
+
+def test_app_journals_and_replays():
+    print("🧪 Testing journaling from the app and in-process replay...")
+    import app
+    from replay_traffic import compare, in_process_sender, replay
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TrafficJournal(tmp)
+        with unittest.mock.patch.object(app, 'traffic_journal', journal), \
+                unittest.mock.patch('app.get_truefoundry_client', return_value=None):
+            with app.app.test_client() as client:
+                client.post('/data', json={'text': '[journal explosion]'})
+                client.post('/data', json={'text': '[journal explosion]'})
+                client.post('/data', json={'text': 'journal whispers'})
+                client.post('/audio-data', json={'volume': 0.9, 'baseline': 0.2, 'spike': 0.7})
+                client.post('/audio-data', json={'volume': 0.5, 'baseline': 0.2, 'spike': 0.3})
+                client.get('/health')
+        journal.close()
+
+        records = list(read_journal([tmp]))
+        assert [r.endpoint for r in records] == ['/data'] * 3 + ['/audio-data'] * 2
+        assert [r.path for r in records] == ['mock', 'cache', 'mock', 'prefilter', 'heuristic']
+        assert records[0].response['action'] == 'LOWER_VOLUME' and records[0].status == 200
+        assert all(r.latency_ms > 0 for r in records)
+
+        with unittest.mock.patch.object(app, 'traffic_journal', None), \
+                unittest.mock.patch.object(app, 'subtitle_rate_limiter', app.subtitle_rate_limiter), \
+                unittest.mock.patch.object(app, 'audio_rate_limiter', app.audio_rate_limiter), \
+                unittest.mock.patch('app.get_truefoundry_client', return_value=None):
+            results = replay(records, in_process_sender(), workers=1)
+        report = compare(records, results)
+        assert report['/data']['requests'] == 3 and report['/data']['decision_changed'] == 0
+        assert report['/audio-data']['decision_changed'] == 0
+        assert report['/audio-data']['replay_latency']['count'] == 2
+
+        # A build that answers differently shows up in the diff
+        changed = [records[2]._replace(response={'action': 'LOWER_VOLUME'})]
+        report = compare(changed, [results[2]])
+        assert report['/data']['decision_changed'] == 1
+        assert report['/data']['transitions'] == {'LOWER_VOLUME -> NONE': 1}
+    print("✅ Replayed decisions are diffed against the journal")
+
+
+if __name__ == "__main__":
+    test_journal_round_trip_and_rotation()
+    test_app_journals_and_replays()
+    print("\n🎉 Traffic journal tests passed!")
@@ -0,0 +1,206 @@
+"""
+Append-only binary journal of analyzed traffic, for offline replay.
+
+Request threads hand each analyzed exchange (/data and the audio endpoints)
+to a bounded queue and return; a background writer appends them to the
+current journal file, rotating to a new file past max_file_bytes and
+deleting the oldest files beyond max_files. A full queue drops records (counted) rather than slowing
+requests down.
+
+File layout (little-endian):
+    magic b'CRTJ' | version u16 | reserved u16 | created_at f64
+    records: length u32 | timestamp f64 | latency_ms f32 | endpoint u8 | status u16 | payload
+where payload is UTF-8 JSON {"request", "response", "path"}.
+
+Readers memory-map the files; a record cut short by a crash ends the file.
+"""
+import glob
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from collections import namedtuple
+
+MAGIC = b'CRTJ'
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct('<4sHHd')
+RECORD_HEADER = struct.Struct('<IdfBH')
+FILE_PATTERN = 'journal-*.crtj'
+ENDPOINTS = ('/data', '/audio-data', '/audio-spectrum', '/audio-levels')
+ENDPOINT_CODES = {endpoint: code for code, endpoint in enumerate(ENDPOINTS)}
+
+JournalRecord = namedtuple('JournalRecord', 'timestamp latency_ms endpoint status request response path')
+
+
+class JournalError(Exception):
+    """A journal file is missing or of an unknown format"""
+
+
+def encode_record(timestamp, latency_ms, endpoint, status, request, response, path):
+    payload = json.dumps({'request': request, 'response': response, 'path': path},
+                         separators=(',', ':')).encode('utf-8')
+    return RECORD_HEADER.pack(len(payload), timestamp, latency_ms,
+                              ENDPOINT_CODES[endpoint], status) + payload
+
+
+class TrafficJournal:
+    """Background, size-capped journal writer"""
+    def __init__(self, directory, max_file_bytes=64 * 1024 * 1024, max_files=8,
+                 max_queue=10000, on_drop=None):
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.on_drop = on_drop
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.file = None
+        self.file_path = None
+        self.file_bytes = 0
+        self.sequence = 0
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+        os.makedirs(directory, exist_ok=True)
+        self.writer = threading.Thread(target=self._run, name='crest-journal', daemon=True)
+        self.writer.start()
+
+    def record(self, endpoint, request, response, status, path, latency_ms, timestamp=None):
+        """Queue one exchange for the writer; never blocks the request"""
+        if endpoint not in ENDPOINT_CODES:
+            return False
+        item = (time.time() if timestamp is None else timestamp, latency_ms, endpoint,
+                status, request, response, path)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            if self.on_drop:
+                self.on_drop()
+            return False
+        with self.lock:
+            self.recorded += 1
+        return True
+
+    def _open_next_file(self):
+        if self.file:
+            self.file.close()
+            self.rotations += 1
+        self.sequence += 1
+        self.file_path = os.path.join(
+            self.directory, f"journal-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.sequence:04d}.crtj"
+        )
+        self.file = open(self.file_path, 'wb')
+        self.file.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, 0, time.time()))
+        self.file_bytes = FILE_HEADER.size
+        for old_path in journal_files(self.directory)[:-self.max_files]:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def _write(self, item):
+        encoded = encode_record(*item)
+        if self.file is None or self.file_bytes + len(encoded) > self.max_file_bytes:
+            self._open_next_file()
+        self.file.write(encoded)
+        self.file_bytes += len(encoded)
+        with self.lock:
+            self.written += 1
+            self.bytes_written += len(encoded)
+
+    def _run(self):
+        while True:
+            # Drain what's queued before paying for a flush
+            batch = [self.queue.get()]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                for item in batch:
+                    if item is not None:
+                        self._write(item)
+                if self.file:
+                    self.file.flush()
+            except OSError:
+                with self.lock:
+                    self.write_errors += 1
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if None in batch:
+                return
+
+    def flush(self):
+        """Wait until every queued record is on disk"""
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.writer.join(5)
+        if self.file:
+            self.file.close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'directory': self.directory,
+                'current_file': self.file_path,
+                'recorded': self.recorded,
+                'written': self.written,
+                'dropped': self.dropped,
+                'queued': self.queue.qsize(),
+                'rotations': self.rotations,
+                'bytes_written': self.bytes_written,
+                'write_errors': self.write_errors,
+            }
+
+
+def journal_files(path):
+    """Journal files under a directory (oldest first), or the file itself"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, FILE_PATTERN)), key=lambda p: (os.path.getmtime(p), p))
+    return [path]
+
+
+def read_journal_file(path):
+    """Yield the JournalRecords of one file through a read-only memory map"""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise JournalError(f"cannot map {path}: {e}") from e
+
+    with buffer:
+        if len(buffer) < FILE_HEADER.size:
+            raise JournalError(f"{path} is truncated")
+        magic, version, _, _ = FILE_HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise JournalError(f"{path} is not a version {FORMAT_VERSION} traffic journal")
+        offset = FILE_HEADER.size
+        while offset + RECORD_HEADER.size <= len(buffer):
+            length, timestamp, latency_ms, code, status = RECORD_HEADER.unpack_from(buffer, offset)
+            start = offset + RECORD_HEADER.size
+            if start + length > len(buffer) or code >= len(ENDPOINTS):
+                break
+            payload = json.loads(buffer[start:start + length])
+            offset = start + length
+            yield JournalRecord(timestamp, latency_ms, ENDPOINTS[code], status,
+                                payload['request'], payload['response'], payload['path'])
+
+
+def read_journal(paths):
+    """Yield records from journal files and directories, in file order"""
+    for path in paths:
+        for file_path in journal_files(path):
+            yield from read_journal_file(file_path)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Train the local subtitle classifier from logged LLM decisions
+
+Reads the server's JSON logs (the "OpenAI decision" lines carry the subtitle
+text and the gateway's answer) and/or JSONL files of {"text", "decision"}
+records, trains a hashed n-gram logistic regression and writes a versioned
+model file that app.py loads at startup (CREST_LOCAL_MODEL_PATH).
+
+Usage: python train_classifier.py server.log [more.jsonl ...] --output models/subtitle_classifier.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+from local_classifier import HashedNgramClassifier, new_model_version
+
+
+def load_examples(paths):
+    """Collect (text, decision) pairs, the latest decision winning per text"""
+    decisions = {}
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line.startswith('{'):
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('message') == 'OpenAI decision':
+                    text, decision = record.get('subtitle_text'), record.get('decision')
+                else:
+                    text, decision = record.get('text'), record.get('decision')
+                if text and decision in ('YES', 'NO'):
+                    decisions[text] = decision
+    return list(decisions.items())
+
+
+def evaluate(model, examples):
+    """Accuracy overall, plus coverage and accuracy of confident predictions"""
+    if not examples:
+        return {'examples': 0}
+    correct = confident = confident_correct = 0
+    for text, expected in examples:
+        decision, confidence = model.predict(text)
+        correct += decision == expected
+        if model.is_confident(confidence):
+            confident += 1
+            confident_correct += decision == expected
+    return {
+        'examples': len(examples),
+        'accuracy': correct / len(examples),
+        'local_coverage': confident / len(examples),
+        'local_accuracy': confident_correct / confident if confident else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Crest local subtitle classifier")
+    parser.add_argument('inputs', nargs='+', help="JSON server logs or JSONL decision files")
+    parser.add_argument('--output', default=os.path.join('models', 'subtitle_classifier.json'))
+    parser.add_argument('--model-version', default=None)
+    parser.add_argument('--n-features', type=int, default=2 ** 18)
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--learning-rate', type=float, default=0.5)
+    parser.add_argument('--confidence-threshold', type=float, default=0.9,
+                        help="predictions below this confidence escalate to the LLM")
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help="fraction of examples held out for evaluation")
+    args = parser.parse_args()
+
+    examples = load_examples(args.inputs)
+    if len(examples) < 10:
+        print(f"❌ Need at least 10 labelled examples, found {len(examples)}")
+        sys.exit(1)
+
+    random.Random(7).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train, holdout = examples[:split], examples[split:]
+
+    model = HashedNgramClassifier(
+        n_features=args.n_features,
+        confidence_threshold=args.confidence_threshold,
+        model_version=args.model_version or new_model_version(),
+    )
+    model.fit(train, epochs=args.epochs, learning_rate=args.learning_rate)
+    report = evaluate(model, holdout)
+    model.metadata = {
+        'training_examples': len(train),
+        'positive_fraction': sum(d == 'YES' for _, d in train) / len(train),
+        'holdout': report,
+    }
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    model.save(args.output)
+
+    print("🧠 CREST LOCAL CLASSIFIER")
+    print("=" * 40)
+    print(f"   Model version:  {model.model_version}")
+    print(f"   Train/holdout:  {len(train)}/{len(holdout)}")
+    if holdout:
+        print(f"   Accuracy:       {report['accuracy']:.1%}")
+        print(f"   Local coverage: {report['local_coverage']:.1%} at confidence >= {args.confidence_threshold}")
+        if report['local_accuracy'] is not None:
+            print(f"   Local accuracy: {report['local_accuracy']:.1%}")
+    print(f"✅ Wrote {args.output} ({len(model.weights)} weights)")
+
+
+if __name__ == '__main__':
+    main()
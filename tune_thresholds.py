@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Tune the audio spike thresholds on recorded traces
+
+Loads (volume, baseline, spike, label) traces into NumPy arrays and searches
+threshold grids exhaustively, evaluating a chunk of combinations against
+every trace at once and fanning the chunks across a process pool:
+
+  * pre-filter (quiet_spike, loud_spike): misclassified clear-cut spikes
+    plus --escalation-cost for every trace left in the band between, which
+    live mode sends to the LLM;
+  * heuristic rules: weighted errors of the five rule thresholds used when
+    no LLM answer is available;
+  * fallback / agreement spike: the best single spike threshold, with the
+    confidence tiers shifted by as much as it moved from the default.
+
+Missed loud events cost --fn-weight times a false alarm. Writes a versioned
+thresholds file that app.py loads at startup (CREST_AUDIO_THRESHOLDS_PATH).
+
+Traces are CSV files with volume, baseline, spike and either a label column
+(1 = should duck) or the served decision (YES/NO or 1/0) with a corrected
+column (1 = the user reverted it), .npz files with the same arrays, or
+traffic journal directories (served /audio-data decisions as labels).
+
+Usage: python tune_thresholds.py traces.csv [journal_dir ...] --output models/audio_thresholds.json
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from audio_thresholds import CONFIDENCE_TIERS, DEFAULT_AUDIO_THRESHOLDS, AudioThresholds
+from local_classifier import new_model_version
+
+# Grid ranges per threshold: (low, high); --steps values are evaluated in each
+PREFILTER_GRID = {'quiet_spike': (0.02, 0.3), 'loud_spike': (0.3, 0.9)}
+HEURISTIC_GRID = {
+    'heuristic_spike': (0.2, 0.7),
+    'heuristic_volume_spike': (0.1, 0.5),
+    'heuristic_volume': (0.3, 0.9),
+    'heuristic_ratio_spike': (0.1, 0.45),
+    'heuristic_ratio': (1.5, 6.0),
+}
+FALLBACK_GRID = (0.05, 0.7)
+
+# Set in each pool worker by init_worker so chunks don't re-send the traces
+TRACES = None
+
+
+def parse_label(row):
+    if row.get('label') not in (None, ''):
+        return float(row['label']) >= 0.5
+    decision = str(row.get('decision', '')).strip().upper()
+    served_loud = decision in ('YES', '1', 'TRUE', 'LOWER_VOLUME')
+    corrected = str(row.get('corrected', '0')).strip().lower() in ('1', 'true', 'yes')
+    return served_loud != corrected
+
+
+def load_traces(paths):
+    """Concatenate traces from CSV, NPZ and journal inputs into float/bool arrays"""
+    volume, baseline, spike, label = [], [], [], []
+    for path in paths:
+        if os.path.isdir(path) or path.endswith('.crtj'):
+            from traffic_journal import read_journal
+            for record in read_journal([path]):
+                if record.endpoint != '/audio-data' or record.status != 200 or not record.response:
+                    continue
+                request = record.request or {}
+                volume.append(float(request.get('volume', 0)))
+                baseline.append(float(request.get('baseline', 0)))
+                spike.append(float(request.get('spike', 0)))
+                label.append(record.response.get('action') == 'LOWER_VOLUME')
+        elif path.endswith('.npz'):
+            with np.load(path) as data:
+                volume.extend(data['volume'].tolist())
+                baseline.extend(data['baseline'].tolist())
+                spike.extend(data['spike'].tolist())
+                label.extend((data['label'] >= 0.5).tolist())
+        else:
+            with open(path, newline='') as f:
+                for row in csv.DictReader(f):
+                    volume.append(float(row['volume']))
+                    baseline.append(float(row['baseline']))
+                    spike.append(float(row['spike']))
+                    label.append(parse_label(row))
+    traces = {
+        'volume': np.asarray(volume, dtype=np.float32),
+        'baseline': np.asarray(baseline, dtype=np.float32),
+        'spike': np.asarray(spike, dtype=np.float32),
+        'label': np.asarray(label, dtype=bool),
+    }
+    # Same ratio as AudioThresholds.heuristic_decision
+    traces['ratio'] = traces['spike'] / np.maximum(traces['baseline'], np.float32(0.05))
+    return traces
+
+
+def grid_values(bounds, steps):
+    return np.round(np.linspace(bounds[0], bounds[1], steps), 4)
+
+
+def combinations(axes):
+    """Every combination of the per-threshold index axes, as a (C, k) int array"""
+    return np.array(list(itertools.product(*(range(len(axis)) for axis in axes))), dtype=np.int32)
+
+
+def score_prefilter(traces, quiet, loud, fn_weight, escalation_cost):
+    """Cost per trace of (quiet, loud) pairs, shape (C,)"""
+    spike, label = traces['spike'], traces['label']
+    below = spike[None, :] < quiet[:, None]
+    above = spike[None, :] > loud[:, None]
+    missed = (below & label).sum(axis=1)
+    false_alarms = (above & ~label).sum(axis=1)
+    escalated = (~below & ~above).sum(axis=1)
+    return (false_alarms + fn_weight * missed + escalation_cost * escalated) / len(spike)
+
+
+def score_rules(predicted, label, fn_weight):
+    """Weighted error rate of (C, N) predictions"""
+    false_alarms = (predicted & ~label).sum(axis=1)
+    missed = (~predicted & label).sum(axis=1)
+    return (false_alarms + fn_weight * missed) / len(label)
+
+
+def heuristic_predictions(traces, axes, combos):
+    """Rule decisions for each combination of heuristic threshold indices, shape (C, N)"""
+    spike, volume, ratio = traces['spike'], traces['volume'], traces['ratio']
+    spike_a, spike_b, volume_b, spike_c, ratio_c = (
+        # One comparison matrix per threshold axis; combinations index into them
+        spike[None, :] > axes[0][:, None],
+        spike[None, :] > axes[1][:, None],
+        volume[None, :] > axes[2][:, None],
+        spike[None, :] > axes[3][:, None],
+        ratio[None, :] > axes[4][:, None],
+    )
+    return (spike_a[combos[:, 0]]
+            | (spike_b[combos[:, 1]] & volume_b[combos[:, 2]])
+            | (spike_c[combos[:, 3]] & ratio_c[combos[:, 4]]))
+
+
+def init_worker(traces):
+    global TRACES
+    TRACES = traces
+
+
+def evaluate_chunk(job):
+    """Best (score, combination index) within one chunk of a grid"""
+    kind, start, combos, axes, fn_weight, escalation_cost = job
+    if kind == 'prefilter':
+        scores = score_prefilter(TRACES, axes[0][combos[:, 0]], axes[1][combos[:, 1]],
+                                 fn_weight, escalation_cost)
+        # quiet_spike above loud_spike isn't a valid configuration
+        scores = np.where(axes[0][combos[:, 0]] <= axes[1][combos[:, 1]], scores, np.inf)
+    else:
+        scores = score_rules(heuristic_predictions(TRACES, axes, combos), TRACES['label'], fn_weight)
+    best = int(np.argmin(scores))
+    return float(scores[best]), start + best
+
+
+def search(kind, axes, traces, pool, fn_weight, escalation_cost, chunk_cells=10_000_000):
+    """Exhaustive grid search; returns (best score, best values per axis, combinations evaluated)"""
+    combos = combinations(axes)
+    chunk = max(1, chunk_cells // max(1, len(traces['spike'])))
+    jobs = [(kind, start, combos[start:start + chunk], axes, fn_weight, escalation_cost)
+            for start in range(0, len(combos), chunk)]
+    results = list(pool.map(evaluate_chunk, jobs)) if pool else [evaluate_chunk(job) for job in jobs]
+    score, index = min(results)
+    return score, [float(axis[i]) for axis, i in zip(axes, combos[index])], len(combos)
+
+
+def evaluate_thresholds(thresholds, traces, fn_weight, escalation_cost):
+    """Scores and rates of one AudioThresholds on the traces"""
+    values = thresholds.values()
+    spike, label = traces['spike'], traces['label']
+    escalated = (spike >= values['quiet_spike']) & (spike <= values['loud_spike'])
+    heuristic_axes = [np.array([values[name]], dtype=np.float32) for name in HEURISTIC_GRID]
+    heuristic = heuristic_predictions(traces, heuristic_axes, np.zeros((1, 5), dtype=np.int32))[0]
+    return {
+        'prefilter_cost': float(score_prefilter(traces, np.array([values['quiet_spike']]),
+                                                np.array([values['loud_spike']]),
+                                                fn_weight, escalation_cost)[0]),
+        'escalation_rate': float(escalated.mean()),
+        'heuristic_error': float(score_rules(heuristic[None, :], label, fn_weight)[0]),
+        'heuristic_accuracy': float((heuristic == label).mean()),
+        'fallback_error': float(score_rules((spike > values['fallback_spike'])[None, :], label, fn_weight)[0]),
+    }
+
+
+def tune(traces, steps=12, workers=None, fn_weight=2.0, escalation_cost=0.05):
+    """Fit every threshold group; returns (AudioThresholds, combinations evaluated)"""
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(traces,)) if workers > 1 else None
+    init_worker(traces)
+    try:
+        prefilter_axes = [grid_values(bounds, steps * 2) for bounds in PREFILTER_GRID.values()]
+        _, (quiet, loud), prefilter_count = search(
+            'prefilter', prefilter_axes, traces, pool, fn_weight, escalation_cost)
+        heuristic_axes = [grid_values(bounds, steps) for bounds in HEURISTIC_GRID.values()]
+        _, heuristic_values, heuristic_count = search(
+            'heuristic', heuristic_axes, traces, pool, fn_weight, escalation_cost)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    fallback_axis = grid_values(FALLBACK_GRID, steps * 8)
+    fallback_scores = score_rules(traces['spike'][None, :] > fallback_axis[:, None],
+                                  traces['label'], fn_weight)
+    fallback = float(fallback_axis[int(np.argmin(fallback_scores))])
+
+    # The confidence tiers sit around the decision boundary, so they move with it
+    shift = fallback - DEFAULT_AUDIO_THRESHOLDS['fallback_spike']
+    tiers = {name: min(1.0, max(0.0, DEFAULT_AUDIO_THRESHOLDS[name] + shift)) for name, _ in CONFIDENCE_TIERS}
+    thresholds = AudioThresholds(
+        version=new_model_version(),
+        quiet_spike=quiet,
+        loud_spike=loud,
+        fallback_spike=fallback,
+        agreement_spike=fallback,
+        **dict(zip(HEURISTIC_GRID, heuristic_values)),
+        **tiers
+    )
+    return thresholds, prefilter_count + heuristic_count + len(fallback_axis)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune Crest's audio spike thresholds on recorded traces")
+    parser.add_argument('traces', nargs='+', help="CSV, NPZ or traffic journal inputs")
+    parser.add_argument('--output', default=os.path.join('models', 'audio_thresholds.json'))
+    parser.add_argument('--steps', type=int, default=12, help="grid values per heuristic threshold")
+    parser.add_argument('--workers', type=int, default=0, help="worker processes (default: all CPUs)")
+    parser.add_argument('--fn-weight', type=float, default=2.0, help="cost of a missed loud event vs a false alarm")
+    parser.add_argument('--escalation-cost', type=float, default=0.05,
+                        help="cost of sending a borderline trace to the LLM")
+    args = parser.parse_args()
+
+    traces = load_traces(args.traces)
+    if len(traces['spike']) == 0:
+        print("❌ No traces found")
+        sys.exit(1)
+
+    started = time.time()
+    thresholds, evaluated = tune(traces, steps=args.steps, workers=args.workers,
+                                 fn_weight=args.fn_weight, escalation_cost=args.escalation_cost)
+    before = evaluate_thresholds(AudioThresholds(), traces, args.fn_weight, args.escalation_cost)
+    after = evaluate_thresholds(thresholds, traces, args.fn_weight, args.escalation_cost)
+    thresholds.metadata = {
+        'traces': int(len(traces['spike'])),
+        'loud_share': float(traces['label'].mean()),
+        'fn_weight': args.fn_weight,
+        'escalation_cost': args.escalation_cost,
+        'default_metrics': before,
+        'tuned_metrics': after,
+    }
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    thresholds.save(args.output)
+
+    print("🎚️  CREST AUDIO THRESHOLDS")
+    print("=" * 40)
+    print(f"   Traces:       {len(traces['spike'])} ({traces['label'].mean():.1%} loud)")
+    print(f"   Evaluated:    {evaluated} combinations in {time.time() - started:.1f}s")
+    for metric in ('escalation_rate', 'heuristic_accuracy', 'prefilter_cost', 'heuristic_error'):
+        print(f"   {metric.replace('_', ' ').capitalize() + ':':18}{before[metric]:.3f} -> {after[metric]:.3f}")
+    for name, value in thresholds.values().items():
+        print(f"      {name:24} {value:g}")
+    print(f"✅ Wrote {args.output} (version {thresholds.version})")
+
+
+if __name__ == '__main__':
+    main()